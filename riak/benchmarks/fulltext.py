@@ -0,0 +1,52 @@
+# Copyright 2010-present Basho Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from xml.dom.minidom import Document
+
+import riak.benchmark as benchmark
+from riak.codecs.http import encode_fulltext_doc, fulltext_update_body
+
+# Compares building full-text index update bodies with minidom against
+# the streaming encoder, without a Riak node
+
+docs = [{"id": str(i), "username": "user{:d}".format(i),
+         "bio": 'Likes <tags> & "quotes" {:d}'.format(i)}
+        for i in range(100000)]
+
+
+def minidom_add(docs):
+    xml = Document()
+    root = xml.createElement("add")
+    for doc in docs:
+        doc_element = xml.createElement("doc")
+        for key in doc:
+            field = xml.createElement("field")
+            field.setAttribute("name", key)
+            field.appendChild(xml.createTextNode(doc[key]))
+            doc_element.appendChild(field)
+        root.appendChild(doc_element)
+    xml.appendChild(root)
+    return xml.toxml().encode("utf-8")
+
+
+print("Benchmarking full-text index updates:")
+print(f"Documents: {len(docs)}")
+print()
+
+for b in benchmark.measure_with_rehearsal():
+    with b.report("minidom"):
+        minidom_add(docs)
+    with b.report("streaming"):
+        fulltext_update_body("add", (encode_fulltext_doc(doc)
+                                     for doc in docs))
@@ -0,0 +1,44 @@
+# Copyright 2010-present Basho Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import riak.benchmark as benchmark
+from riak.transports.http.resources import HttpResources
+
+# Measures the construction of the HTTP resource paths used on every
+# get, put and 2i request, without a Riak node
+
+requests = 100000
+keys = ["user/{:d}".format(i) for i in range(requests)]
+
+resources = HttpResources()
+resources.riak_kv_wm_bucket_type = True
+resources.riak_kv_wm_buckets = True
+
+print("Benchmarking HTTP path construction:")
+print(f"Requests: {requests}")
+print()
+
+for b in benchmark.measure_with_rehearsal():
+    with b.report("object"):
+        for key in keys:
+            resources.object_path("users", key, bucket_type="profiles")
+    with b.report("object-query"):
+        for key in keys:
+            resources.object_path("users", key, bucket_type="profiles",
+                                  r=2, pr=None, timeout=None,
+                                  returnbody=True)
+    with b.report("index"):
+        for key in keys:
+            resources.index_path("users", "email_bin", key,
+                                 bucket_type="profiles", return_terms=True)
@@ -0,0 +1,83 @@
+# Copyright 2010-present Basho Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import sys
+import threading
+
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import riak.benchmark as benchmark
+from riak.transports.http.stream import HttpIndexStream
+
+# Streams a synthetic multipart 2i response from a local stand-in for
+# Riak's HTTP interface, without a Riak node
+
+# part sizes in KB, e.g. 4, 64, 1024
+if len(sys.argv) != 2:
+    raise AssertionError("first arg is part size in KB")
+
+total = 100 * 1024 * 1024
+partsz = int(sys.argv[1]) * 1024
+boundary = b"Vl0Xfs5mJ7wkhkBALdOZ8FkWcdj"
+
+keys = ["key{:010d}".format(i) for i in range(partsz // 16)]
+part = b"\r\n--" + boundary + b"\r\nContent-Type: application/json\r\n\r\n" + \
+    json.dumps({"keys": keys}).encode("utf-8")
+parts = total // len(part)
+body = part * parts + b"\r\n--" + boundary + b"--\r\n"
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type",
+                         "multipart/mixed; boundary=" + boundary.decode())
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i in range(0, len(body), 65536):
+            chunk = body[i:i + 65536]
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+server = HTTPServer(("127.0.0.1", 0), Handler)
+thread = threading.Thread(target=server.serve_forever)
+thread.daemon = True
+thread.start()
+
+print("Benchmarking HTTP multipart streaming:")
+print(f"     Body: {len(body) // (1024 * 1024)} MB")
+print(f"Part size: {len(part) // 1024} KB")
+print(f"    Parts: {parts}")
+print()
+
+for b in benchmark.measure_with_rehearsal():
+    with b.report("stream_index"):
+        conn = HTTPConnection("127.0.0.1", server.server_port)
+        conn.request("GET", "/buckets/b/index/field_bin/a/z?stream=true")
+        count = 0
+        for keylist in HttpIndexStream(conn.getresponse(), "field_bin", False):
+            count += 1
+        conn.close()
+        if count != parts:
+            raise AssertionError("expected {:d} parts, got {:d}".format(parts, count))
+
+server.shutdown()
@@ -0,0 +1,63 @@
+# Copyright 2010-present Basho Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+
+import riak.benchmark as benchmark
+from riak import key_filter
+
+# Compares key filters compiled into a predicate against evaluating
+# the filter expression for every key, as when post-filtering the
+# chunks of stream_keys by hand, without a Riak node
+
+keycount = 200000
+chunk = 1000
+chunks = [["{:d}-{:02d}-user{:d}".format(2000 + i % 20, i % 12 + 1, i)
+           for i in range(start, start + chunk)]
+          for start in range(0, keycount, chunk)]
+
+year = key_filter.tokenize("-", 1).string_to_int().between(2005, 2010)
+user = key_filter.tokenize("-", 3).matches("^user[0-9]*7$")
+filters = list(year & user)
+
+
+def interpret(filters, value):
+    for name, *args in filters:
+        if name == "and":
+            return all(interpret(operand, value) for operand in args)
+        elif name == "tokenize":
+            value = [t for t in value.split(args[0]) if t][args[1] - 1]
+        elif name == "string_to_int":
+            value = int(value)
+        elif name == "between":
+            if not args[0] <= value <= args[1]:
+                return False
+        elif name == "matches":
+            if not re.search(args[0], value):
+                return False
+    return True
+
+
+print("Benchmarking key filters:")
+print(f"Keys: {keycount}")
+print()
+
+for b in benchmark.measure_with_rehearsal():
+    with b.report("interpreted"):
+        for keys in chunks:
+            [key for key in keys if interpret(filters, key)]
+    with b.report("compiled"):
+        keep = (year & user).compile()
+        for keys in chunks:
+            [key for key in keys if keep(key)]
@@ -0,0 +1,50 @@
+# Copyright 2010-present Basho Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import riak.benchmark as benchmark
+from riak import RiakClient
+from riak.codecs.pbuf import PbufCodec
+
+# Compares encoding of get and delete requests with and without a
+# prepared template, without a Riak node
+
+count = 100000
+
+client = RiakClient()
+bucket = client.bucket("benchmark")
+codec = PbufCodec(client_timeouts=True, quorum_controls=True,
+                  tombstone_vclocks=True, bucket_types=True)
+objs = [bucket.new("key{:d}".format(i)) for i in range(count)]
+get = bucket.prepare_get(r=2, timeout=50)
+delete = bucket.prepare_delete(rw=2, timeout=50)
+
+print("Benchmarking request encoding:")
+print(f"Requests: {count}")
+print()
+
+for b in benchmark.measure_with_rehearsal():
+    with b.report("get"):
+        for obj in objs:
+            codec.encode_get(obj, **get.options)
+    with b.report("get-prepared"):
+        template = get.template(codec)
+        for obj in objs:
+            codec.encode_prepared_get(template, obj)
+    with b.report("delete"):
+        for obj in objs:
+            codec.encode_delete(obj, **delete.options)
+    with b.report("delete-prepared"):
+        template = delete.template(codec)
+        for obj in objs:
+            codec.encode_prepared_delete(template, obj)
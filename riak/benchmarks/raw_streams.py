@@ -0,0 +1,81 @@
+# Copyright 2010-present Basho Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import riak.benchmark as benchmark
+import riak.pb.messages
+import riak.pb.riak_kv_pb2
+from riak.codecs.pbuf import PbufCodec
+from riak.transports.tcp.stream import PbufIndexStream, PbufMapredStream
+
+# Compares decoding MapReduce and 2i stream frames against passing on
+# their raw payloads, without a Riak node
+
+frames = 2000
+codec = PbufCodec()
+
+mapred = []
+for i in range(frames):
+    resp = riak.pb.riak_kv_pb2.RpbMapRedResp()
+    resp.phase = 0
+    resp.response = json.dumps([{"id": i, "name": "user{:d}".format(j),
+                                 "tags": ["a", "b", "c"]}
+                                for j in range(20)]).encode("utf-8")
+    mapred.append((riak.pb.messages.MSG_CODE_MAP_RED_RESP,
+                   resp.SerializeToString()))
+done = riak.pb.riak_kv_pb2.RpbMapRedResp()
+done.done = True
+mapred.append((riak.pb.messages.MSG_CODE_MAP_RED_RESP,
+               done.SerializeToString()))
+
+index = []
+for i in range(frames):
+    resp = riak.pb.riak_kv_pb2.RpbIndexResp()
+    resp.keys.extend("user/{:d}/{:d}".format(i, j).encode("utf-8")
+                     for j in range(100))
+    index.append((riak.pb.messages.MSG_CODE_INDEX_RESP,
+                  resp.SerializeToString()))
+done = riak.pb.riak_kv_pb2.RpbIndexResp()
+done.done = True
+index.append((riak.pb.messages.MSG_CODE_INDEX_RESP,
+              done.SerializeToString()))
+
+
+class Frames(object):
+    def __init__(self, frames):
+        self.frames = iter(frames)
+
+    def _recv_msg(self, mid_stream=False):
+        return next(self.frames)
+
+
+print("Benchmarking raw streams:")
+print(f"Frames: {frames}")
+print()
+
+for b in benchmark.measure_with_rehearsal():
+    with b.report("mapred"):
+        for _ in PbufMapredStream(Frames(mapred), codec):
+            pass
+    with b.report("mapred-raw"):
+        for _ in PbufMapredStream(Frames(mapred), codec, raw=True):
+            pass
+    with b.report("index"):
+        for _ in PbufIndexStream(Frames(index), codec, "user_bin"):
+            pass
+    with b.report("index-raw"):
+        for _ in PbufIndexStream(Frames(index), codec, "user_bin",
+                                 raw=True):
+            pass
@@ -0,0 +1,93 @@
+# Copyright 2010-present Basho Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import random
+import sys
+
+from erlastic import decode, encode
+from erlastic.types import Atom
+
+import riak.benchmark as benchmark
+from riak.codecs.ttb import TtbCodec
+from riak.table import Table
+from riak.ts_object import TsObject
+from riak.util import unix_time_millis
+
+# Compares the single-pass TTB codec against the erlastic term-tree
+# path, without a Riak node, using the same rows as timeseries.py
+
+# batch sizes 8, 16, 32, 64, 128, 256
+if len(sys.argv) != 2:
+    raise AssertionError("first arg is batch size")
+
+rowcount = 32768
+batchsz = int(sys.argv[1])
+if rowcount % batchsz != 0:
+    raise AssertionError("rowcount must be divisible by batchsz")
+
+weather = ["typhoon", "hurricane", "rain", "wind", "snow"]
+rows = []
+for i in range(rowcount):
+    ts = datetime.datetime(2016, 1, 1, 12, 0, 0) + \
+        datetime.timedelta(seconds=i)
+    family_idx = i % batchsz
+    series_idx = i % batchsz
+    family = "hash{:d}".format(family_idx)
+    series = "user{:d}".format(series_idx)
+    w = weather[i % len(weather)]
+    temp = (i % 100) + random.random()
+    row = [family, series, ts, w, temp]
+    rows.append(row)
+
+codec = TtbCodec()
+table = Table(None, "GeoCheckin")
+batches = [table.new(rows[i:i + batchsz])
+           for i in range(0, rowcount, batchsz)]
+
+colnames = ["geohash", "user", "time", "weather", "temperature"]
+coltypes = [Atom("varchar"), Atom("varchar"), Atom("timestamp"),
+            Atom("varchar"), Atom("double")]
+responses = []
+for i in range(0, rowcount, batchsz):
+    resp_rows = [(f.encode(), s.encode(), unix_time_millis(t), w.encode(), d)
+                 for f, s, t, w, d in rows[i:i + batchsz]]
+    resp = Atom("tsqueryresp"), (colnames, coltypes, resp_rows)
+    responses.append(encode(resp))
+
+
+def erlastic_put(tsobj):
+    req_rows = [tuple(codec.encode_to_ts_cell(cell) for cell in row)
+                for row in tsobj.rows]
+    return encode((Atom("tsputreq"), tsobj.table.name, [], req_rows))
+
+
+print("Benchmarking TTB codec:")
+print(f"Batch Size: {batchsz}")
+print(f"      Rows: {len(rows)}")
+print()
+
+for b in benchmark.measure_with_rehearsal():
+    with b.report("put-erlastic"):
+        for tsobj in batches:
+            erlastic_put(tsobj)
+    with b.report("put-direct"):
+        for tsobj in batches:
+            codec.encode_timeseries_put(tsobj)
+    with b.report("get-erlastic"):
+        for data in responses:
+            codec.decode_timeseries(decode(data), TsObject(None, table), True)
+    with b.report("get-direct"):
+        for data in responses:
+            codec.decode_timeseries_ttb(data, TsObject(None, table), True)
@@ -62,6 +62,9 @@ class RiakBucket(object):
         self.bucket_type = bucket_type
         self._encoders = {}
         self._decoders = {}
+        self._compressors = {}
+        self._resolved = {}
+        self._resolved_version = None
         self._resolver = None
 
     def __hash__(self):
@@ -79,6 +82,25 @@ class RiakBucket(object):
         else:
             return True
 
+    def _resolve(self, kind, name, overrides, lookup):
+        """
+        Resolves a serializer of this bucket, falling back to the
+        client's, and caches the result until either is changed.
+        """
+        version = self._client._serializers_version
+        if self._resolved_version != version:
+            self._resolved = {}
+            self._resolved_version = version
+        try:
+            return self._resolved[(kind, name)]
+        except KeyError:
+            if name in overrides:
+                value = overrides[name]
+            else:
+                value = lookup(name)
+            self._resolved[(kind, name)] = value
+            return value
+
     def get_encoder(self, content_type):
         """
         Get the encoding function for the provided content type for
@@ -88,10 +110,8 @@ class RiakBucket(object):
         :type content_type: str
         :param content_type: Content type requested
         """
-        if content_type in self._encoders:
-            return self._encoders[content_type]
-        else:
-            return self._client.get_encoder(content_type)
+        return self._resolve("encoder", content_type, self._encoders,
+                             self._client.get_encoder)
 
     def set_encoder(self, content_type, encoder):
         """
@@ -105,6 +125,7 @@ class RiakBucket(object):
         :type encoder: function
         """
         self._encoders[content_type] = encoder
+        self._resolved = {}
         return self
 
     def get_decoder(self, content_type):
@@ -116,10 +137,8 @@ class RiakBucket(object):
         :type content_type: str
         :rtype: function
         """
-        if content_type in self._decoders:
-            return self._decoders[content_type]
-        else:
-            return self._client.get_decoder(content_type)
+        return self._resolve("decoder", content_type, self._decoders,
+                             self._client.get_decoder)
 
     def set_decoder(self, content_type, decoder):
         """
@@ -133,6 +152,37 @@ class RiakBucket(object):
         :type decoder: function
         """
         self._decoders[content_type] = decoder
+        self._resolved = {}
+        return self
+
+    def get_compressor(self, content_encoding):
+        """
+        Get the compression functions for the provided content
+        encoding for this bucket.
+
+        :param content_encoding: the requested content encoding
+        :type content_encoding: str
+        :rtype: tuple of (compress, decompress) functions, or None
+        """
+        return self._resolve("compressor", content_encoding,
+                             self._compressors, self._client.get_compressor)
+
+    def set_compressor(self, content_encoding, compress, decompress):
+        """
+        Set the compression functions for the provided content
+        encoding for this bucket.
+
+        :param content_encoding: the requested content encoding
+        :type content_encoding: str
+        :param compress: a compression function, takes encoded data and
+            returns compressed data
+        :type compress: function
+        :param decompress: a decompression function, takes compressed
+            data and returns encoded data
+        :type decompress: function
+        """
+        self._compressors[content_encoding] = (compress, decompress)
+        self._resolved = {}
         return self
 
     def new(self, key=None, data=None, content_type="application/json",
@@ -387,7 +437,7 @@ class RiakBucket(object):
         """
         return self._client.get_keys(self)
 
-    def stream_keys(self):
+    def stream_keys(self, filter=None, raw=False):
         """
         Streams all keys within the bucket through an iterator.
 
@@ -395,9 +445,15 @@ class RiakBucket(object):
         :meth:`RiakClient.stream_keys()
         <riak.client.RiakClient.stream_keys>` for more details.
 
+        :param filter: key filters, or a function which tests each key,
+          to stream only the keys which pass
+        :type filter: list, :class:`~riak.mapreduce.RiakKeyFilter`,
+          function
+        :param raw: whether to yield the keys as the bytes received
+        :type raw: boolean
         :rtype: iterator
         """
-        return self._client.stream_keys(self)
+        return self._client.stream_keys(self, filter=filter, raw=raw)
 
     def new_from_file(self, key, filename):
         """Create a new Riak object in the bucket, using the contents of
@@ -486,7 +542,8 @@ class RiakBucket(object):
 
     def paginate_index(self, index, startkey, endkey=None,
                        return_terms=None, max_results=1000,
-                       continuation=None, timeout=None, term_regex=None):
+                       continuation=None, timeout=None, term_regex=None,
+                       prefetch=0):
         """
         Paginates through a secondary index over objects in this bucket,
         returning keys or index/key pairs. See
@@ -498,11 +555,12 @@ class RiakBucket(object):
                                            max_results=max_results,
                                            continuation=continuation,
                                            timeout=timeout,
-                                           term_regex=term_regex)
+                                           term_regex=term_regex,
+                                           prefetch=prefetch)
 
     def stream_index(self, index, startkey, endkey=None, return_terms=None,
                      max_results=None, continuation=None, timeout=None,
-                     term_regex=None):
+                     term_regex=None, raw=False):
         """
         Queries a secondary index over objects in this bucket,
         streaming keys or index/key pairs via an iterator.
@@ -515,12 +573,12 @@ class RiakBucket(object):
                                          max_results=max_results,
                                          continuation=continuation,
                                          timeout=timeout,
-                                         term_regex=term_regex)
+                                         term_regex=term_regex, raw=raw)
 
     def paginate_stream_index(self, index, startkey, endkey=None,
                               return_terms=None, max_results=1000,
                               continuation=None, timeout=None,
-                              term_regex=None):
+                              term_regex=None, prefetch=0):
         """
         Paginates through a secondary index over objects in this bucket,
         streaming keys or index/key pairs. The caller must close the stream
@@ -533,7 +591,43 @@ class RiakBucket(object):
                                                   max_results=max_results,
                                                   continuation=continuation,
                                                   timeout=timeout,
-                                                  term_regex=term_regex)
+                                                  term_regex=term_regex,
+                                                  prefetch=prefetch)
+
+    def parallel_index_scan(self, index, startkey, endkey=None,
+                            partitions=4, ordered=False, return_terms=None,
+                            max_results=None, continuation=None,
+                            timeout=None, term_regex=None):
+        """
+        Queries a secondary index range over objects in this bucket,
+        split into sub-ranges which are streamed at the same time. See
+        :meth:`RiakClient.parallel_index_scan()
+        <riak.client.RiakClient.parallel_index_scan>` for more details.
+        """
+        return self._client.parallel_index_scan(self, index, startkey,
+                                                endkey,
+                                                partitions=partitions,
+                                                ordered=ordered,
+                                                return_terms=return_terms,
+                                                max_results=max_results,
+                                                continuation=continuation,
+                                                timeout=timeout,
+                                                term_regex=term_regex)
+
+    def index_fetch(self, index, startkey, endkey=None, concurrency=None,
+                    head_only=False, timeout=None, term_regex=None,
+                    **params):
+        """
+        Queries a secondary index over objects in this bucket and
+        fetches the matching objects concurrently as their keys
+        arrive. See :meth:`RiakClient.index_fetch()
+        <riak.client.RiakClient.index_fetch>` for more details.
+        """
+        return self._client.index_fetch(self, index, startkey, endkey,
+                                        concurrency=concurrency,
+                                        head_only=head_only,
+                                        timeout=timeout,
+                                        term_regex=term_regex, **params)
 
     def delete(self, key, **kwargs):
         """Deletes a key from Riak. Short hand for
@@ -546,6 +640,61 @@ class RiakBucket(object):
         """
         return self.new(key).delete(**kwargs)
 
+    def prepare_get(self, r=None, pr=None, timeout=None,
+                    basic_quorum=None, notfound_ok=None, head_only=False):
+        """
+        Prepares a fetch with fixed options, for repeatedly retrieving
+        objects from this bucket. On the Protocol Buffers transport the
+        request is serialized once, and each call only encodes the
+        key. See :meth:`get` for the options. Example::
+
+            get = bucket.prepare_get(r=2, timeout=50)
+            obj = get("mykey")
+
+        .. note:: Not supported on buckets of a datatype bucket type.
+
+        :rtype: :class:`~riak.prepared.PreparedGet`
+        """
+        from riak.prepared import PreparedGet
+        return PreparedGet(self, r=r, pr=pr, timeout=timeout,
+                           basic_quorum=basic_quorum,
+                           notfound_ok=notfound_ok, head_only=head_only)
+
+    def prepare_put(self, w=None, dw=None, pw=None, return_body=True,
+                    if_none_match=False, timeout=None):
+        """
+        Prepares a store with fixed options, for repeatedly storing
+        objects into this bucket. On the Protocol Buffers transport
+        the options and bucket are serialized once, and each call only
+        encodes the object's key, vclock and content. See
+        :meth:`RiakObject.store() <riak.riak_object.RiakObject.store>`
+        for the options.
+
+        .. note:: Not supported on buckets of a datatype bucket type.
+
+        :rtype: :class:`~riak.prepared.PreparedPut`
+        """
+        from riak.prepared import PreparedPut
+        return PreparedPut(self, w=w, dw=dw, pw=pw, return_body=return_body,
+                           if_none_match=if_none_match, timeout=timeout)
+
+    def prepare_delete(self, rw=None, r=None, w=None, dw=None, pr=None,
+                       pw=None, timeout=None):
+        """
+        Prepares a delete with fixed options, for repeatedly deleting
+        keys from this bucket. On the Protocol Buffers transport the
+        request is serialized once, and each call only encodes the
+        key. See :meth:`RiakClient.delete()
+        <riak.client.RiakClient.delete>` for the options.
+
+        .. note:: Not supported on buckets of a datatype bucket type.
+
+        :rtype: :class:`~riak.prepared.PreparedDelete`
+        """
+        from riak.prepared import PreparedDelete
+        return PreparedDelete(self, rw=rw, r=r, w=w, dw=dw, pr=pr, pw=pw,
+                              timeout=timeout)
+
     def get_counter(self, key, **kwargs):
         """
         Gets the value of a counter stored in this bucket. See
@@ -17,13 +17,16 @@ try:
 except ImportError:
     import json
 
+import gzip
 import random
+import zlib
 
 from weakref import WeakValueDictionary
 
 from riak.bucket import BucketType, RiakBucket
 from riak.client.multi import MultiGetPool, MultiPutPool
 from riak.client.operations import RiakClientOperations
+from riak.datatypes.context_cache import ContextCache
 from riak.mapreduce import RiakMapReduceChain
 from riak.node import RiakNode
 from riak.resolver import default_resolver
@@ -33,6 +36,31 @@ from riak.transports.http import HttpPool
 from riak.transports.tcp import TcpPool
 from riak.util import bytes_to_str, lazy_property, str_to_bytes
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 
 def default_encoder(obj):
     """
@@ -72,6 +100,59 @@ def binary_encoder_decoder(obj):
     return obj
 
 
+def fast_json_encoder(obj):
+    """
+    Encoder for JSON datatypes using orjson or ujson, whichever is
+    installed. The output is compact, without whitespace between
+    elements.
+    """
+    if isinstance(obj, bytes):
+        obj = bytes_to_str(obj)
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        return ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def fast_json_decoder(obj):
+    """
+    Decoder from JSON datatypes using orjson or ujson, whichever is
+    installed.
+    """
+    if orjson is not None:
+        return orjson.loads(obj)
+    else:
+        return ujson.loads(bytes_to_str(obj))
+
+
+def msgpack_encoder(obj):
+    """
+    Encoder for MessagePack datatypes.
+    """
+    return msgpack.packb(obj, use_bin_type=True)
+
+
+def msgpack_decoder(obj):
+    """
+    Decoder from MessagePack datatypes.
+    """
+    return msgpack.unpackb(obj, raw=False)
+
+
+def _compressors():
+    """
+    Returns the compressors available for each content encoding, as
+    (compress, decompress) function pairs.
+    """
+    compressors = {"gzip": (gzip.compress, gzip.decompress),
+                   "deflate": (zlib.compress, zlib.decompress)}
+    if lz4 is not None:
+        compressors["lz4"] = (lz4.frame.compress, lz4.frame.decompress)
+    if zstandard is not None:
+        compressors["zstd"] = (zstandard.compress, zstandard.decompress)
+    return compressors
+
+
 class RiakClient(RiakMapReduceChain, RiakClientOperations):
     """
     The ``RiakClient`` object holds information necessary to connect
@@ -82,9 +163,14 @@ class RiakClient(RiakMapReduceChain, RiakClientOperations):
     #: The supported protocols
     PROTOCOLS = ["http", "pbc"]
 
+    #: The :class:`~riak.datatypes.context_cache.ContextCache` of the
+    #: client, if it was given a ``context_cache_ttl``
+    context_cache = None
+
     def __init__(self, protocol="pbc", transport_options={},
                  nodes=None, credentials=None,
                  multiget_pool_size=None, multiput_pool_size=None,
+                 fast_json=False, compression=False, context_cache_ttl=None,
                  **kwargs):
         """
         Construct a new ``RiakClient`` object.
@@ -108,6 +194,21 @@ class RiakClient(RiakMapReduceChain, RiakClientOperations):
            :meth:`multiput` operations. Defaults to a factor of the number of
            CPUs in the system
         :type multiput_pool_size: int
+        :param fast_json: whether to encode and decode JSON values with
+           orjson or ujson, if either is installed, instead of the
+           standard library
+        :type fast_json: bool
+        :param compression: whether to compress and decompress values
+           according to their ``content_encoding`` with the built-in
+           compressors. Otherwise only those registered with
+           :meth:`set_compressor` are applied, and values are stored as
+           given, as in earlier versions.
+        :type compression: bool
+        :param context_cache_ttl: how long in seconds to keep the
+           contexts of fetched and updated datatypes in a
+           :attr:`context_cache`, so that elements can be removed
+           without fetching first. Contexts are not cached by default.
+        :type context_cache_ttl: int, float, None
         """
         kwargs = kwargs.copy()
 
@@ -132,9 +233,22 @@ class RiakClient(RiakMapReduceChain, RiakClientOperations):
                           "text/json": binary_json_decoder,
                           "text/plain": bytes_to_str,
                           "binary/octet-stream": binary_encoder_decoder}
+        if fast_json and (orjson is not None or ujson is not None):
+            for content_type in ("application/json", "text/json"):
+                self._encoders[content_type] = fast_json_encoder
+                self._decoders[content_type] = fast_json_decoder
+        if msgpack is not None:
+            self._encoders["application/x-msgpack"] = msgpack_encoder
+            self._decoders["application/x-msgpack"] = msgpack_decoder
+        self._compressors = _compressors() if compression else {}
+        # Bumped whenever a serializer changes, to invalidate the
+        # serializers cached by each bucket
+        self._serializers_version = 0
         self._buckets = WeakValueDictionary()
         self._bucket_types = WeakValueDictionary()
         self._tables = WeakValueDictionary()
+        if context_cache_ttl:
+            self.context_cache = ContextCache(context_cache_ttl)
 
     def __del__(self):
         self.close()
@@ -211,6 +325,7 @@ class RiakClient(RiakMapReduceChain, RiakClientOperations):
         :type encoder: function
         """
         self._encoders[content_type] = encoder
+        self._serializers_version += 1
 
     def get_decoder(self, content_type):
         """
@@ -233,6 +348,38 @@ class RiakClient(RiakMapReduceChain, RiakClientOperations):
         :type decoder: function
         """
         self._decoders[content_type] = decoder
+        self._serializers_version += 1
+
+    def get_compressor(self, content_encoding):
+        """
+        Get the compression functions for the provided content
+        encoding. ``gzip`` and ``deflate`` are always available, and
+        ``lz4`` and ``zstd`` when the ``lz4`` or ``zstandard`` packages
+        are installed.
+
+        :param content_encoding: the requested content encoding
+        :type content_encoding: str
+        :rtype: tuple of (compress, decompress) functions, or None
+        """
+        return self._compressors.get(content_encoding)
+
+    def set_compressor(self, content_encoding, compress, decompress):
+        """
+        Set the compression functions for the provided content
+        encoding. Object values whose ``content_encoding`` matches are
+        compressed after encoding, and decompressed before decoding.
+
+        :param content_encoding: the requested content encoding
+        :type content_encoding: str
+        :param compress: a compression function, takes encoded data and
+            returns compressed data
+        :type compress: function
+        :param decompress: a decompression function, takes compressed
+            data and returns encoded data
+        :type decompress: function
+        """
+        self._compressors[content_encoding] = (compress, decompress)
+        self._serializers_version += 1
 
     def bucket(self, name, bucket_type="default"):
         """
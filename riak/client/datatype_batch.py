@@ -0,0 +1,203 @@
+# Copyright 2010-present Basho Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock, Thread
+from time import monotonic
+
+from riak.client.multi import POOL_SIZE
+
+#: The number of datatypes with pending operations at which a batch
+#: is flushed
+FLUSH_EVERY = 1000
+
+
+class DatatypeBatch(object):
+    """
+    Accumulates the staged operations of many datatypes and sends
+    them to Riak in bulk. Operations on the same key are merged into a
+    single update, so that increments of a counter are summed and
+    adds to a set are combined, and the updates are sent concurrently
+    over a bounded number of connections whenever ``flush_every`` keys
+    have pending operations, when the oldest pending operation is
+    ``max_latency_ms`` old, and when the batch is closed. Example::
+
+        with client.datatype_batch(flush_every=500,
+                                   max_latency_ms=100) as batch:
+            for name in page_views:
+                counter = bucket.new(name)
+                counter.increment()
+                batch.add(counter)
+
+        for (bucket_type, bucket, key), err in batch.errors.items():
+            log_failure(bucket_type, bucket, key, err)
+
+    As updates of datatypes are not idempotent, those which fail are
+    not retried, but reported in :attr:`errors`.
+
+    Batches are obtained from :meth:`RiakClient.datatype_batch
+    <riak.client.RiakClient.datatype_batch>`, whose quorum and timeout
+    options are passed on to each update. Use the batch as a context
+    manager, or call :meth:`close` when done, so that the last
+    operations are sent and its threads stopped.
+    """
+    def __init__(self, client, flush_every=FLUSH_EVERY, max_latency_ms=None,
+                 concurrency=None, **params):
+        if flush_every < 1:
+            raise ValueError("flush_every must be a positive integer")
+        if max_latency_ms is not None and max_latency_ms <= 0:
+            raise ValueError("max_latency_ms must be a positive number")
+        self.client = client
+        self.flush_every = flush_every
+        self.max_latency_ms = max_latency_ms
+        self.concurrency = concurrency or POOL_SIZE
+        self.params = params
+        self.errors = {}
+        self._pending = {}
+        self._since = None
+        self._lock = Lock()
+        self._flushing = Lock()
+        self._closed = Event()
+        self._executor = None
+        self._timer = None
+
+    errors = None
+    """
+    The errors raised by the updates sent so far, as a dict of
+    exceptions keyed by (bucket_type, bucket, key) tuples.
+    """
+
+    def add(self, datatype):
+        """
+        Adds the staged operations of a datatype to the batch, merging
+        them with any pending operations on the same key, then clears
+        them from the datatype, as :meth:`Datatype.update
+        <riak.datatypes.Datatype.update>` would. The most recent
+        context given for a key is sent with its update.
+
+        :param datatype: the datatype with staged operations
+        :type datatype: :class:`~riak.datatypes.Datatype`
+        """
+        if not datatype.bucket:
+            raise ValueError("bucket property not assigned")
+        if not datatype.key:
+            raise ValueError("key property not assigned")
+        if not datatype.modified:
+            raise ValueError("No operation to perform")
+
+        ident = (datatype.bucket.bucket_type.name, datatype.bucket.name,
+                 datatype.key)
+        with self._lock:
+            if self._closed.is_set():
+                raise ValueError("Datatype batch has been closed")
+            pending = self._pending.get(ident)
+            if pending is None:
+                pending = datatype.__class__(datatype.bucket, datatype.key)
+                self._pending[ident] = pending
+                if self._since is None:
+                    self._since = monotonic()
+            elif pending.__class__ is not datatype.__class__:
+                raise TypeError("Expected datatype {} but got datatype "
+                                "{}".format(pending.__class__,
+                                            datatype.__class__))
+            pending._merge(datatype)
+            if datatype._context:
+                pending._context = datatype._context
+            full = len(self._pending) >= self.flush_every
+        datatype.clear()
+
+        if self.max_latency_ms is not None and self._timer is None:
+            self._start_timer()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """
+        Sends the pending operations, waiting until they have been
+        applied. Errors are also added to :attr:`errors`.
+
+        :rtype: dict of exceptions keyed by (bucket_type, bucket, key)
+        """
+        with self._flushing:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._since = None
+            if not pending:
+                return {}
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.concurrency)
+
+            errors = {}
+            results = self._executor.map(self._send, pending.values())
+            for ident, err in zip(pending, results):
+                if err is not None:
+                    errors[ident] = err
+            self.errors.update(errors)
+            return errors
+
+    def close(self):
+        """
+        Sends the pending operations and releases the threads of the
+        batch. No operations may be added afterwards.
+        """
+        with self._lock:
+            self._closed.set()
+        try:
+            self.flush()
+        finally:
+            if self._timer is not None:
+                self._timer.join()
+            if self._executor is not None:
+                self._executor.shutdown()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _send(self, datatype):
+        try:
+            self.client.update_datatype(datatype, **self.params)
+        except Exception as err:
+            return err
+
+    def _start_timer(self):
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = Thread(target=self._flush_when_due,
+                                 name="riak.client.datatype-batch")
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_when_due(self):
+        latency = self.max_latency_ms / 1000.0
+        wait = latency
+        while not self._closed.wait(wait):
+            since = self._since
+            if since is None:
+                wait = latency
+            elif monotonic() - since >= latency:
+                self.flush()
+                wait = latency
+            else:
+                wait = since + latency - monotonic()
+
+    def __repr__(self):
+        return "<{!s} pending={!r}>".format(self.__class__.__name__,
+                                            len(self._pending))
@@ -18,6 +18,15 @@ from collections import namedtuple, Sequence
 CONTINUATION = namedtuple("Continuation", ["c"])
 
 
+class BufferedResults(list):
+    """
+    The results of a streamed index page which have been read into
+    memory, and so have no connection to close.
+    """
+    def close(self):
+        pass
+
+
 class IndexPage(Sequence, object):
     """
     Encapsulates a single page of results from a secondary index
@@ -40,6 +49,7 @@ class IndexPage(Sequence, object):
         self.max_results = max_results
         self.results = None
         self.stream = False
+        self.raw = False
         self.term_regex = term_regex
 
     continuation = None
@@ -145,10 +155,29 @@ class IndexPage(Sequence, object):
                 "term_regex": self.term_regex}
 
         if self.stream:
+            if self.raw:
+                args["raw"] = True
             return self.client.stream_index(**args)
         else:
             return self.client.get_index(**args)
 
+    def buffer(self):
+        """
+        Reads the rest of a streamed page into memory and releases its
+        connection, capturing the continuation. The page is still
+        iterated as a stream.
+        """
+        if self.stream:
+            results = BufferedResults()
+            try:
+                for result in self.results:
+                    if isinstance(result, CONTINUATION):
+                        self.continuation = result.c
+                    results.append(result)
+            finally:
+                self.results.close()
+            self.results = results
+
     def _has_results(self):
         """
         When not streaming, have results been assigned?
@@ -169,10 +198,13 @@ class IndexPage(Sequence, object):
         when an equality query is used with return_terms.
         """
         if self._should_inject_term(result):
+            term = self.startkey
+            if self.raw:
+                term = str(term).encode("utf-8")
             if type(result) is list:
-                return [(self.startkey, r) for r in result]
+                return [(term, r) for r in result]
             else:
-                return (self.startkey, result)
+                return (term, result)
         else:
             return result
 
@@ -0,0 +1,251 @@
+# Copyright 2010-present Basho Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from os.path import commonprefix
+from threading import Event, Thread
+
+from riak.client.index_page import CONTINUATION
+
+from queue import Queue, Full
+
+#: The number of characters after the common prefix of a binary range
+#: that are used to split it
+SPLIT_WIDTH = 3
+
+# One more than the largest code point
+CODE_POINTS = 0x110000
+
+# The number of chunks of results buffered for each sub-range
+QUEUE_SIZE = 2
+
+
+def split_index_range(index, startkey, endkey, partitions):
+    """
+    Splits a secondary index range query into at most ``partitions``
+    contiguous sub-ranges which do not overlap. Integer ranges are
+    split evenly, binary ranges by interpolating the characters
+    following the prefix common to both ends. Equality queries and
+    other indexes are not split.
+
+    :param index: the index to query
+    :type index: string
+    :param startkey: the beginning of the query range
+    :type startkey: string, integer
+    :param endkey: the end of the query range, or None for equality
+    :type endkey: string, integer
+    :param partitions: the number of sub-ranges to split into
+    :type partitions: int
+    :rtype: list of (startkey, endkey) tuples
+    """
+    if partitions < 1:
+        raise ValueError("partitions must be a positive integer")
+    if endkey is None or partitions == 1:
+        return [(startkey, endkey)]
+
+    if index.endswith("_int"):
+        start, end = int(startkey), int(endkey)
+        if start >= end:
+            return [(startkey, endkey)]
+        size = end - start + 1
+        bounds = sorted(set(start + size * i // partitions
+                            for i in range(partitions)))
+        bounds.append(end + 1)
+        return [(lo, hi - 1) for lo, hi in zip(bounds, bounds[1:])]
+    elif index.endswith("_bin") or index == "$key":
+        ranges = []
+        lo = startkey
+        for bound in _split_strings(startkey, endkey, partitions):
+            ranges.append((lo, bound))
+            # The smallest term greater than the bound
+            lo = bound + "\x00"
+        ranges.append((lo, endkey))
+        return ranges
+    else:
+        return [(startkey, endkey)]
+
+
+def _split_strings(start, end, partitions):
+    """
+    Returns up to ``partitions - 1`` strings in increasing order which
+    lie strictly between ``start`` and ``end``. Strings are compared by
+    code point, which is the order of their UTF-8 encoded terms.
+    """
+    prefix = commonprefix([start, end])
+
+    def _value(s):
+        tail = [ord(c) for c in s[len(prefix):len(prefix) + SPLIT_WIDTH]]
+        tail.extend([0] * (SPLIT_WIDTH - len(tail)))
+        value = 0
+        for digit in tail:
+            value = value * CODE_POINTS + digit
+        return value
+
+    def _string(value):
+        chars = []
+        for _ in range(SPLIT_WIDTH):
+            value, digit = divmod(value, CODE_POINTS)
+            if 0xD800 <= digit <= 0xDFFF:
+                # Surrogates can't be encoded, take the next code point
+                digit = 0xE000
+            chars.append(chr(digit))
+        return prefix + "".join(reversed(chars)).rstrip("\x00")
+
+    lo, hi = _value(start), _value(end)
+    bounds = []
+    for i in range(1, partitions):
+        bound = _string(lo + (hi - lo) * i // partitions)
+        # Prefer the shortest bound that still splits the range
+        for size in range(len(prefix) + 1, len(bound)):
+            if bound[:size] > start and \
+                    (not bounds or bound[:size] > bounds[-1]):
+                bound = bound[:size]
+                break
+        if start < bound < end and (not bounds or bound > bounds[-1]):
+            bounds.append(bound)
+    return bounds
+
+
+class IndexScan(object):
+    """
+    Streams the results of a secondary index query which is split into
+    sub-ranges, each of which is streamed over its own connection at
+    the same time. Iterating yields lists of keys or index/key pairs,
+    as they arrive from any sub-range, or in the order of the
+    sub-ranges if ``ordered`` is set, in which case the later
+    sub-ranges are held back once a few of their results are
+    buffered.
+
+    A scan is returned by :meth:`RiakClient.parallel_index_scan
+    <riak.client.RiakClient.parallel_index_scan>` or
+    :meth:`RiakBucket.parallel_index_scan
+    <riak.bucket.RiakBucket.parallel_index_scan>`, which split the
+    queried range into the sub-ranges given as ``ranges``. They are
+    only queried once iteration starts; call :meth:`close` to stop a
+    scan which is not iterated to the end.
+    """
+    def __init__(self, client, bucket, index, ranges, ordered=False,
+                 return_terms=None, max_results=None, timeout=None,
+                 term_regex=None):
+        self.client = client
+        self.bucket = bucket
+        self.index = index
+        self.ranges = ranges
+        self.ordered = ordered
+        self.return_terms = return_terms
+        self.max_results = max_results
+        self.timeout = timeout
+        self.term_regex = term_regex
+        self._stop = Event()
+        self._threads = []
+
+    continuation = None
+    """
+    After iterating, the sub-ranges which have more results when
+    ``max_results`` is given, as a list of (startkey, endkey,
+    continuation) tuples. It can be passed as the ``continuation`` of
+    :meth:`~riak.client.RiakClient.parallel_index_scan` to fetch the
+    next results of each of them.
+    """
+
+    def has_next_page(self):
+        """
+        Whether any of the sub-ranges has more results.
+        """
+        return self.continuation is not None
+
+    def __iter__(self):
+        if self._threads:
+            raise ValueError("Index scan has already been iterated")
+
+        shared = Queue(maxsize=QUEUE_SIZE * len(self.ranges))
+        queues = [Queue(maxsize=QUEUE_SIZE) if self.ordered else shared
+                  for _ in self.ranges]
+        continuations = [None] * len(self.ranges)
+        for i, (startkey, endkey, continuation) in enumerate(self.ranges):
+            thread = Thread(target=self._scan,
+                            args=(i, startkey, endkey, continuation,
+                                  queues[i]),
+                            name=f"riak.client.index-scan-{i}")
+            thread.daemon = True
+            self._threads.append(thread)
+            thread.start()
+
+        try:
+            if self.ordered:
+                for queue in queues:
+                    for chunk in self._drain(queue, 1, continuations):
+                        yield chunk
+            else:
+                for chunk in self._drain(shared, len(queues),
+                                         continuations):
+                    yield chunk
+        finally:
+            self.close()
+
+        self.continuation = [
+            (startkey, endkey, continuation)
+            for (startkey, endkey, _), continuation
+            in zip(self.ranges, continuations)
+            if continuation is not None] or None
+
+    def _drain(self, queue, remaining, continuations):
+        while remaining:
+            item = queue.get()
+            if item[0] == "chunk":
+                yield item[1]
+            elif item[0] == "done":
+                continuations[item[1]] = item[2]
+                remaining -= 1
+            else:
+                raise item[1]
+
+    def _scan(self, i, startkey, endkey, continuation, queue):
+        def _put(item):
+            # Blocks while the queue is full, unless the scan is closed
+            while not self._stop.is_set():
+                try:
+                    queue.put(item, timeout=0.25)
+                    return True
+                except Full:
+                    continue
+            return False
+
+        try:
+            page = self.client.stream_index(
+                self.bucket, self.index, startkey, endkey,
+                return_terms=self.return_terms,
+                max_results=self.max_results, continuation=continuation,
+                timeout=self.timeout, term_regex=self.term_regex)
+            continuation = None
+            try:
+                for result in page.results:
+                    if isinstance(result, CONTINUATION):
+                        continuation = result.c
+                    elif not _put(("chunk", page._inject_term(result))):
+                        return
+            finally:
+                page.close()
+            _put(("done", i, continuation))
+        except Exception as err:
+            _put(("error", err))
+
+    def close(self):
+        """
+        Stops streaming the sub-ranges. Their connections are released
+        in the background once the streams in progress have finished.
+        """
+        self._stop.set()
+
+    def __repr__(self):
+        return "<{!s} {!r}>".format(self.__class__.__name__, self.ranges)
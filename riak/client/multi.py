@@ -15,13 +15,14 @@
 
 from collections import namedtuple
 from multiprocessing import cpu_count
-from threading import Event, Lock, Thread
+from threading import Event, Lock, Semaphore, Thread
 from riak.riak_object import RiakObject
 from riak.ts_object import TsObject
 
-from queue import Queue, Empty
+from queue import Queue, Empty, Full
 
-__all__ = ["multiget", "multiput", "MultiGetPool", "MultiPutPool"]
+__all__ = ["multiget", "multiput", "multistream", "prefetch",
+           "MultiGetPool", "MultiPutPool"]
 
 
 try:
@@ -313,3 +314,194 @@ def multiput(client, objs, **options):
             pool.stop()
 
     return results
+
+
+def multistream(fn, items, size=POOL_SIZE, ordered=False):
+    """Applies a function to each item of an iterable across a bounded
+    set of threads, yielding the results in the order they complete,
+    or in the order of the items if ``ordered`` is set. This is a
+    generator method which should be iterated over.
+
+    The iterable is consumed on a separate thread and may itself be a
+    stream, such as the keys of a :meth:`RiakClient.ts_stream_keys
+    <riak.client.RiakClient.ts_stream_keys>` request. At most ``size``
+    items are queued for the workers and at most ``size`` results are
+    buffered for the caller, so a slow consumer slows the stream
+    rather than accumulating results in memory. When ordered, at most
+    ``2 * size`` items are in progress or waiting for an earlier
+    result at once.
+
+    If the iterable or the function raises an exception, it is
+    re-raised to the caller and the remaining work is abandoned.
+    Closing the generator early also stops the workers and closes the
+    iterable, if it has a ``close()`` method.
+
+    :param fn: the function to apply to each item
+    :type fn: function
+    :param items: the items to process
+    :type items: iterable
+    :param size: the number of worker threads
+    :type size: int
+    :param ordered: whether to yield the results in the order of the
+       items
+    :type ordered: bool
+    :rtype: iterator
+    """
+    inq = Queue(maxsize=size)
+    outq = Queue(maxsize=size)
+    stop = Event()
+    slots = Semaphore(2 * size)
+    done = object()
+
+    def _put(queue, item):
+        # Blocks while the queue is full, unless the consumer has gone
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=0.25)
+                return True
+            except Full:
+                continue
+        return False
+
+    def _claim():
+        # Blocks while too many results are out of order
+        while not stop.is_set():
+            if slots.acquire(timeout=0.25):
+                return True
+        return False
+
+    def _feed():
+        try:
+            for seq, item in enumerate(items):
+                if ordered and not _claim():
+                    break
+                if not _put(inq, (seq, item)):
+                    break
+        except Exception as err:
+            _put(outq, (False, None, err))
+        finally:
+            if hasattr(items, "close"):
+                items.close()
+            for _ in range(size):
+                _put(inq, done)
+
+    def _work():
+        try:
+            while not stop.is_set():
+                try:
+                    task = inq.get(timeout=0.25)
+                except Empty:
+                    continue
+                if task is done:
+                    break
+                seq, item = task
+                try:
+                    result = (True, seq, fn(item))
+                except Exception as err:
+                    result = (False, seq, err)
+                _put(outq, result)
+        finally:
+            _put(outq, done)
+
+    feeder = Thread(target=_feed, name="riak.client.multi-stream-feeder")
+    workers = [Thread(target=_work, name=f"riak.client.multi-stream-{i}")
+               for i in range(size)]
+    for thread in [feeder] + workers:
+        thread.daemon = True
+        thread.start()
+
+    try:
+        remaining = size
+        pending = {}
+        expected = 0
+        while remaining:
+            result = outq.get()
+            if result is done:
+                remaining -= 1
+            elif not result[0]:
+                raise result[2]
+            elif not ordered:
+                yield result[2]
+            else:
+                pending[result[1]] = result[2]
+                while expected in pending:
+                    value = pending.pop(expected)
+                    expected += 1
+                    slots.release()
+                    yield value
+    finally:
+        stop.set()
+        # NB: the feeder is not joined, as it may be blocked waiting on
+        # the next item of a stream; it exits as soon as that arrives
+        for worker in workers:
+            worker.join()
+
+
+def prefetch(items, size=1):
+    """Iterates over an iterable on a separate thread, fetching up to
+    ``size`` items ahead of the caller, so that producing the next
+    items overlaps with consuming the current one. This is a generator
+    method which should be iterated over.
+
+    If the iterable raises an exception, it is re-raised to the caller
+    once the items before it have been consumed. Closing the generator
+    early stops the thread and closes the iterable, if it has a
+    ``close()`` method, along with any items which were fetched but not
+    consumed and have a ``close()`` method.
+
+    :param items: the items to fetch
+    :type items: iterable
+    :param size: the number of items to fetch ahead
+    :type size: int
+    :rtype: iterator
+    """
+    queue = Queue(maxsize=size)
+    stop = Event()
+    done = object()
+
+    def _put(item):
+        # Blocks while the queue is full, unless the consumer has gone
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=0.25)
+                return True
+            except Full:
+                continue
+        if hasattr(item[1], "close"):
+            item[1].close()
+        return False
+
+    def _fetch():
+        try:
+            for item in items:
+                if not _put((True, item)):
+                    break
+            else:
+                _put((True, done))
+        except Exception as err:
+            _put((False, err))
+        finally:
+            if hasattr(items, "close"):
+                items.close()
+
+    fetcher = Thread(target=_fetch, name="riak.client.multi-prefetch")
+    fetcher.daemon = True
+    fetcher.start()
+
+    try:
+        while True:
+            ok, item = queue.get()
+            if not ok:
+                raise item
+            elif item is done:
+                break
+            yield item
+    finally:
+        stop.set()
+        while True:
+            try:
+                ok, item = queue.get_nowait()
+            except Empty:
+                break
+            if ok and hasattr(item, "close"):
+                item.close()
@@ -22,6 +22,7 @@ from riak.client.transport import (
     RiakClientTransport,
 )
 from riak.datatypes import TYPES
+from riak.mapreduce import compile_key_filters
 from riak.table import Table
 from riak.util import bytes_to_str
 
@@ -193,7 +194,8 @@ class RiakClientOperations(RiakClientTransport):
 
     def paginate_index(self, bucket, index, startkey, endkey=None,
                        max_results=1000, return_terms=None,
-                       continuation=None, timeout=None, term_regex=None):
+                       continuation=None, timeout=None, term_regex=None,
+                       prefetch=0):
         """
         Iterates over a paginated index query. This is equivalent to calling
         :meth:`get_index` and then successively calling
@@ -203,6 +205,11 @@ class RiakClientOperations(RiakClientTransport):
         Because limiting the result set is necessary to invoke pagination,
         the ``max_results`` option has a default of ``1000``.
 
+        With ``prefetch``, up to that many of the following pages are
+        fetched on a background thread while the current page is
+        consumed, each as soon as the continuation of the page before
+        it is known.
+
         :param bucket: the bucket whose index will be queried
         :type bucket: RiakBucket
         :param index: the index to query
@@ -223,23 +230,29 @@ class RiakClientOperations(RiakClientTransport):
         :type timeout: int
         :param term_regex: a regular expression used to filter index terms
         :type term_regex: string
+        :param prefetch: the number of pages to fetch in the background
+            ahead of the page being consumed, defaults to none
+        :type prefetch: integer
         :rtype: generator over instances of
           :class:`~riak.client.index_page.IndexPage`
 
         """
-        page = self.get_index(bucket, index, startkey,
-                              endkey=endkey, max_results=max_results,
-                              return_terms=return_terms,
-                              continuation=continuation,
-                              timeout=timeout, term_regex=term_regex)
-        yield page
-        while page.has_next_page():
-            page = page.next_page()
+        def _pages():
+            page = self.get_index(bucket, index, startkey,
+                                  endkey=endkey, max_results=max_results,
+                                  return_terms=return_terms,
+                                  continuation=continuation,
+                                  timeout=timeout, term_regex=term_regex)
             yield page
+            while page.has_next_page():
+                page = page.next_page()
+                yield page
+
+        return _prefetch_pages(_pages(), prefetch)
 
     def stream_index(self, bucket, index, startkey, endkey=None,
                      return_terms=None, max_results=None, continuation=None,
-                     timeout=None, term_regex=None):
+                     timeout=None, term_regex=None, raw=False):
         """
         Queries a secondary index, streaming matching keys through an
         iterator.
@@ -283,6 +296,9 @@ class RiakClientOperations(RiakClientTransport):
         :type timeout: int
         :param term_regex: a regular expression used to filter index terms
         :type term_regex: string
+        :param raw: whether to yield keys and terms as the bytes
+          received, rather than decoding them
+        :type raw: boolean
         :rtype: :class:`~riak.client.index_page.IndexPage`
 
         """
@@ -293,19 +309,20 @@ class RiakClientOperations(RiakClientTransport):
         page = IndexPage(self, bucket, index, startkey, endkey,
                          return_terms, max_results, term_regex)
         page.stream = True
+        page.raw = raw
         resource = self._acquire()
         transport = resource.object
         page.results = transport.stream_index(
             bucket, index, startkey, endkey, return_terms=return_terms,
             max_results=max_results, continuation=continuation,
-            timeout=timeout, term_regex=term_regex)
+            timeout=timeout, term_regex=term_regex, raw=raw)
         page.results.attach(resource)
         return page
 
     def paginate_stream_index(self, bucket, index, startkey, endkey=None,
                               max_results=1000, return_terms=None,
                               continuation=None, timeout=None,
-                              term_regex=None):
+                              term_regex=None, prefetch=0):
         """
         Iterates over a streaming paginated index query. This is equivalent to
         calling :meth:`stream_index` and then successively calling
@@ -315,6 +332,12 @@ class RiakClientOperations(RiakClientTransport):
         Because limiting the result set is necessary to invoke
         pagination, the ``max_results`` option has a default of ``1000``.
 
+        With ``prefetch``, up to that many of the following pages are
+        streamed into memory on a background thread while the current
+        page is consumed. As the continuation of a streamed page is
+        only known once it has been read in full, each page is then
+        fetched as soon as the page before it has arrived.
+
         The caller should explicitly close each yielded page, either using
         :func:`contextlib.closing` or calling ``close()`` explicitly. Consuming
         the entire page will also close the stream. If it does not, the
@@ -356,23 +379,171 @@ class RiakClientOperations(RiakClientTransport):
         :type timeout: int
         :param term_regex: a regular expression used to filter index terms
         :type term_regex: string
+        :param prefetch: the number of pages to fetch in the background
+            ahead of the page being consumed, defaults to none
+        :type prefetch: integer
         :rtype: generator over instances of
           :class:`~riak.client.index_page.IndexPage`
 
         """
         # TODO FUTURE: implement "retry on connection closed"
         # as in stream_mapred
-        page = self.stream_index(bucket, index, startkey,
-                                 endkey=endkey,
-                                 max_results=max_results,
-                                 return_terms=return_terms,
-                                 continuation=continuation,
-                                 timeout=timeout,
-                                 term_regex=term_regex)
-        yield page
-        while page.has_next_page():
-            page = page.next_page()
+        def _pages():
+            page = self.stream_index(bucket, index, startkey,
+                                     endkey=endkey,
+                                     max_results=max_results,
+                                     return_terms=return_terms,
+                                     continuation=continuation,
+                                     timeout=timeout,
+                                     term_regex=term_regex)
+            if prefetch:
+                page.buffer()
             yield page
+            while page.has_next_page():
+                page = page.next_page()
+                if prefetch:
+                    page.buffer()
+                yield page
+
+        return _prefetch_pages(_pages(), prefetch)
+
+    def parallel_index_scan(self, bucket, index, startkey, endkey=None,
+                            partitions=4, ordered=False, return_terms=None,
+                            max_results=None, continuation=None,
+                            timeout=None, term_regex=None):
+        """
+        Queries a secondary index range by splitting it into
+        sub-ranges and streaming them over separate connections at the
+        same time. Integer (``_int``) ranges are split evenly, binary
+        (``_bin`` and ``$key``) ranges by their terms, so the
+        sub-ranges hold similar numbers of results only when the terms
+        are spread evenly. Equality queries are not split.
+
+        Iterating over the returned
+        :class:`~riak.client.index_scan.IndexScan` yields lists of keys
+        or index/key pairs, like :meth:`stream_index`. Unless
+        ``ordered`` is set, the results of the sub-ranges are
+        interleaved as they arrive. Example::
+
+            scan = client.parallel_index_scan(mybucket, 'age_int', 0, 150,
+                                              partitions=8)
+            for keys in scan:
+                do_something(keys)
+
+        When ``max_results`` is given, each sub-range returns at most
+        that many results, and the continuation of those which have
+        more is kept in the scan's
+        :attr:`~riak.client.index_scan.IndexScan.continuation`, which
+        can be passed back to fetch the next results.
+
+        :param bucket: the bucket whose index will be queried
+        :type bucket: RiakBucket
+        :param index: the index to query
+        :type index: string
+        :param startkey: the sole key to query, or beginning of the query range
+        :type startkey: string, integer
+        :param endkey: the end of the query range (optional if equality)
+        :type endkey: string, integer
+        :param partitions: the number of sub-ranges to stream at once
+        :type partitions: integer
+        :param ordered: whether to yield the results of each sub-range
+            in the order of the sub-ranges
+        :type ordered: boolean
+        :param return_terms: whether to include the secondary index value
+        :type return_terms: boolean
+        :param max_results: the maximum number of results to return from
+            each sub-range
+        :type max_results: integer
+        :param continuation: the continuation of a previous scan
+        :type continuation: list
+        :param timeout: a timeout value in milliseconds, or 'infinity'
+        :type timeout: int
+        :param term_regex: a regular expression used to filter index terms
+        :type term_regex: string
+        :rtype: :class:`~riak.client.index_scan.IndexScan`
+        """
+        from riak.client.index_scan import IndexScan, split_index_range
+
+        _validate_timeout(timeout, infinity_ok=True)
+
+        if continuation is not None:
+            ranges = list(continuation)
+        else:
+            ranges = [(start, end, None) for start, end in
+                      split_index_range(index, startkey, endkey,
+                                        partitions)]
+        return IndexScan(self, bucket, index, ranges, ordered=ordered,
+                         return_terms=return_terms, max_results=max_results,
+                         timeout=timeout, term_regex=term_regex)
+
+    def index_fetch(self, bucket, index, startkey, endkey=None,
+                    concurrency=None, head_only=False, timeout=None,
+                    term_regex=None, **params):
+        """
+        Queries a secondary index and fetches the matching objects,
+        feeding the keys from the index stream into fetches via
+        threads as they arrive. This is a generator method which
+        should be iterated over.
+
+        Objects are yielded in the order their fetches complete. Like
+        :meth:`multiget`, a key whose fetch fails is yielded as a tuple
+        of the bucket type name, bucket name, key and the exception
+        raised, instead of an object. Example::
+
+            for obj in client.index_fetch(mybucket, 'age_int', 18, 30):
+                if isinstance(obj, tuple):
+                    handle_error(obj)
+                else:
+                    do_something(obj)
+
+        Only a few keys and objects are buffered at a time, so a slow
+        consumer slows down the index stream. Closing the generator
+        early stops the index stream and the outstanding fetches.
+
+        :param bucket: the bucket whose index will be queried
+        :type bucket: RiakBucket
+        :param index: the index to query
+        :type index: string
+        :param startkey: the sole key to query, or beginning of the query range
+        :type startkey: string, integer
+        :param endkey: the end of the query range (optional if equality)
+        :type endkey: string, integer
+        :param concurrency: the number of objects to fetch at a time.
+           Defaults to :data:`riak.client.multi.POOL_SIZE`
+        :type concurrency: int
+        :param head_only: whether to fetch without the values of the
+           objects
+        :type head_only: bool
+        :param timeout: a timeout value in milliseconds for the index
+           query, or 'infinity'
+        :type timeout: int
+        :param term_regex: a regular expression used to filter index terms
+        :type term_regex: string
+        :param params: additional request flags for the fetches, e.g. r, pr
+        :type params: dict
+        :rtype: iterator
+        """
+        _validate_timeout(timeout, infinity_ok=True)
+
+        def _keys():
+            page = self.stream_index(bucket, index, startkey, endkey,
+                                     timeout=timeout, term_regex=term_regex)
+            try:
+                for keys in page.results:
+                    for key in keys:
+                        yield key
+            finally:
+                page.close()
+
+        def _fetch(key):
+            try:
+                return bucket.get(key, head_only=head_only, **params)
+            except Exception as err:
+                return (bucket.bucket_type.name, bucket.name, key, err)
+
+        size = concurrency or riak.client.multi.POOL_SIZE
+        for result in riak.client.multi.multistream(_fetch, _keys(), size):
+            yield result
 
     @retryable
     def get_bucket_props(self, transport, bucket):
@@ -483,11 +654,24 @@ class RiakClientOperations(RiakClientTransport):
 
         return transport.get_keys(bucket, timeout=timeout)
 
-    def stream_keys(self, bucket, timeout=None):
+    def stream_keys(self, bucket, timeout=None, filter=None, raw=False):
         """
         Lists all keys in a bucket via a stream. This is a generator
         method which should be iterated over.
 
+        Given key filters, as a :class:`~riak.mapreduce.RiakKeyFilter`
+        or a list as accepted by
+        :meth:`~riak.mapreduce.RiakMapReduce.add_key_filters`, only the
+        keys which pass them are yielded. The filters are compiled once
+        with :func:`~riak.mapreduce.compile_key_filters` and evaluated
+        on the client, so they work whether or not Riak supports them.
+        A function which takes a key and returns a boolean may be
+        given instead.
+
+        With ``raw``, the keys are yielded as the bytes received, for
+        callers which pass them on without needing strings. Filters
+        cannot be combined with ``raw``.
+
         .. warning:: Do not use this in production, as it requires
            traversing through all keys stored in a cluster.
 
@@ -514,6 +698,11 @@ class RiakClientOperations(RiakClientTransport):
         :type bucket: RiakBucket
         :param timeout: a timeout value in milliseconds
         :type timeout: int
+        :param filter: key filters, or a function which tests each key
+        :type filter: list, :class:`~riak.mapreduce.RiakKeyFilter`,
+          function
+        :param raw: whether to yield the keys as the bytes received
+        :type raw: boolean
         :rtype: iterator
         """
         if not riak.disable_list_exceptions:
@@ -521,11 +710,24 @@ class RiakClientOperations(RiakClientTransport):
 
         _validate_timeout(timeout)
 
+        if raw and filter is not None:
+            raise ValueError("Key filters cannot be applied to raw keys")
+        if filter is not None and not callable(filter):
+            filter = compile_key_filters(filter)
+
         def make_op(transport):
-            return transport.stream_keys(bucket, timeout=timeout)
+            return transport.stream_keys(bucket, timeout=timeout, raw=raw)
 
         for keylist in self._stream_with_retry(make_op):
-            if len(keylist) > 0:
+            if raw:
+                if len(keylist) > 0:
+                    yield list(keylist)
+            elif filter is not None:
+                keylist = [key for key in map(bytes_to_str, keylist)
+                           if filter(key)]
+                if keylist:
+                    yield keylist
+            elif len(keylist) > 0:
                 yield [bytes_to_str(item) for item in keylist]
 
     @retryable
@@ -537,6 +739,12 @@ class RiakClientOperations(RiakClientTransport):
 
         Stores an object in the Riak cluster.
 
+        Over HTTP, the object's ``encoded_data`` may also be a
+        file-like object or an iterator of bytes, which is uploaded
+        with chunked transfer encoding instead of being held in
+        memory. Such a body can only be sent once, so set
+        :attr:`retries` to 0 when uploading one.
+
         .. note:: This request is automatically retried :attr:`retries`
            times if it fails due to network error.
 
@@ -711,6 +919,72 @@ class RiakClientOperations(RiakClientTransport):
         finally:
             stream.close()
 
+    def ts_scan(self, table, timeout=None, concurrency=None):
+        """
+        Fetches every row of a time series table by streaming its keys
+        and fetching the rows in parallel via threads. This is a
+        generator method which should be iterated over.
+
+        .. warning:: Do not use this in production, as it requires
+           traversing through all keys stored in a cluster.
+
+        Rows are yielded in the order their fetches complete, not in
+        key order. Like :meth:`multiget`, a key whose fetch fails is
+        yielded as a tuple of the key and the exception raised,
+        instead of a row. Example::
+
+            for row in client.ts_scan(mytable, concurrency=16):
+                if isinstance(row, tuple):
+                    key, err = row
+                    handle_error(key, err)
+                else:
+                    do_something(row)
+
+        Closing the generator early stops the key stream and the
+        outstanding fetches.
+
+        :param table: the table to scan
+        :type table: string or :class:`Table <riak.table.Table>`
+        :param timeout: a timeout value in milliseconds for the key
+           listing
+        :type timeout: int
+        :param concurrency: the number of rows to fetch at a time.
+           Defaults to :data:`riak.client.multi.POOL_SIZE`
+        :type concurrency: int
+        :rtype: iterator
+        """
+        if not riak.disable_list_exceptions:
+            raise ListError()
+
+        t = table
+        if isinstance(t, str):
+            t = Table(self, table)
+
+        _validate_timeout(timeout)
+
+        def _keys():
+            stream = self.ts_stream_keys(t, timeout)
+            try:
+                for keylist in stream:
+                    for key in keylist:
+                        yield key
+            finally:
+                stream.close()
+
+        def _fetch(key):
+            try:
+                return self.ts_get(t, key)
+            except Exception as err:
+                return (key, err)
+
+        size = concurrency or riak.client.multi.POOL_SIZE
+        for result in riak.client.multi.multistream(_fetch, _keys(), size):
+            if isinstance(result, tuple):
+                yield result
+            else:
+                for row in result.rows:
+                    yield row
+
     @retryable
     def get(self, transport, robj, r=None, pr=None, timeout=None,
             basic_quorum=None, notfound_ok=None, head_only=False):
@@ -749,6 +1023,113 @@ class RiakClientOperations(RiakClientTransport):
                              notfound_ok=notfound_ok,
                              head_only=head_only)
 
+    @retryable
+    def get_many(self, transport, robjs, r=None, pr=None, timeout=None,
+                 basic_quorum=None, notfound_ok=None, head_only=False):
+        """
+        get_many(robjs, r=None, pr=None, timeout=None)
+
+        Fetches the contents of several Riak objects over a single
+        connection. Over HTTP, the requests are pipelined, so that the
+        round trip is paid once per batch of
+        :attr:`~riak.transports.http.connection.HttpConnection.PIPELINE_SIZE`
+        requests rather than once per object. Unlike :meth:`multiget`,
+        no threads are used.
+
+        .. note:: This request is automatically retried :attr:`retries`
+           times if it fails due to network error.
+
+        :param robjs: the objects to fetch
+        :type robjs: list of RiakObject
+        :param r: the read quorum
+        :type r: integer, string, None
+        :param pr: the primary read quorum
+        :type pr: integer, string, None
+        :param timeout: a timeout value in milliseconds
+        :type timeout: int
+        :param basic_quorum: whether to use the "basic quorum" policy
+           for not-founds
+        :type basic_quorum: bool
+        :param notfound_ok: whether to treat not-found responses as successful
+        :type notfound_ok: bool
+        :param head_only: whether to fetch without value, so only metadata
+           (only available on PB transport)
+        :type head_only: bool
+        :rtype: list of RiakObject
+        """
+        _validate_timeout(timeout)
+        for robj in robjs:
+            if not isinstance(robj.key, str):
+                raise TypeError(
+                    "key must be a string, instead got {0}".format(repr(robj.key)))
+
+        return transport.get_many(robjs, r=r, pr=pr, timeout=timeout,
+                                  basic_quorum=basic_quorum,
+                                  notfound_ok=notfound_ok,
+                                  head_only=head_only)
+
+    def stream_get(self, robj, r=None, pr=None, timeout=None,
+                   basic_quorum=None, notfound_ok=None, chunk_size=65536):
+        """
+        Fetches the contents of a Riak object, streaming its value in
+        chunks of bytes rather than holding it in memory. The metadata
+        of the object is filled in before the first chunk is yielded,
+        and its ``encoded_data`` is left unset. This is a generator
+        method which should be iterated over. Example::
+
+            obj = bucket.new("video")
+            with open("video.mp4", "wb") as f:
+                for chunk in client.stream_get(obj):
+                    f.write(chunk)
+
+        Only the HTTP transport streams the value. Other transports
+        fetch it whole and yield it as a single chunk. Nothing is
+        yielded if the object is not found, and
+        :class:`~riak.ConflictError` is raised if it has siblings that
+        the resolver does not resolve.
+
+        The caller should explicitly close the returned iterator,
+        either using :func:`contextlib.closing` or calling ``close()``
+        explicitly, if it is not consumed entirely.
+
+        :param robj: the object to fetch
+        :type robj: RiakObject
+        :param r: the read quorum
+        :type r: integer, string, None
+        :param pr: the primary read quorum
+        :type pr: integer, string, None
+        :param timeout: a timeout value in milliseconds
+        :type timeout: int
+        :param basic_quorum: whether to use the "basic quorum" policy
+           for not-founds
+        :type basic_quorum: bool
+        :param notfound_ok: whether to treat not-found responses as successful
+        :type notfound_ok: bool
+        :param chunk_size: the maximum size of each chunk, in bytes
+        :type chunk_size: int
+        :rtype: iterator
+        """
+        _validate_timeout(timeout)
+        if not isinstance(robj.key, str):
+            raise TypeError(
+                "key must be a string, instead got {0}".format(repr(robj.key)))
+
+        if self.protocol != "http":
+            self.get(robj, r=r, pr=pr, timeout=timeout,
+                     basic_quorum=basic_quorum, notfound_ok=notfound_ok)
+            if robj.siblings:
+                yield robj.encoded_data
+            return
+
+        def make_op(transport):
+            return transport.stream_get(robj, r=r, pr=pr, timeout=timeout,
+                                        basic_quorum=basic_quorum,
+                                        notfound_ok=notfound_ok,
+                                        chunk_size=chunk_size)
+
+        for chunk in self._stream_with_retry(make_op):
+            yield chunk
+
     @retryable
     def delete(self, transport, robj, rw=None, r=None, w=None, dw=None,
                pr=None, pw=None, timeout=None):
@@ -782,6 +1163,67 @@ class RiakClientOperations(RiakClientTransport):
         return transport.delete(robj, rw=rw, r=r, w=w, dw=dw, pr=pr,
                                 pw=pw, timeout=timeout)
 
+    @retryable
+    def prepared_get(self, transport, prepared, robj):
+        """
+        prepared_get(prepared, robj)
+
+        Fetches the contents of a Riak object using a prepared request.
+        See :meth:`RiakBucket.prepare_get
+        <riak.bucket.RiakBucket.prepare_get>`.
+
+        .. note:: This request is automatically retried :attr:`retries`
+           times if it fails due to network error.
+
+        :param prepared: the prepared request
+        :type prepared: :class:`~riak.prepared.PreparedGet`
+        :param robj: the object to fetch
+        :type robj: RiakObject
+        """
+        if not isinstance(robj.key, str):
+            raise TypeError(
+                "key must be a string, instead got {0}".format(repr(robj.key)))
+
+        return transport.prepared_get(prepared, robj)
+
+    @retryable
+    def prepared_put(self, transport, prepared, robj):
+        """
+        prepared_put(prepared, robj)
+
+        Stores an object in the Riak cluster using a prepared request.
+        See :meth:`RiakBucket.prepare_put
+        <riak.bucket.RiakBucket.prepare_put>`.
+
+        .. note:: This request is automatically retried :attr:`retries`
+           times if it fails due to network error.
+
+        :param prepared: the prepared request
+        :type prepared: :class:`~riak.prepared.PreparedPut`
+        :param robj: the object to store
+        :type robj: RiakObject
+        """
+        return transport.prepared_put(prepared, robj)
+
+    @retryable
+    def prepared_delete(self, transport, prepared, robj):
+        """
+        prepared_delete(prepared, robj)
+
+        Deletes an object from Riak using a prepared request. See
+        :meth:`RiakBucket.prepare_delete
+        <riak.bucket.RiakBucket.prepare_delete>`.
+
+        .. note:: This request is automatically retried :attr:`retries`
+           times if it fails due to network error.
+
+        :param prepared: the prepared request
+        :type prepared: :class:`~riak.prepared.PreparedDelete`
+        :param robj: the object to delete
+        :type robj: RiakObject
+        """
+        return transport.prepared_delete(prepared, robj)
+
     @retryable
     def mapred(self, transport, inputs, query, timeout):
         """
@@ -803,11 +1245,16 @@ class RiakClientOperations(RiakClientTransport):
         _validate_timeout(timeout)
         return transport.mapred(inputs, query, timeout)
 
-    def stream_mapred(self, inputs, query, timeout):
+    def stream_mapred(self, inputs, query, timeout, raw=False):
         """
         Streams a MapReduce query as (phase, data) pairs. This is a
         generator method which should be iterated over.
 
+        With ``raw``, the data is yielded as the JSON bytes received
+        rather than decoded, for callers which pass the results on to
+        another system. It can be decoded later with
+        :func:`json.loads`, if needed.
+
         The caller should explicitly close the returned iterator,
         either using :func:`contextlib.closing` or calling ``close()``
         explicitly. Consuming the entire iterator will also close the
@@ -833,12 +1280,14 @@ class RiakClientOperations(RiakClientTransport):
         :type query: list
         :param timeout: the query timeout
         :type timeout: integer, None
+        :param raw: whether to yield the data undecoded
+        :type raw: boolean
         :rtype: iterator
         """
         _validate_timeout(timeout)
 
         def make_op(transport):
-            return transport.stream_mapred(inputs, query, timeout)
+            return transport.stream_mapred(inputs, query, timeout, raw=raw)
 
         for phase, data in self._stream_with_retry(make_op):
             yield phase, data
@@ -953,6 +1402,99 @@ class RiakClientOperations(RiakClientTransport):
         """
         return transport.search(index, query, **params)
 
+    def stream_search(self, index, query, page_size=100, prefetch=2,
+                      **params):
+        """
+        Performs a full-text search query, yielding the matching
+        documents one at a time while the following pages of results
+        are fetched in the background. This is a generator method
+        which should be iterated over.
+
+        Pages of ``page_size`` documents are fetched with
+        :meth:`fulltext_search`. Over HTTP, when the results are
+        sorted on the unique ``_yz_id`` field and no ``start`` is
+        given, Solr's cursors are used so that deep pages are as cheap
+        to fetch as the first, and pages are fetched one after
+        another ahead of the caller. Otherwise the number of results
+        is taken from the first page and up to ``prefetch`` of the
+        remaining pages are fetched at once. At most
+        ``2 * prefetch + 1`` pages are held in memory. Example::
+
+            for doc in client.stream_search("people", "age_i:[18 TO *]",
+                                            sort="_yz_id asc"):
+                do_something(doc)
+
+        Closing the generator early stops fetching pages.
+
+        .. note:: Each page is requested with :meth:`fulltext_search`,
+           so is automatically retried :attr:`retries` times if it
+           fails due to network error.
+
+        :param index: the bucket/index to search over
+        :type index: string
+        :param query: the search query
+        :type query: string
+        :param page_size: the number of documents to fetch per page,
+          which may also be given as ``rows``
+        :type page_size: int
+        :param prefetch: the number of pages to fetch ahead
+        :type prefetch: int
+        :param params: additional query flags
+        :type params: dict
+        :rtype: iterator
+        """
+        page_size = params.pop("rows", page_size)
+        if page_size < 1:
+            raise ValueError("page_size must be a positive integer")
+        if prefetch < 1:
+            raise ValueError("prefetch must be a positive integer")
+
+        def _search(**options):
+            options.update(params)
+            return self.fulltext_search(index, query, rows=page_size,
+                                        **options)
+
+        if self.protocol == "http" and "start" not in params and \
+                "_yz_id" in params.get("sort", ""):
+            def _pages():
+                cursor = "*"
+                while True:
+                    result = _search(cursorMark=cursor)
+                    yield result["docs"]
+                    next_cursor = result.get("next_cursor_mark")
+                    if not result["docs"] or next_cursor in (None, cursor):
+                        return
+                    cursor = next_cursor
+
+            fetched = riak.client.multi.multistream(
+                lambda docs: docs, _pages(), prefetch, ordered=True)
+            pages = fetched
+        else:
+            start = params.pop("start", 0)
+
+            def _pages():
+                first = _search(start=start)
+                yield first["docs"]
+                offsets = range(start + page_size,
+                                first.get("num_found", 0), page_size)
+                yield from riak.client.multi.multistream(
+                    lambda offset: _search(start=offset)["docs"],
+                    iter(offsets), prefetch, ordered=True)
+
+            # The pages are read on a separate thread, so that the
+            # following pages are fetched while the first is consumed
+            fetched = riak.client.multi.prefetch(_pages())
+            pages = fetched
+
+        try:
+            for docs in pages:
+                if not docs:
+                    break
+                for doc in docs:
+                    yield doc
+        finally:
+            fetched.close()
+
     @retryableHttpOnly
     def fulltext_add(self, transport, index, docs):
         """
@@ -999,6 +1541,84 @@ class RiakClientOperations(RiakClientTransport):
         """
         transport.fulltext_delete(index, docs, queries)
 
+    def fulltext_bulk_add(self, index, docs, batch_size=1000,
+                          batch_bytes=1048576, concurrency=None):
+        """
+        fulltext_bulk_add(index, docs, batch_size=1000, \
+                          batch_bytes=1048576, concurrency=None)
+
+        .. deprecated:: 2.1.0 (Riak 2.0)
+           Manual index maintenance is not supported for
+           :ref:`Riak Search 2.0 <yz-label>`.
+
+        Adds a large number of documents to the full-text index. The
+        documents are encoded one at a time as they are read from
+        ``docs``, which may be a generator, and split into batches of
+        at most ``batch_size`` documents or ``batch_bytes`` bytes of
+        XML. Batches are sent as chunked requests via threads, so they
+        are spread over the nodes of the connection pool. Example::
+
+            failed = client.fulltext_bulk_add("users", read_users())
+            for docs, err in failed:
+                handle_error(docs, err)
+
+        .. note:: Each batch is automatically retried :attr:`retries`
+           times if it fails due to network error. Only HTTP will be
+           used for this request.
+
+        :param index: the bucket/index in which to index these docs
+        :type index: string
+        :param docs: the documents
+        :type docs: iterable of dict
+        :param batch_size: the most documents to send in a request
+        :type batch_size: int
+        :param batch_bytes: the most bytes of documents to send in a
+           request, unless a single document is larger
+        :type batch_bytes: int
+        :param concurrency: the number of batches to send at a time.
+           Defaults to :data:`riak.client.multi.POOL_SIZE`
+        :type concurrency: int
+        :rtype: list of tuples of the documents of each failed batch
+           and the exception raised
+        """
+        from riak.codecs.http import encode_fulltext_doc, fulltext_update_body
+
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+
+        def _batches():
+            batch, size = [], 0
+            for doc in docs:
+                element = encode_fulltext_doc(doc)
+                if batch and (len(batch) >= batch_size or
+                              size + len(element) > batch_bytes):
+                    yield batch
+                    batch, size = [], 0
+                batch.append((doc, element))
+                size += len(element)
+            if batch:
+                yield batch
+
+        def _send(batch):
+            body = fulltext_update_body(
+                "add", (element for _, element in batch))
+            try:
+                self._fulltext_update(index, body)
+            except Exception as err:
+                return ([doc for doc, _ in batch], err)
+
+        size = concurrency or riak.client.multi.POOL_SIZE
+        return [result for result in
+                riak.client.multi.multistream(_send, _batches(), size)
+                if result is not None]
+
+    @retryableHttpOnly
+    def _fulltext_update(self, transport, index, body):
+        """
+        Sends an encoded update to the full-text index.
+        """
+        transport.fulltext_update(index, body)
+
     def multiget(self, pairs, **params):
         """Fetches many keys in parallel via threads.
 
@@ -1167,11 +1787,69 @@ class RiakClientOperations(RiakClientTransport):
         """
         _validate_timeout(timeout)
 
+        sent = datatype._context
         with self._transport() as transport:
-            return transport.update_datatype(datatype, w=w, dw=dw, pw=pw,
-                                             return_body=return_body,
-                                             timeout=timeout,
-                                             include_context=include_context)
+            result = transport.update_datatype(datatype, w=w, dw=dw, pw=pw,
+                                               return_body=return_body,
+                                               timeout=timeout,
+                                               include_context=include_context)
+
+        if self.context_cache is not None and datatype.key:
+            # Only a context returned with the new value covers the
+            # elements just added
+            if datatype._context and datatype._context != sent:
+                self.context_cache.put(datatype.bucket, datatype.key,
+                                       datatype._context)
+            else:
+                self.context_cache.invalidate(datatype.bucket, datatype.key)
+        return result
+
+    def datatype_batch(self, flush_every=None, max_latency_ms=None,
+                       concurrency=None, w=None, dw=None, pw=None,
+                       timeout=None):
+        """
+        Creates a batch which accumulates the staged operations of
+        many datatypes, merging those on the same key, and sends them
+        as concurrent updates. Example::
+
+            with client.datatype_batch(max_latency_ms=50) as batch:
+                for name in names:
+                    counter = bucket.new(name)
+                    counter.increment()
+                    batch.add(counter)
+
+        The updates which failed are reported in the batch's
+        :attr:`~riak.client.datatype_batch.DatatypeBatch.errors`.
+
+        :param flush_every: the number of keys with pending operations
+          at which they are sent, defaults to
+          :data:`~riak.client.datatype_batch.FLUSH_EVERY`
+        :type flush_every: int
+        :param max_latency_ms: the longest time in milliseconds an
+          operation waits before it is sent, or None to wait until the
+          batch is full or closed
+        :type max_latency_ms: int, None
+        :param concurrency: the number of updates sent at once,
+          defaults to the size of the multi-operation pools
+        :type concurrency: int
+        :param w: the write quorum
+        :type w: integer, string, None
+        :param dw: the durable write quorum
+        :type dw: integer, string, None
+        :param pw: the primary write quorum
+        :type pw: integer, string, None
+        :param timeout: a timeout value in milliseconds for each update
+        :type timeout: int
+        :rtype: :class:`~riak.client.datatype_batch.DatatypeBatch`
+        """
+        from riak.client.datatype_batch import DatatypeBatch, FLUSH_EVERY
+
+        _validate_timeout(timeout)
+
+        return DatatypeBatch(self, flush_every=flush_every or FLUSH_EVERY,
+                             max_latency_ms=max_latency_ms,
+                             concurrency=concurrency, w=w, dw=dw, pw=pw,
+                             timeout=timeout)
 
     @retryable
     def get_preflist(self, transport, bucket, key):
@@ -1251,11 +1929,13 @@ class RiakClientOperations(RiakClientTransport):
         """
         _validate_timeout(timeout)
 
-        return transport.fetch_datatype(bucket, key, r=r, pr=pr,
-                                        basic_quorum=basic_quorum,
-                                        notfound_ok=notfound_ok,
-                                        timeout=timeout,
-                                        include_context=include_context)
+        dtype, value, context = transport.fetch_datatype(
+            bucket, key, r=r, pr=pr, basic_quorum=basic_quorum,
+            notfound_ok=notfound_ok, timeout=timeout,
+            include_context=include_context)
+        if self.context_cache is not None and context:
+            self.context_cache.put(bucket, key, context)
+        return dtype, value, context
 
 
 def _validate_bucket_props(props):
@@ -1266,6 +1946,20 @@ def _validate_bucket_props(props):
                 'hll_precision must be between 4 and 16, inclusive')
 
 
+def _prefetch_pages(pages, prefetch):
+    """
+    Yields index pages, fetching up to ``prefetch`` of them ahead of
+    the caller on a background thread if it is set.
+    """
+    if prefetch:
+        pages = riak.client.multi.prefetch(pages, prefetch)
+    try:
+        for page in pages:
+            yield page
+    finally:
+        pages.close()
+
+
 def _validate_timeout(timeout, infinity_ok=False):
     """
     Raises an exception if the given timeout is an invalid value.
@@ -16,7 +16,6 @@ import csv
 import re
 
 from cgi import parse_header
-from email import message_from_string
 from email.utils import mktime_tz, parsedate_tz
 from xml.etree import ElementTree
 
@@ -25,7 +24,7 @@ from riak.content import RiakContent
 from riak.multidict import MultiDict
 from riak.riak_object import VClock
 from riak.transports.http.search import XMLSearchResult
-from riak.util import bytes_to_str, decode_index_value
+from riak.util import decode_index_value, str_to_bytes
 
 from urllib.parse import unquote_plus
 
@@ -33,6 +32,13 @@ from urllib.parse import unquote_plus
 # subtract length of "Link: " header string and newline
 MAX_LINK_HEADER_SIZE = 8192 - 8
 
+#: The size of the chunks in which full-text index updates are sent
+FULLTEXT_CHUNK_SIZE = 65536
+
+# Escapes text and attribute values as xml.dom.minidom does
+XML_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;",
+                             '"': "&quot;"})
+
 
 class HttpCodec(object):
     """
@@ -74,16 +80,10 @@ class HttpCodec(object):
         elif status == 300:
             ctype, params = parse_header(headers["content-type"])
             if ctype == "multipart/mixed":
-                data = bytes_to_str(data)
-                boundary = re.compile("\r?\n--%s(?:--)?\r?\n" %
-                                      re.escape(params["boundary"]))
-                parts = [message_from_string(p)
-                         for p in re.split(boundary, data)[1:-1]]
+                parts = self._parse_multipart(data, params["boundary"])
                 robj.siblings = [
-                    self._parse_sibling(
-                        RiakContent(robj), list(part.items()), part.get_payload(),
-                    )
-                    for part in parts
+                    self._parse_sibling(RiakContent(robj), part_headers, payload)
+                    for part_headers, payload in parts
                 ]
 
                 # Invoke sibling-resolution logic
@@ -100,6 +100,67 @@ class HttpCodec(object):
 
         return robj
 
+    def _parse_multipart(self, data, boundary):
+        """
+        Splits a multipart/mixed body into a list of (headers, payload)
+        pairs, where headers is a list of (name, value) pairs. The
+        payloads are left as bytes.
+        """
+        delimiter = b"\n--" + str_to_bytes(boundary)
+        parts = []
+        # The body may start with the delimiter, without a line break
+        if data.startswith(delimiter[1:]):
+            pos = 0
+        else:
+            pos = data.find(delimiter)
+            if pos != -1:
+                pos += 1
+        while pos != -1:
+            start = pos + len(delimiter) - 1
+            if data.startswith(b"--", start):
+                # The closing delimiter
+                break
+            start = data.find(b"\n", start)
+            if start == -1:
+                break
+            start += 1
+            end = data.find(delimiter, start)
+            if end == -1:
+                break
+            pos = end + 1
+            if data[end - 1:end] == b"\r":
+                end -= 1
+            parts.append(self._parse_part(data[start:end]))
+        return parts
+
+    def _parse_part(self, part):
+        """
+        Splits a single part of a multipart body into its headers and
+        payload.
+        """
+        head_end = part.find(b"\r\n\r\n")
+        if head_end != -1:
+            payload = part[head_end + 4:]
+        else:
+            head_end = part.find(b"\n\n")
+            if head_end != -1:
+                payload = part[head_end + 2:]
+            else:
+                head_end = len(part)
+                payload = b""
+
+        headers = []
+        for line in part[:head_end].decode("utf-8").splitlines():
+            if line[:1] in (" ", "\t") and headers:
+                # A folded continuation of the previous header
+                name, value = headers[-1]
+                headers[-1] = (name, value + " " + line.strip())
+                continue
+            name, sep, value = line.partition(":")
+            if sep:
+                headers.append((name.strip(), value.strip()))
+        return headers, payload
+
     def _parse_sibling(self, sibling, headers, data):
         """
         Parses a single sibling out of a response.
@@ -113,6 +174,8 @@ class HttpCodec(object):
             if header == "content-type":
                 sibling.content_type, sibling.charset = \
                     self._parse_content_type(value)
+            elif header == "content-encoding":
+                sibling.content_encoding = value
             elif header == "etag":
                 sibling.etag = value
             elif header == "link":
@@ -192,6 +255,9 @@ class HttpCodec(object):
 
         headers = MultiDict({"Content-Type": content_type, "X-Riak-ClientId": self._client_id})
 
+        if robj.content_encoding is not None:
+            headers["Content-Encoding"] = robj.content_encoding
+
         # Add the vclock if it exists...
         if robj.vclock is not None:
             headers["X-Riak-Vclock"] = robj.vclock.encode("base64")
@@ -226,6 +292,8 @@ class HttpCodec(object):
             result["grouped"] = json["grouped"]
         if "stats" in json:
             result["stats"] = json["stats"]
+        if "nextCursorMark" in json:
+            result["next_cursor_mark"] = json["nextCursorMark"]
         if "response" in json:
             result["num_found"] = json["response"]["numFound"]
             result["max_score"] = float(json["response"]["maxScore"])
@@ -316,3 +384,59 @@ class HttpCodec(object):
                     updates = map_op.setdefault(fopname, {})
                     updates[fopkey] = self._encode_dt_op(fop[1][1], fop[2])
             return map_op
+
+
+def encode_fulltext_doc(doc):
+    """
+    Encodes a document to be added to the full-text index as an XML
+    ``<doc>`` element.
+
+    :param doc: the fields of the document
+    :type doc: dict
+    :rtype: bytes
+    """
+    fields = "".join('<field name="{0}">{1}</field>'.format(
+        key.translate(XML_ESCAPES), value.translate(XML_ESCAPES))
+        for key, value in doc.items())
+    return ("<doc>" + fields + "</doc>").encode("utf-8")
+
+
+def encode_fulltext_delete(docs=None, queries=None):
+    """
+    Encodes the ids and queries of documents to be removed from the
+    full-text index as XML ``<id>`` and ``<query>`` elements.
+
+    :rtype: list of bytes
+    """
+    elements = ["<id>" + doc.translate(XML_ESCAPES) + "</id>"
+                for doc in docs or []]
+    elements.extend("<query>" + query.translate(XML_ESCAPES) + "</query>"
+                    for query in queries or [])
+    return [element.encode("utf-8") for element in elements]
+
+
+def fulltext_update_body(command, elements):
+    """
+    Wraps encoded elements in a full-text index update command,
+    returning the XML document as a list of chunks of roughly
+    :data:`FULLTEXT_CHUNK_SIZE` bytes, which can be sent as a chunked
+    request body and resent if the request is retried.
+
+    :param command: the update command, "add" or "delete"
+    :type command: string
+    :param elements: the encoded elements
+    :type elements: iterable of bytes
+    :rtype: list of bytes
+    """
+    chunks = []
+    chunk = ['<?xml version="1.0" ?><{0}>'.format(command).encode("utf-8")]
+    size = len(chunk[0])
+    for element in elements:
+        if size >= FULLTEXT_CHUNK_SIZE:
+            chunks.append(b"".join(chunk))
+            chunk, size = [], 0
+        chunk.append(element)
+        size += len(element)
+    chunk.append("</{0}>".format(command).encode("utf-8"))
+    chunks.append(b"".join(chunk))
+    return chunks
@@ -24,6 +24,7 @@ from riak import RiakError
 from riak.codecs import Codec, Msg
 from riak.codecs.util import parse_pbuf_msg
 from riak.content import RiakContent
+from riak.datatypes.set import CompactSet
 from riak.multidict import MultiDict
 from riak.pb.riak_ts_pb2 import TsColumnType
 from riak.riak_object import VClock
@@ -97,6 +98,21 @@ DT_FETCH_TYPES = {
 }
 
 
+def _encode_bytes_field(number, value):
+    """
+    Encodes a length-delimited protobuf field, so that it can be
+    appended to an already serialized message.
+    """
+    out = bytearray([(number << 3) | 2])
+    size = len(value)
+    while size > 0x7f:
+        out.append((size & 0x7f) | 0x80)
+        size >>= 7
+    out.append(size)
+    out += value
+    return bytes(out)
+
+
 class PbufCodec(Codec):
     """
     Protobuffs Encoding and decoding methods for TcpTransport.
@@ -201,23 +217,52 @@ class PbufCodec(Codec):
         if rpb_content.HasField("vtag"):
             sibling.etag = bytes_to_str(rpb_content.vtag)
 
-        sibling.links = [self.decode_link(link)
-                         for link in rpb_content.links]
         if rpb_content.HasField("last_mod"):
             sibling.last_modified = float(rpb_content.last_mod)
             if rpb_content.HasField("last_mod_usecs"):
                 sibling.last_modified += rpb_content.last_mod_usecs / 1000000.0
 
-        sibling.usermeta = dict([(bytes_to_str(usermd.key),
-                                  bytes_to_str(usermd.value))
-                                 for usermd in rpb_content.usermeta])
-        sibling.indexes = set([(bytes_to_str(index.key),
-                                decode_index_value(index.key, index.value))
-                               for index in rpb_content.indexes])
+        # Links, usermeta and indexes are decoded on first access
+        sibling._set_raw_metadata(rpb_content, self)
         sibling.encoded_data = rpb_content.value
 
         return sibling
 
+    def decode_usermeta(self, rpb_content):
+        """
+        Decodes the user metadata of an RpbContent message into a dict
+
+        :param rpb_content: a single RpbContent message
+        :type rpb_content: riak.pb.riak_pb2.RpbContent
+        :rtype dict
+        """
+        return dict([(bytes_to_str(usermd.key),
+                      bytes_to_str(usermd.value))
+                     for usermd in rpb_content.usermeta])
+
+    def decode_links(self, rpb_content):
+        """
+        Decodes the links of an RpbContent message into a list of tuples
+
+        :param rpb_content: a single RpbContent message
+        :type rpb_content: riak.pb.riak_pb2.RpbContent
+        :rtype list
+        """
+        return [self.decode_link(link) for link in rpb_content.links]
+
+    def decode_indexes(self, rpb_content):
+        """
+        Decodes the secondary indexes of an RpbContent message into a
+        set of tuples
+
+        :param rpb_content: a single RpbContent message
+        :type rpb_content: riak.pb.riak_pb2.RpbContent
+        :rtype set
+        """
+        return set([(bytes_to_str(index.key),
+                     decode_index_value(index.key, index.value))
+                    for index in rpb_content.indexes])
+
     def encode_content(self, robj, rpb_content):
         """
         Fills an RpbContent message with the appropriate data and
@@ -626,7 +671,7 @@ class PbufCodec(Codec):
         return out
 
     def decode_set_value(self, set_value):
-        return [bytes_to_str(string[:]) for string in set_value]
+        return CompactSet.from_bytes(set_value)
 
     def decode_hll_value(self, hll_value):
         return int(hll_value)
@@ -903,7 +948,33 @@ class PbufCodec(Codec):
     def encode_get(self, robj, r=None, pr=None, timeout=None,
                    basic_quorum=None, notfound_ok=None,
                    head_only=False):
-        bucket = robj.bucket
+        req = self._encode_get_req(robj.bucket, r, pr, timeout,
+                                   basic_quorum, notfound_ok, head_only)
+        req.key = str_to_bytes(robj.key)
+        mc = riak.pb.messages.MSG_CODE_GET_REQ
+        rc = riak.pb.messages.MSG_CODE_GET_RESP
+        return Msg(mc, req.SerializeToString(), rc)
+
+    def prepare_get(self, bucket, r=None, pr=None, timeout=None,
+                    basic_quorum=None, notfound_ok=None, head_only=False):
+        """
+        Serializes the parts of a get request which do not depend on
+        the key, for use with :meth:`encode_prepared_get`.
+
+        :rtype: bytes
+        """
+        req = self._encode_get_req(bucket, r, pr, timeout,
+                                   basic_quorum, notfound_ok, head_only)
+        return req.SerializePartialToString()
+
+    def encode_prepared_get(self, template, robj):
+        mc = riak.pb.messages.MSG_CODE_GET_REQ
+        rc = riak.pb.messages.MSG_CODE_GET_RESP
+        key = _encode_bytes_field(2, str_to_bytes(robj.key))
+        return Msg(mc, template + key, rc)
+
+    def _encode_get_req(self, bucket, r, pr, timeout, basic_quorum,
+                        notfound_ok, head_only):
         req = riak.pb.riak_kv_pb2.RpbGetReq()
         if r:
             req.r = self.encode_quorum(r)
@@ -920,16 +991,51 @@ class PbufCodec(Codec):
             req.deletedvclock = True
         req.bucket = str_to_bytes(bucket.name)
         self._add_bucket_type(req, bucket.bucket_type)
-        req.key = str_to_bytes(robj.key)
         req.head = head_only
-        mc = riak.pb.messages.MSG_CODE_GET_REQ
-        rc = riak.pb.messages.MSG_CODE_GET_RESP
-        return Msg(mc, req.SerializeToString(), rc)
+        return req
 
     def encode_put(self, robj, w=None, dw=None, pw=None,
                    return_body=True, if_none_match=False,
                    timeout=None):
-        bucket = robj.bucket
+        req = self._encode_put_req(robj.bucket, w, dw, pw, return_body,
+                                   if_none_match, timeout)
+        if robj.key:
+            req.key = str_to_bytes(robj.key)
+        if robj.vclock:
+            req.vclock = robj.vclock.encode("binary")
+        self.encode_content(robj, req.content)
+        mc = riak.pb.messages.MSG_CODE_PUT_REQ
+        rc = riak.pb.messages.MSG_CODE_PUT_RESP
+        return Msg(mc, req.SerializeToString(), rc)
+
+    def prepare_put(self, bucket, w=None, dw=None, pw=None,
+                    return_body=True, if_none_match=False, timeout=None):
+        """
+        Serializes the parts of a put request which do not depend on
+        the object being stored, for use with
+        :meth:`encode_prepared_put`.
+
+        :rtype: bytes
+        """
+        req = self._encode_put_req(bucket, w, dw, pw, return_body,
+                                   if_none_match, timeout)
+        return req.SerializePartialToString()
+
+    def encode_prepared_put(self, template, robj):
+        data = bytearray(template)
+        if robj.key:
+            data += _encode_bytes_field(2, str_to_bytes(robj.key))
+        if robj.vclock:
+            data += _encode_bytes_field(3, robj.vclock.encode("binary"))
+        content = riak.pb.riak_kv_pb2.RpbContent()
+        self.encode_content(robj, content)
+        data += _encode_bytes_field(4, content.SerializeToString())
+        mc = riak.pb.messages.MSG_CODE_PUT_REQ
+        rc = riak.pb.messages.MSG_CODE_PUT_RESP
+        return Msg(mc, bytes(data), rc)
+
+    def _encode_put_req(self, bucket, w, dw, pw, return_body,
+                        if_none_match, timeout):
         req = riak.pb.riak_kv_pb2.RpbPutReq()
         if w:
             req.w = self.encode_quorum(w)
@@ -945,14 +1051,7 @@ class PbufCodec(Codec):
             req.timeout = timeout
         req.bucket = str_to_bytes(bucket.name)
         self._add_bucket_type(req, bucket.bucket_type)
-        if robj.key:
-            req.key = str_to_bytes(robj.key)
-        if robj.vclock:
-            req.vclock = robj.vclock.encode("binary")
-        self.encode_content(robj, req.content)
-        mc = riak.pb.messages.MSG_CODE_PUT_REQ
-        rc = riak.pb.messages.MSG_CODE_PUT_RESP
-        return Msg(mc, req.SerializeToString(), rc)
+        return req
 
     def decode_get(self, robj, resp):
         if resp is not None:
@@ -982,6 +1081,37 @@ class PbufCodec(Codec):
     def encode_delete(self, robj, rw=None, r=None,
                       w=None, dw=None, pr=None, pw=None,
                       timeout=None):
+        req = self._encode_delete_req(robj.bucket, rw, r, w, dw, pr, pw,
+                                      timeout)
+        use_vclocks = (self._tombstone_vclocks and hasattr(robj, "vclock") and robj.vclock)
+        if use_vclocks:
+            req.vclock = robj.vclock.encode("binary")
+        req.key = str_to_bytes(robj.key)
+        mc = riak.pb.messages.MSG_CODE_DEL_REQ
+        rc = riak.pb.messages.MSG_CODE_DEL_RESP
+        return Msg(mc, req.SerializeToString(), rc)
+
+    def prepare_delete(self, bucket, rw=None, r=None, w=None, dw=None,
+                       pr=None, pw=None, timeout=None):
+        """
+        Serializes the parts of a delete request which do not depend
+        on the key, for use with :meth:`encode_prepared_delete`.
+
+        :rtype: bytes
+        """
+        req = self._encode_delete_req(bucket, rw, r, w, dw, pr, pw, timeout)
+        return req.SerializePartialToString()
+
+    def encode_prepared_delete(self, template, robj):
+        data = template
+        if self._tombstone_vclocks and robj.vclock:
+            data += _encode_bytes_field(4, robj.vclock.encode("binary"))
+        data += _encode_bytes_field(2, str_to_bytes(robj.key))
+        mc = riak.pb.messages.MSG_CODE_DEL_REQ
+        rc = riak.pb.messages.MSG_CODE_DEL_RESP
+        return Msg(mc, data, rc)
+
+    def _encode_delete_req(self, bucket, rw, r, w, dw, pr, pw, timeout):
         req = riak.pb.riak_kv_pb2.RpbDelReq()
         if rw:
             req.rw = self.encode_quorum(rw)
@@ -1001,17 +1131,9 @@ class PbufCodec(Codec):
         if self._client_timeouts and timeout:
             req.timeout = timeout
 
-        use_vclocks = (self._tombstone_vclocks and hasattr(robj, "vclock") and robj.vclock)
-        if use_vclocks:
-            req.vclock = robj.vclock.encode("binary")
-
-        bucket = robj.bucket
         req.bucket = str_to_bytes(bucket.name)
         self._add_bucket_type(req, bucket.bucket_type)
-        req.key = str_to_bytes(robj.key)
-        mc = riak.pb.messages.MSG_CODE_DEL_REQ
-        rc = riak.pb.messages.MSG_CODE_DEL_RESP
-        return Msg(mc, req.SerializeToString(), rc)
+        return req
 
     def encode_stream_keys(self, bucket, timeout=None):
         req = riak.pb.riak_kv_pb2.RpbListKeysReq()
@@ -13,8 +13,10 @@
 # limitations under the License.
 
 import datetime
+import struct
 
 from erlastic import decode, encode
+from erlastic.codec import ErlangTermDecoder
 from erlastic.types import Atom
 from riak import RiakError
 from riak.codecs import Codec, Msg
@@ -23,6 +25,7 @@ from riak.ts_object import TsColumns
 from riak.util import (
     bytes_to_str,
     datetime_from_unix_time_millis,
+    str_to_bytes,
     unix_time_millis,
 )
 
@@ -39,6 +42,63 @@ tsputresp_a = Atom("tsputresp")
 tsdelreq_a = Atom("tsdelreq")
 timestamp_a = Atom("timestamp")
 
+# External term format tags
+FORMAT_VERSION = 131
+NEW_FLOAT_EXT = 70
+SMALL_INTEGER_EXT = 97
+INTEGER_EXT = 98
+FLOAT_EXT = 99
+ATOM_EXT = 100
+SMALL_TUPLE_EXT = 104
+LARGE_TUPLE_EXT = 105
+NIL_EXT = 106
+STRING_EXT = 107
+LIST_EXT = 108
+BINARY_EXT = 109
+SMALL_BIG_EXT = 110
+LARGE_BIG_EXT = 111
+SMALL_ATOM_EXT = 115
+ATOM_UTF8_EXT = 118
+SMALL_ATOM_UTF8_EXT = 119
+
+_u8_u32 = struct.Struct(">BI")
+_u16 = struct.Struct(">H")
+_u32 = struct.Struct(">I")
+_i32 = struct.Struct(">i")
+_f64 = struct.Struct(">d")
+
+# Pre-computed atom table, keyed by the atom's name as it appears on
+# the wire. Booleans and "none" map to their Python equivalents, as
+# erlastic does.
+_ATOMS = {
+    b"true": True,
+    b"false": False,
+    b"none": None,
+}
+for _a in (udef_a, rpberrorresp_a, tsgetreq_a, tsgetresp_a, tsqueryreq_a,
+           tsqueryresp_a, tsinterpolation_a, tsputreq_a, tsputresp_a,
+           tsdelreq_a, timestamp_a, Atom("varchar"), Atom("sint64"),
+           Atom("double"), Atom("boolean"), Atom("blob")):
+    _ATOMS[_a.encode("latin-1")] = _a
+del _a
+
+
+def _atom_ext(atom):
+    name = atom.encode("latin-1")
+    return bytes((ATOM_EXT,)) + _u16.pack(len(name)) + name
+
+
+_TRUE_EXT = _atom_ext(Atom("true"))
+_FALSE_EXT = _atom_ext(Atom("false"))
+_UDEF_EXT = _atom_ext(udef_a)
+_TSGETREQ_EXT = _atom_ext(tsgetreq_a)
+_TSDELREQ_EXT = _atom_ext(tsdelreq_a)
+_TSPUTREQ_EXT = _atom_ext(tsputreq_a)
+
+# Used for the rare terms that the single-pass decoder does not
+# handle itself
+_term_decoder = ErlangTermDecoder()
+
 
 class TtbCodec(Codec):
     """
@@ -97,14 +157,20 @@ class TtbCodec(Codec):
 
         mc = MSG_CODE_TS_TTB_MSG
         rc = MSG_CODE_TS_TTB_MSG
-        req_atom = tsgetreq_a
+        buf = bytearray((FORMAT_VERSION, SMALL_TUPLE_EXT, 4))
         if is_delete:
-            req_atom = tsdelreq_a
-
+            buf += _TSDELREQ_EXT
+        else:
+            buf += _TSGETREQ_EXT
+        _encode_binary(buf, str_to_bytes(table.name))
+        if key_vals:
+            buf += _u8_u32.pack(LIST_EXT, len(key_vals))
+            for cell in key_vals:
+                _encode_ts_cell(buf, cell)
+        buf.append(NIL_EXT)
         # TODO FUTURE add timeout as last param
-        req = req_atom, table.name, \
-            [self.encode_to_ts_cell(k) for k in key_vals], udef_a
-        return Msg(mc, encode(req), rc)
+        buf += _UDEF_EXT
+        return Msg(mc, buf, rc)
 
     def validate_timeseries_put_resp(self, resp_code, resp):
         if resp is None and resp_code == MSG_CODE_TS_TTB_MSG:
@@ -127,16 +193,21 @@ class TtbCodec(Codec):
             raise NotImplementedError('columns are not used')
 
         if tsobj.rows and isinstance(tsobj.rows, list):
-            req_rows = []
+            # The request is written straight into a single buffer
+            # rather than built as a term and handed to erlastic
+            buf = bytearray((FORMAT_VERSION, SMALL_TUPLE_EXT, 4))
+            buf += _TSPUTREQ_EXT
+            _encode_binary(buf, str_to_bytes(tsobj.table.name))
+            buf.append(NIL_EXT)
+            buf += _u8_u32.pack(LIST_EXT, len(tsobj.rows))
             for row in tsobj.rows:
-                req_r = []
+                _encode_tuple_header(buf, len(row))
                 for cell in row:
-                    req_r.append(self.encode_to_ts_cell(cell))
-                req_rows.append(tuple(req_r))
-            req = tsputreq_a, tsobj.table.name, [], req_rows
+                    _encode_ts_cell(buf, cell)
+            buf.append(NIL_EXT)
             mc = MSG_CODE_TS_TTB_MSG
             rc = MSG_CODE_TS_TTB_MSG
-            return Msg(mc, encode(req), rc)
+            return Msg(mc, buf, rc)
         else:
             raise RiakError("TsObject requires a list of rows")
 
@@ -198,6 +269,65 @@ class TtbCodec(Codec):
         else:
             raise RiakError("Unknown TTB response type: {}".format(resp_a))
 
+    def decode_timeseries_ttb(self, data, tsobj, convert_timestamp=False):
+        """
+        Fills an TsObject with the appropriate data and metadata from
+        the raw bytes of a TTB-encoded TsGetResp / TsQueryResp.
+
+        Unlike :meth:`decode_timeseries`, this parses the external
+        term format in a single pass, producing rows directly instead
+        of building an intermediate term tree.
+
+        :param data: the TTB-encoded response
+        :type data: bytes
+        :param tsobj: a TsObject
+        :type tsobj: TsObject
+        :param convert_timestamp: Convert timestamps to datetime objects
+        :type tsobj: boolean
+        """
+        if not data:
+            return tsobj
+
+        if data[0] != FORMAT_VERSION:
+            raise RiakError("Bad TTB version number: {}".format(data[0]))
+
+        if data[1] in (SMALL_TUPLE_EXT, LARGE_TUPLE_EXT):
+            _, offset = _decode_tuple_header(data, 1)
+            resp_a, offset = _decode_atom(data, offset)
+        else:
+            # NB: some queries return a BARE 'tsqueryresp' atom
+            resp_a, offset = _decode_atom(data, 1)
+            if resp_a == tsqueryresp_a:
+                return tsobj
+
+        if resp_a == rpberrorresp_a:
+            errmsg, _ = _term_decoder.decode_part(data, offset)
+            raise RiakError(bytes_to_str(errmsg))
+        elif resp_a == tsputresp_a:
+            return
+        elif resp_a == tsgetresp_a or resp_a == tsqueryresp_a:
+            tag = data[offset]
+            if tag == NIL_EXT:
+                return
+            elif tag == SMALL_TUPLE_EXT and data[offset + 1] == 3:
+                offset += 2
+                cnames, offset = _decode_list(data, offset, _decode_term)
+                ctypes, offset = _decode_list(data, offset, _decode_atom)
+                tsobj.columns = self.decode_timeseries_cols(cnames, ctypes)
+                tscols = None
+                if convert_timestamp:
+                    tscols = [i for i, ctype in enumerate(ctypes)
+                              if ctype == timestamp_a]
+                tsobj.rows, _ = _decode_rows(data, offset, tscols)
+            else:
+                resp_data, _ = _decode_term(data, offset)
+                if len(resp_data) == 0:
+                    return
+                raise RiakError(
+                    "Expected 3-tuple in response, got: {}".format(resp_data))
+        else:
+            raise RiakError("Unknown TTB response type: {}".format(resp_a))
+
     def decode_timeseries_cols(self, cnames, ctypes):
         cnames = [bytes_to_str(cname) for cname in cnames]
         ctypes = [str(ctype) for ctype in ctypes]
@@ -227,3 +357,197 @@ class TtbCodec(Codec):
                 else:
                     row.append(cell)
         return row
+
+
+def _encode_binary(buf, value):
+    buf += _u8_u32.pack(BINARY_EXT, len(value))
+    buf += value
+
+
+def _encode_tuple_header(buf, arity):
+    if arity < 256:
+        buf.append(SMALL_TUPLE_EXT)
+        buf.append(arity)
+    else:
+        buf += _u8_u32.pack(LARGE_TUPLE_EXT, arity)
+
+
+def _encode_int(buf, value):
+    if 0 <= value <= 255:
+        buf.append(SMALL_INTEGER_EXT)
+        buf.append(value)
+    elif -2147483648 <= value <= 2147483647:
+        buf.append(INTEGER_EXT)
+        buf += _i32.pack(value)
+    else:
+        magnitude = abs(value)
+        n = (magnitude.bit_length() + 7) // 8
+        if n < 256:
+            buf.append(SMALL_BIG_EXT)
+            buf.append(n)
+        else:
+            buf += _u8_u32.pack(LARGE_BIG_EXT, n)
+        buf.append(1 if value < 0 else 0)
+        buf += magnitude.to_bytes(n, "little")
+
+
+def _encode_ts_cell(buf, cell):
+    """
+    Appends a single timeseries cell to the buffer, producing the
+    same bytes as ``erlastic.encode`` would for the value returned by
+    :meth:`TtbCodec.encode_to_ts_cell`.
+    """
+    if cell is None:
+        buf.append(NIL_EXT)
+    elif isinstance(cell, datetime.datetime):
+        _encode_int(buf, unix_time_millis(cell))
+    elif isinstance(cell, bool):
+        if cell:
+            buf += _TRUE_EXT
+        else:
+            buf += _FALSE_EXT
+    elif isinstance(cell, str):
+        _encode_binary(buf, cell.encode("utf-8"))
+    elif isinstance(cell, bytes):
+        _encode_binary(buf, cell)
+    elif isinstance(cell, int):
+        _encode_int(buf, cell)
+    elif isinstance(cell, float):
+        buf.append(FLOAT_EXT)
+        buf += ("%.20e" % cell).encode("ascii").ljust(31, b"\x00")
+    else:
+        t = type(cell)
+        raise RiakError("can't serialize type '{}', value '{}'"
+                        .format(t, cell))
+
+
+def _decode_term(data, offset):
+    return _term_decoder.decode_part(data, offset)
+
+
+def _decode_atom(data, offset):
+    tag = data[offset]
+    if tag == ATOM_EXT or tag == ATOM_UTF8_EXT:
+        length, = _u16.unpack_from(data, offset + 1)
+        start = offset + 3
+    elif tag == SMALL_ATOM_EXT or tag == SMALL_ATOM_UTF8_EXT:
+        length = data[offset + 1]
+        start = offset + 2
+    else:
+        raise RiakError("Expected atom in TTB response, got tag {}"
+                        .format(tag))
+    end = start + length
+    name = data[start:end]
+    if name in _ATOMS:
+        return _ATOMS[name], end
+    elif tag == ATOM_UTF8_EXT or tag == SMALL_ATOM_UTF8_EXT:
+        return Atom(name.decode("utf-8")), end
+    else:
+        return Atom(name.decode("latin-1")), end
+
+
+def _decode_tuple_header(data, offset):
+    tag = data[offset]
+    if tag == SMALL_TUPLE_EXT:
+        return data[offset + 1], offset + 2
+    elif tag == LARGE_TUPLE_EXT:
+        arity, = _u32.unpack_from(data, offset + 1)
+        return arity, offset + 5
+    else:
+        raise RiakError("Expected tuple in TTB response, got tag {}"
+                        .format(tag))
+
+
+def _decode_list(data, offset, decode_item):
+    tag = data[offset]
+    if tag == NIL_EXT:
+        return [], offset + 1
+    elif tag != LIST_EXT:
+        raise RiakError("Expected list in TTB response, got tag {}"
+                        .format(tag))
+    length, = _u32.unpack_from(data, offset + 1)
+    offset += 5
+    items = []
+    for _ in range(length):
+        item, offset = decode_item(data, offset)
+        items.append(item)
+    if data[offset] != NIL_EXT:
+        raise RiakError("Lists with non empty tails are not supported")
+    return items, offset + 1
+
+
+def _decode_rows(data, offset, tscols=None):
+    """
+    Decodes the list of row tuples of a TsGetResp / TsQueryResp,
+    converting cells to their Python values as they are read.
+
+    :param data: the TTB-encoded response
+    :type data: bytes
+    :param offset: the position of the row list in the data
+    :type offset: int
+    :param tscols: indexes of timestamp columns to convert to
+       datetime objects, or None
+    :type tscols: list
+    :rtype: tuple of list of rows and the offset past the row list
+    """
+    tag = data[offset]
+    if tag == NIL_EXT:
+        return [], offset + 1
+    elif tag != LIST_EXT:
+        raise RiakError("Expected list of rows in TTB response, got tag {}"
+                        .format(tag))
+    nrows, = _u32.unpack_from(data, offset + 1)
+    offset += 5
+
+    u32_unpack = _u32.unpack_from
+    i32_unpack = _i32.unpack_from
+    f64_unpack = _f64.unpack_from
+    from_bytes = int.from_bytes
+    rows = []
+    for _ in range(nrows):
+        tag = data[offset]
+        if tag == SMALL_TUPLE_EXT:
+            arity = data[offset + 1]
+            offset += 2
+        else:
+            arity, offset = _decode_tuple_header(data, offset)
+        row = [None] * arity
+        for i in range(arity):
+            tag = data[offset]
+            if tag == BINARY_EXT:
+                length, = u32_unpack(data, offset + 1)
+                offset += 5
+                row[i] = data[offset:offset + length]
+                offset += length
+            elif tag == SMALL_BIG_EXT:
+                n = data[offset + 1]
+                start = offset + 3
+                offset = start + n
+                value = from_bytes(data[start:offset], "little")
+                if data[start - 1]:
+                    value = -value
+                row[i] = value
+            elif tag == SMALL_INTEGER_EXT:
+                row[i] = data[offset + 1]
+                offset += 2
+            elif tag == INTEGER_EXT:
+                row[i], = i32_unpack(data, offset + 1)
+                offset += 5
+            elif tag == NEW_FLOAT_EXT:
+                row[i], = f64_unpack(data, offset + 1)
+                offset += 9
+            elif tag == NIL_EXT:
+                offset += 1
+            elif tag in (ATOM_EXT, SMALL_ATOM_EXT,
+                         ATOM_UTF8_EXT, SMALL_ATOM_UTF8_EXT):
+                row[i], offset = _decode_atom(data, offset)
+            else:
+                row[i], offset = _decode_term(data, offset)
+        if tscols:
+            for i in tscols:
+                if i < arity and row[i] is not None:
+                    row[i] = datetime_from_unix_time_millis(row[i])
+        rows.append(row)
+    if data[offset] != NIL_EXT:
+        raise RiakError("Lists with non empty tails are not supported")
+    return rows, offset + 1
@@ -14,6 +14,9 @@
 
 from riak import RiakError
 
+# Marks metadata which has not yet been decoded from the raw content
+_UNDECODED = object()
+
 
 class RiakContent(object):
     """
@@ -33,11 +36,62 @@ class RiakContent(object):
         self.content_encoding = content_encoding
         self.last_modified = last_modified
         self.etag = etag
-        self.usermeta = usermeta or {}
-        self.links = links or []
-        self.indexes = indexes or set()
+        self._usermeta = usermeta or {}
+        self._links = links or []
+        self._indexes = indexes or set()
+        self._raw_content = None
+        self._raw_decoder = None
         self.exists = exists
 
+    def _set_raw_metadata(self, raw_content, decoder):
+        """
+        Defers decoding of the usermeta, links and indexes until they
+        are first accessed. ``decoder`` must provide ``decode_usermeta``,
+        ``decode_links`` and ``decode_indexes`` methods which accept
+        ``raw_content``.
+        """
+        self._usermeta = self._links = self._indexes = _UNDECODED
+        self._raw_content = raw_content
+        self._raw_decoder = decoder
+
+    def _get_usermeta(self):
+        if self._usermeta is _UNDECODED:
+            self._usermeta = self._raw_decoder.decode_usermeta(self._raw_content)
+        return self._usermeta
+
+    def _set_usermeta(self, value):
+        self._usermeta = value
+
+    usermeta = property(_get_usermeta, _set_usermeta, doc="""
+        Arbitrary user-defined metadata dict, mapping strings to strings.
+        :type dict""")
+
+    def _get_links(self):
+        if self._links is _UNDECODED:
+            self._links = self._raw_decoder.decode_links(self._raw_content)
+        return self._links
+
+    def _set_links(self, value):
+        self._links = value
+
+    links = property(_get_links, _set_links, doc="""
+        A list of bucket/key/tag 3-tuples representing links to other
+        keys.
+        :type list""")
+
+    def _get_indexes(self):
+        if self._indexes is _UNDECODED:
+            self._indexes = self._raw_decoder.decode_indexes(self._raw_content)
+        return self._indexes
+
+    def _set_indexes(self, value):
+        self._indexes = value
+
+    indexes = property(_get_indexes, _set_indexes, doc="""
+        The set of secondary index entries, consisting of
+        index-name/value tuples.
+        :type set""")
+
     def _get_data(self):
         if self._encoded_data is not None and self._data is None:
             self._data = self._deserialize(self._encoded_data)
@@ -77,17 +131,26 @@ class RiakContent(object):
     def _serialize(self, value):
         encoder = self._robject.bucket.get_encoder(self.content_type)
         if encoder:
-            return encoder(value)
+            value = encoder(value)
         elif isinstance(value, str):
-            return value.encode()
+            value = value.encode()
         else:
             raise TypeError(
                 f"No encoder for non-string data with content type '{self.content_type}'",
             )
+        if self.content_encoding:
+            compressor = self._robject.bucket.get_compressor(self.content_encoding)
+            if compressor:
+                value = compressor[0](value)
+        return value
 
     def _deserialize(self, value):
         if not value:
             return value
+        if self.content_encoding:
+            compressor = self._robject.bucket.get_compressor(self.content_encoding)
+            if compressor:
+                value = compressor[1](value)
         decoder = self._robject.bucket.get_decoder(self.content_type)
         if decoder:
             return decoder(value)
@@ -0,0 +1,124 @@
+# Copyright 2010-present Basho Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+__all__ = ["ContextCache"]
+
+#: The number of keys whose contexts are kept by default
+CONTEXT_CACHE_SIZE = 10000
+
+
+class ContextCache(object):
+    """
+    Keeps the opaque contexts of datatypes received from Riak, keyed by
+    bucket type, bucket and key, so that elements can be removed from
+    a :class:`~riak.datatypes.Set` or :class:`~riak.datatypes.Map`
+    without fetching it first. Contexts are kept for ``ttl`` seconds,
+    and the least recently used are dropped once ``size`` keys are
+    cached.
+
+    A context only covers the elements which had been added when it
+    was received, so removes made with it leave later adds alone. The
+    ``ttl`` bounds how stale a context may be.
+
+    A client given a ``context_cache_ttl`` keeps one as its
+    :attr:`~riak.client.RiakClient.context_cache`. Fetching and
+    updating datatypes fill it, deleting them drops their contexts,
+    and datatypes without a context look theirs up when an element is
+    removed. Call :meth:`invalidate` or :meth:`clear` when a datatype
+    has been changed by other clients and removes should wait for a
+    fresh fetch.
+    """
+    def __init__(self, ttl, size=CONTEXT_CACHE_SIZE):
+        if ttl <= 0:
+            raise ValueError("ttl must be a positive number")
+        if size < 1:
+            raise ValueError("size must be a positive integer")
+        self.ttl = ttl
+        self.size = size
+        self._contexts = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, bucket, key):
+        """
+        Returns the cached context of a datatype, if any.
+
+        :param bucket: the bucket of the datatype
+        :type bucket: :class:`~riak.bucket.RiakBucket`
+        :param key: the key of the datatype
+        :type key: string
+        :rtype: bytes, None
+        """
+        ident = _ident(bucket, key)
+        with self._lock:
+            entry = self._contexts.get(ident)
+            if entry is None:
+                return None
+            context, expires = entry
+            if expires <= monotonic():
+                del self._contexts[ident]
+                return None
+            self._contexts.move_to_end(ident)
+            return context
+
+    def put(self, bucket, key, context):
+        """
+        Caches the context of a datatype.
+
+        :param bucket: the bucket of the datatype
+        :type bucket: :class:`~riak.bucket.RiakBucket`
+        :param key: the key of the datatype
+        :type key: string
+        :param context: the opaque context
+        :type context: bytes
+        """
+        ident = _ident(bucket, key)
+        with self._lock:
+            self._contexts[ident] = (context, monotonic() + self.ttl)
+            self._contexts.move_to_end(ident)
+            while len(self._contexts) > self.size:
+                self._contexts.popitem(last=False)
+
+    def invalidate(self, bucket, key):
+        """
+        Drops the cached context of a datatype.
+
+        :param bucket: the bucket of the datatype
+        :type bucket: :class:`~riak.bucket.RiakBucket`
+        :param key: the key of the datatype
+        :type key: string
+        """
+        with self._lock:
+            self._contexts.pop(_ident(bucket, key), None)
+
+    def clear(self):
+        """
+        Drops all cached contexts.
+        """
+        with self._lock:
+            self._contexts.clear()
+
+    def __len__(self):
+        return len(self._contexts)
+
+    def __repr__(self):
+        return "<{!s} ttl={!r} cached={!r}>".format(self.__class__.__name__,
+                                                    self.ttl, len(self))
+
+
+def _ident(bucket, key):
+    return (bucket.bucket_type.name, bucket.name, key)
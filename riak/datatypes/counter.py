@@ -56,6 +56,7 @@ class Counter(Datatype):
         """
         self._raise_if_badtype(amount)
         self._increment += amount
+        self._touch()
 
     def decrement(self, amount=1):
         """
@@ -66,6 +67,10 @@ class Counter(Datatype):
         """
         self._raise_if_badtype(amount)
         self._increment -= amount
+        self._touch()
+
+    def _merge(self, other):
+        self._increment += other._increment
 
     def _check_type(self, new_value):
         return isinstance(new_value, int)
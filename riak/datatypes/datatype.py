@@ -30,6 +30,11 @@ class Datatype(object):
     #: incorrect type. See also :meth:`_check_type`.
     _type_error_msg = "Invalid value type"
 
+    #: The :class:`~riak.datatypes.Map` this datatype is embedded in,
+    #: if any, and its key in that map. See also :meth:`_touch`.
+    _parent = None
+    _field = None
+
     def __init__(self, bucket=None, key=None, value=None, context=None):
         self.bucket = bucket
         self.key = key
@@ -128,6 +133,9 @@ class Datatype(object):
         self._context = None
         self._set_value(self._default_value())
         self.bucket._client.delete(self, **params)
+        cache = getattr(self.bucket._client, "context_cache", None)
+        if cache is not None:
+            cache.invalidate(self.bucket, self.key)
         return self
 
     def update(self, **params):
@@ -197,6 +205,29 @@ class Datatype(object):
         """
         return new_value
 
+    def _merge(self, other):
+        """
+        Adds the staged mutations of another datatype of the same type
+        to those of this one, such that sending them in a single
+        operation has the effect of sending this one's, then the
+        other's. Each type must implement this method.
+
+        :param other: the datatype whose mutations to add
+        :type other: :class:`Datatype`
+        """
+        raise NotImplementedError
+
+    def _touch(self):
+        """
+        Marks this datatype as modified in the maps it is embedded in,
+        so that they only need to consider their modified entries. Each
+        type must call this method when it stages a mutation.
+        """
+        parent, field = self._parent, self._field
+        while parent is not None:
+            parent._dirty.add(field)
+            parent, field = parent._parent, parent._field
+
     def _raise_if_badtype(self, new_value):
         if not self._check_type(new_value):
             raise TypeError(self._type_error_msg)
@@ -223,7 +254,29 @@ class Datatype(object):
 
     def _require_context(self):
         """
-        Raises an exception if the context is not present
+        Raises an exception if the context is not present, after
+        looking for it in the client's
+        :class:`~riak.datatypes.context_cache.ContextCache`, if any.
         """
+        if not self._context:
+            self._context = self._cached_context()
         if not self._context:
             raise ContextRequired()
+
+    def _cached_context(self):
+        """
+        Returns the context of the datatype, or of the map it is
+        embedded in, from the client's context cache.
+        """
+        root = self
+        while root._parent is not None:
+            root = root._parent
+        if root._context:
+            return root._context
+        if not root.bucket or not root.key:
+            return None
+        cache = getattr(root.bucket._client, "context_cache", None)
+        if cache is None:
+            return None
+        root._context = cache.get(root.bucket, root.key)
+        return root._context
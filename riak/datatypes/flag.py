@@ -44,6 +44,7 @@ class Flag(Datatype):
         Turns the flag on, effectively setting its value to ``True``.
         """
         self._op = "enable"
+        self._touch()
 
     def disable(self):
         """
@@ -51,6 +52,7 @@ class Flag(Datatype):
         """
         self._require_context()
         self._op = "disable"
+        self._touch()
 
     def to_op(self):
         """
@@ -60,6 +62,10 @@ class Flag(Datatype):
         """
         return self._op
 
+    def _merge(self, other):
+        if other._op is not None:
+            self._op = other._op
+
     def _check_type(self, new_value):
         return isinstance(new_value, bool)
 
@@ -12,12 +12,99 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from hashlib import sha1
+from math import log
 
 from riak.datatypes import TYPES
+from riak.util import str_to_bytes
 
 from .datatype import Datatype
 
-__all__ = ["Hll"]
+__all__ = ["Hll", "HllSketch"]
+
+#: The number of elements sent in each update of an :class:`Hll` which
+#: uses a sketch
+SKETCH_CHUNK_SIZE = 1000
+
+
+class HllSketch(object):
+    """
+    A HyperLogLog sketch kept on the client, which hashes elements as
+    Riak does, so that it can tell which elements may still change the
+    HyperLogLog of an :class:`Hll` with the same precision. Those which
+    do not raise any of its registers can be left out of updates
+    without changing the value in Riak. Its memory use is fixed by the
+    precision, at one byte for each of its ``2 ** precision``
+    registers.
+
+    Registers raised since the last :meth:`commit` are reverted by
+    :meth:`rollback`.
+    """
+    def __init__(self, precision):
+        if precision < 4 or precision > 16:
+            raise ValueError("precision must be between 4 and 16, inclusive")
+        self.precision = precision
+        size = 1 << precision
+        self._registers = bytearray(size)
+        self._committed = bytearray(size)
+        self._sum = float(size)
+        self._zeros = size
+
+    def add(self, element):
+        """
+        Adds an element to the sketch.
+
+        :param element: the element to add
+        :type element: str
+        :rtype: bool, whether it raised a register
+        """
+        # Riak's hyper library takes the register index from the first
+        # bits of the SHA-1 hash, and the rank from the zeros after them
+        width = 64 - self.precision
+        digest = int.from_bytes(sha1(str_to_bytes(element)).digest()[:8],
+                                "big")
+        index = digest >> width
+        rank = width - (digest & ((1 << width) - 1)).bit_length() + 1
+        current = self._registers[index]
+        if rank <= current:
+            return False
+        self._registers[index] = rank
+        self._sum += 2.0 ** -rank - 2.0 ** -current
+        if current == 0:
+            self._zeros -= 1
+        return True
+
+    def estimate(self):
+        """
+        Estimates the number of distinct elements added to the sketch.
+
+        :rtype: int
+        """
+        size = len(self._registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(
+            size, 0.7213 / (1 + 1.079 / size))
+        estimate = alpha * size * size / self._sum
+        if estimate <= 2.5 * size and self._zeros:
+            estimate = size * log(size / self._zeros)
+        return int(round(estimate))
+
+    def commit(self):
+        """
+        Keeps the registers raised so far.
+        """
+        self._committed[:] = self._registers
+
+    def rollback(self):
+        """
+        Reverts the registers raised since the last :meth:`commit`.
+        """
+        self._registers[:] = self._committed
+        self._sum = sum(2.0 ** -rank for rank in self._registers)
+        self._zeros = self._registers.count(0)
+
+    def __repr__(self):
+        return "<{!s} precision={!r}>".format(self.__class__.__name__,
+                                              self.precision)
 
 
 class Hll(Datatype):
@@ -28,14 +115,103 @@ class Hll(Datatype):
         myhll.add("barista")
         myhll.add("roaster")
         myhll.add("brewer")
+
+    When adding many elements, a :class:`HllSketch` can be kept with
+    :meth:`use_sketch`, so that only the elements which may change the
+    value in Riak are sent.
     """
 
     type_name = "hll"
     _type_error_msg = "Hlls can only be integers"
 
+    _sketch = None
+    _chunk_size = SKETCH_CHUNK_SIZE
+
     def _post_init(self):
         self._adds = set()
 
+    @property
+    def estimate(self):
+        """
+        The local estimate of the number of distinct elements added
+        since :meth:`use_sketch` was called, or None without a sketch.
+
+        :rtype: int, None
+        """
+        if self._sketch is not None:
+            return self._sketch.estimate()
+
+    def use_sketch(self, precision=None, chunk_size=SKETCH_CHUNK_SIZE):
+        """
+        Keeps a sketch of the elements added on the client, so that
+        repeated elements, and those which cannot change the value in
+        Riak, are not staged. The staged elements are then sent in
+        chunks of ``chunk_size`` elements by :meth:`update`. Example::
+
+            visitors = bucket.new("visitors").use_sketch()
+            for user_id in user_ids:
+                visitors.add(user_id)
+            visitors.update()
+
+        :param precision: the precision of the sketch, which must be
+          the ``hll_precision`` of the bucket type for elements to be
+          left out safely, and defaults to it
+        :type precision: int
+        :param chunk_size: the most elements sent in each update
+        :type chunk_size: int
+        :rtype: :class:`Hll`
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+        if precision is None:
+            if not self.bucket:
+                raise ValueError("bucket property not assigned")
+            precision = self.bucket.bucket_type.get_property(
+                "hll_precision")
+        self._sketch = HllSketch(precision)
+        self._chunk_size = chunk_size
+        for element in self._adds:
+            self._sketch.add(element)
+        return self
+
+    def update(self, **params):
+        """
+        Sends locally staged mutations to Riak, in chunks of elements
+        when a sketch is used. See :meth:`Datatype.update` for the
+        options. If an update fails, the elements not yet sent remain
+        staged.
+
+        :rtype: :class:`Hll`
+        """
+        if self._sketch is None:
+            return super(Hll, self).update(**params)
+        if not self.modified:
+            raise ValueError("No operation to perform")
+
+        params.setdefault("return_body", True)
+        pending = list(self._adds)
+        for start in range(0, len(pending), self._chunk_size):
+            self._adds = set(pending[start:start + self._chunk_size])
+            try:
+                self.bucket._client.update_datatype(self, **params)
+            except Exception:
+                self._adds = set(pending[start:])
+                raise
+        self._sketch.commit()
+        self.clear()
+        return self
+
+    store = update
+
+    def clear(self):
+        """
+        Removes all locally staged mutations, and the elements they
+        added to the sketch.
+        """
+        if self._sketch is not None:
+            self._sketch.rollback()
+        super(Hll, self).clear()
+
     def _default_value(self):
         return 0
 
@@ -69,7 +245,11 @@ class Hll(Datatype):
         """
         if not isinstance(element, str):
             raise TypeError("Hll elements can only be strings")
-        self._adds.add(element)
+        if self._sketch is None or self._sketch.add(element):
+            self._adds.add(element)
+
+    def _merge(self, other):
+        self._adds |= other._adds
 
     def _coerce_value(self, new_value):
         return int(new_value)
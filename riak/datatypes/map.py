@@ -110,6 +110,8 @@ class Map(Mapping, Datatype):
     def _post_init(self):
         self._removes = set()
         self._updates = {}
+        # The keys of the entries which may have staged mutations
+        self._dirty = set()
 
     @lazy_property
     def counters(self):
@@ -191,7 +193,7 @@ class Map(Mapping, Datatype):
             # If the key does not exist, we assume they are wanting to
             # create a new one with that name/type.
             if key not in self._updates:
-                self._updates[key] = TYPES[key[1]](context=self.context)
+                self._updates[key] = self._entry(key)
             return self._updates[key]
 
     def __iter__(self):
@@ -225,6 +227,7 @@ class Map(Mapping, Datatype):
         self._check_key(key)
         self._require_context()
         self._removes.add(key)
+        self._touch()
 
     def _check_key(self, key):
         """
@@ -257,12 +260,8 @@ class Map(Mapping, Datatype):
         """
         if self._removes:
             return True
-        for v in self._value:
-            if self._value[v].modified:
-                return True
-        for v in self._updates:
-            if self._updates[v].modified:
-                return True
+        for _ in self._modified_entries():
+            return True
         return False
 
     def to_op(self):
@@ -272,14 +271,23 @@ class Map(Mapping, Datatype):
         :rtype: list, None
         """
         removes = [("remove", r) for r in self._removes]
-        value_updates = list(self._extract_updates(self._value))
-        new_updates = list(self._extract_updates(self._updates))
-        all_updates = removes + value_updates + new_updates
+        updates = [("update", key, entry.to_op())
+                   for key, entry in self._modified_entries()]
+        all_updates = removes + updates
         if all_updates:
             return all_updates
         else:
             return None
 
+    def clear(self):
+        """
+        Removes all locally staged mutations, including those of the
+        embedded datatypes.
+        """
+        for _, entry in self._modified_entries():
+            entry.clear()
+        self._post_init()
+
     def _check_type(self, value):
         for key in value:
             try:
@@ -291,13 +299,43 @@ class Map(Mapping, Datatype):
     def _coerce_value(self, new_value):
         cvalue = {}
         for key in new_value:
-            cvalue[key] = TYPES[key[1]](value=new_value[key], context=self._context)
+            cvalue[key] = self._entry(key, new_value[key])
         return cvalue
 
-    def _extract_updates(self, d):
-        for key in d:
-            if d[key].modified:
-                yield ("update", key, d[key].to_op())
+    def _entry(self, key, value=None):
+        """
+        Creates the datatype embedded at the given key.
+        """
+        entry = TYPES[key[1]](value=value, context=self._context)
+        entry._parent = self
+        entry._field = key
+        return entry
+
+    def _modified_entries(self):
+        """
+        Yields the key and datatype of the entries which have staged
+        mutations, considering only those marked by :meth:`_touch`.
+        """
+        for key in self._dirty:
+            for entries in (self._value, self._updates):
+                entry = entries.get(key)
+                if entry is not None and entry.modified:
+                    yield key, entry
+
+    def _merge(self, other):
+        # A later remove discards the pending update of the entry.
+        # Removes apply before the updates in the same operation, so a
+        # later update of a removed entry resets it, as it would if
+        # sent after the remove.
+        for key in other._removes:
+            if self._updates.pop(key, None) is not None:
+                self._dirty.discard(key)
+        self._removes |= other._removes
+        for key, value in other._modified_entries():
+            if key not in self._updates:
+                self._updates[key] = self._entry(key)
+            self._updates[key]._merge(value)
+            self._dirty.add(key)
 
 
 TYPES["map"] = Map
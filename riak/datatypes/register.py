@@ -68,6 +68,11 @@ class Register(Sized, Datatype):
         """
         self._raise_if_badtype(new_value)
         self._new_value = new_value
+        self._touch()
+
+    def _merge(self, other):
+        if other._new_value is not None:
+            self._new_value = other._new_value
 
     def __len__(self):
         return len(self.value)
@@ -13,11 +13,82 @@
 # limitations under the License.
 
 import collections
+import collections.abc
+
+from bisect import bisect_left
 
 from riak.datatypes import TYPES
+from riak.util import bytes_to_str, str_to_bytes
 from .datatype import Datatype
 
-__all__ = ["Set"]
+__all__ = ["Set", "CompactSet"]
+
+
+class CompactSet(collections.abc.Set):
+    """An immutable set of strings, held as a sorted list of their
+    UTF-8 encoded bytes, which is the value of a :class:`Set`. It is
+    built from the members received from Riak without decoding them,
+    tests membership by bisection, and decodes members only as they
+    are iterated over. Bytes members may be tested for as well as
+    strings.
+
+    This class implements the `Set ABC
+    <https://docs.python.org/3/library/collections.abc.html>`_ and
+    compares equal to a ``frozenset`` of the same strings.
+    """
+
+    __slots__ = ("_members",)
+
+    def __init__(self, members=()):
+        self._members = sorted(set(_encode(member) for member in members))
+
+    @classmethod
+    def from_bytes(cls, members):
+        """
+        Creates a set from distinct encoded members, such as those of
+        a set value received from Riak, without decoding them.
+
+        :param members: the encoded members
+        :type members: iterable of bytes
+        :rtype: :class:`CompactSet`
+        """
+        value = cls.__new__(cls)
+        value._members = sorted(members)
+        return value
+
+    def iter_bytes(self):
+        """
+        Iterates over the encoded members, in order.
+
+        :rtype: iterator of bytes
+        """
+        return iter(self._members)
+
+    def __contains__(self, element):
+        if not isinstance(element, (str, bytes)):
+            return False
+        element = _encode(element)
+        i = bisect_left(self._members, element)
+        return i < len(self._members) and self._members[i] == element
+
+    def __iter__(self):
+        for member in self._members:
+            yield bytes_to_str(member)
+
+    def __len__(self):
+        return len(self._members)
+
+    def __eq__(self, other):
+        if isinstance(other, CompactSet):
+            return self._members == other._members
+        return collections.abc.Set.__eq__(self, other)
+
+    def __hash__(self):
+        # Equal to the hash of the frozenset it compares equal to
+        return hash(frozenset(self))
+
+    def __repr__(self):
+        return "{!s}({!r})".format(self.__class__.__name__, list(self))
 
 
 class Set(collections.Set, Datatype):
@@ -47,7 +118,7 @@ class Set(collections.Set, Datatype):
         self._removes = set()
 
     def _default_value(self):
-        return frozenset()
+        return CompactSet()
 
     @Datatype.modified.getter
     def modified(self):
@@ -96,6 +167,7 @@ class Set(collections.Set, Datatype):
         """
         _check_element(element)
         self._adds.add(element)
+        self._touch()
 
     def discard(self, element):
         """
@@ -110,12 +182,24 @@ class Set(collections.Set, Datatype):
         _check_element(element)
         self._require_context()
         self._removes.add(element)
+        self._touch()
+
+    def _merge(self, other):
+        # Later operations replace earlier ones on the same element
+        self._adds -= other._removes
+        self._removes -= other._adds
+        self._adds |= other._adds
+        self._removes |= other._removes
 
     def _coerce_value(self, new_value):
-        return frozenset(new_value)
+        if isinstance(new_value, CompactSet):
+            return new_value
+        return CompactSet(new_value)
 
     def _check_type(self, new_value):
-        if not isinstance(new_value, collections.Iterable):
+        if isinstance(new_value, CompactSet):
+            return True
+        if not isinstance(new_value, collections.abc.Iterable):
             return False
         for element in new_value:
             if not isinstance(element, str):
@@ -128,4 +212,10 @@ def _check_element(element):
         raise TypeError("Set elements can only be strings")
 
 
+def _encode(element):
+    if isinstance(element, bytes):
+        return element
+    return str_to_bytes(element)
+
+
 TYPES["set"] = Set
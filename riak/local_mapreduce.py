@@ -0,0 +1,241 @@
+# Copyright 2010-present Basho Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import deque, namedtuple
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from os import cpu_count
+
+from riak.client.multi import POOL_SIZE
+from riak.mapreduce import RiakLinkPhase
+
+#: The number of inputs fetched and mapped, or values reduced, at once
+BATCH_SIZE = 100
+
+#: The object passed to the map functions of a local map/reduce,
+#: mirroring the object given to Javascript map functions. ``values``
+#: holds a dict for each sibling, with the ``data``, ``content_type``,
+#: ``charset``, ``usermeta``, ``links``, ``indexes`` and
+#: ``last_modified`` of the sibling.
+LocalObject = namedtuple("LocalObject",
+                         ("bucket_type", "bucket", "key", "values"))
+
+
+def _map_batch(function, arg, inputs):
+    # Runs in the worker processes, so must be importable
+    results = []
+    for obj, keydata in inputs:
+        results.extend(function(obj, keydata, arg))
+    return results
+
+
+def _reduce_batch(function, arg, values):
+    return list(function(values, arg))
+
+
+def _input_entry(entry):
+    """
+    Splits a map/reduce input or a phase result, which is a list of
+    bucket, key and optional key data and bucket type, into a
+    (bucket_type, bucket, key, keydata) tuple.
+    """
+    bucket, key = entry[0], entry[1]
+    keydata = entry[2] if len(entry) > 2 else None
+    bucket_type = entry[3] if len(entry) > 3 else "default"
+    if isinstance(bucket, (list, tuple)):
+        bucket_type, bucket = bucket
+    return bucket_type, bucket, key, keydata
+
+
+class LocalMapReduce(object):
+    """
+    Runs the phases of a map/reduce operation on the client rather
+    than on Riak. The inputs are streamed from Riak and fetched
+    concurrently, then fed through the phases in batches, the map and
+    reduce functions being called in a pool of worker processes.
+    Iterating yields (phase, results) pairs for the phases whose
+    results are kept, as they are produced.
+
+    Reduce phases are applied to each batch of values, then again to
+    their own results together with the following batch, as Riak does,
+    so that associative reduces run in constant memory.
+
+    :meth:`RiakMapReduce.run_local
+    <riak.mapreduce.RiakMapReduce.run_local>` builds one from the
+    inputs and phases of the query and either collects its results
+    by phase or, when lazy, hands them to the caller as they are
+    iterated. The worker processes are started on iteration and shut
+    down once it ends.
+    """
+    def __init__(self, client, inputs, phases, workers=None,
+                 batch_size=BATCH_SIZE, concurrency=None, timeout=None):
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        self.client = client
+        self.inputs = inputs
+        self.phases = phases
+        self.workers = workers
+        self.batch_size = batch_size
+        self.concurrency = concurrency or POOL_SIZE
+        self.timeout = timeout
+        self._processes = None
+        self._fetcher = None
+        self._limit = workers or cpu_count() or 1
+
+    def __iter__(self):
+        if self.workers != 0:
+            self._processes = ProcessPoolExecutor(self.workers)
+        self._fetcher = ThreadPoolExecutor(self.concurrency)
+        kept = deque()
+        try:
+            batches = self.inputs
+            for i, phase in enumerate(self.phases):
+                batches = self._batches(batches)
+                if isinstance(phase, RiakLinkPhase):
+                    batches = self._link(phase, batches)
+                elif phase._type == "map":
+                    batches = self._map(phase, batches)
+                else:
+                    batches = self._reduce(phase, batches)
+                if phase._keep:
+                    batches = self._keep(i, batches, kept)
+
+            for batch in batches:
+                while kept:
+                    yield kept.popleft()
+                if not self.phases and batch:
+                    # Without phases, the inputs are the results
+                    yield 0, batch
+            while kept:
+                yield kept.popleft()
+        finally:
+            # Without phases, the inputs may be a plain iterator
+            close = getattr(batches, "close", None)
+            if close is not None:
+                close()
+            self._fetcher.shutdown()
+            if self._processes is not None:
+                self._processes.shutdown()
+
+    def _batches(self, chunks):
+        # Regroups a stream of lists into batches, passing on an empty
+        # batch for each list which does not complete one
+        batch = []
+        for chunk in chunks:
+            batch.extend(chunk)
+            if len(batch) < self.batch_size:
+                yield []
+            while len(batch) >= self.batch_size:
+                yield batch[:self.batch_size]
+                batch = batch[self.batch_size:]
+        if batch:
+            yield batch
+
+    def _keep(self, phase, batches, kept):
+        for batch in batches:
+            if batch:
+                kept.append((phase, batch))
+            yield batch
+
+    def _submit(self, function, *args):
+        if self._processes is not None:
+            return self._processes.submit(function, *args)
+        future = Future()
+        try:
+            future.set_result(function(*args))
+        except Exception as err:
+            future.set_exception(err)
+        return future
+
+    def _completed(self, pending, draining=False):
+        # Yields the results of the oldest calls in progress, waiting
+        # only once as many calls are in progress as there are workers
+        limit = 0 if draining else self._limit
+        while pending and (len(pending) > limit or pending[0].done()):
+            yield pending.popleft().result()
+
+    def _fetch(self, batch):
+        """
+        Fetches the objects for a batch of inputs concurrently,
+        returning (LocalObject, keydata) pairs for those that exist.
+        """
+        entries = [_input_entry(entry) for entry in batch]
+        objects = self._fetcher.map(self._get, entries)
+        return [(obj, keydata) for obj, (_, _, _, keydata)
+                in zip(objects, entries) if obj is not None]
+
+    def _get(self, entry):
+        bucket_type, bucket, key, _ = entry
+        bucket = self.client.bucket_type(bucket_type).bucket(bucket)
+        robj = bucket.get(key, timeout=self.timeout)
+        if not robj.exists:
+            return None
+        values = [{"data": sibling.data,
+                   "content_type": sibling.content_type,
+                   "charset": sibling.charset,
+                   "usermeta": sibling.usermeta,
+                   "links": sibling.links,
+                   "indexes": sibling.indexes,
+                   "last_modified": sibling.last_modified}
+                  for sibling in robj.siblings]
+        return LocalObject(bucket_type, bucket.name, key, values)
+
+    def _map(self, phase, batches):
+        pending = deque()
+        for batch in batches:
+            inputs = self._fetch(batch)
+            if inputs:
+                pending.append(self._submit(_map_batch, phase._function,
+                                            phase._arg, inputs))
+            produced = False
+            for results in self._completed(pending):
+                produced = True
+                yield results
+            if not produced:
+                # Lets kept results of earlier phases through
+                yield []
+        for results in self._completed(pending, draining=True):
+            yield results
+
+    def _reduce(self, phase, batches):
+        function, arg = phase._function, phase._arg
+        pending = deque()
+        reduced = None
+        for batch in batches:
+            if batch:
+                pending.append(self._submit(_reduce_batch, function, arg,
+                                            batch))
+            for results in self._completed(pending):
+                reduced = results if reduced is None else \
+                    _reduce_batch(function, arg, reduced + results)
+            yield []
+        for results in self._completed(pending, draining=True):
+            reduced = results if reduced is None else \
+                _reduce_batch(function, arg, reduced + results)
+        if reduced is None:
+            reduced = _reduce_batch(function, arg, [])
+        yield reduced
+
+    def _link(self, phase, batches):
+        for batch in batches:
+            links = []
+            for obj, _ in self._fetch(batch):
+                for value in obj.values:
+                    for bucket, key, tag in value["links"]:
+                        if phase._bucket in ("_", bucket) and \
+                                phase._tag in ("_", tag):
+                            links.append([bucket, key, tag])
+            yield links
+
+    def __repr__(self):
+        return "<{!s} {!r}>".format(self.__class__.__name__, self.phases)
@@ -17,6 +17,10 @@
 
 
 from collections import Iterable, namedtuple
+from functools import partial
+import operator
+import re
+from urllib.parse import unquote_plus
 import riak
 
 
@@ -24,6 +28,27 @@ import riak
 #: backwards-compatible format: ``RiakLink(bucket, key, tag)``
 RiakLink = namedtuple("RiakLink", ("bucket", "key", "tag"))
 
+# reduceLimit is broken in riak_kv
+REDUCE_LIMIT_SOURCE = """function(value, arg) {
+            return value.slice(0, arg);
+        }"""
+
+#: The built-in Javascript reduce functions which
+#: :meth:`RiakMapReduce.run_parallel` re-applies to the merged results
+#: of its jobs, given the values and the phase argument. Sorting
+#: compares values as strings, as Javascript does.
+CLIENT_REDUCES = {
+    "Riak.reduceSum": lambda values, arg: [sum(values)],
+    "Riak.reduceMin": lambda values, arg: [min(values)] if values else [],
+    "Riak.reduceMax": lambda values, arg: [max(values)] if values else [],
+    "Riak.reduceSort": lambda values, arg: sorted(values, key=str),
+    "Riak.reduceNumericSort": lambda values, arg: sorted(values),
+    REDUCE_LIMIT_SOURCE: lambda values, arg: values[:arg],
+}
+
+# Reduce phases whose results can simply be concatenated
+CONCATENATING_REDUCES = ("Riak.filterNotFound",)
+
 
 class RiakMapReduce(object):
     """
@@ -244,8 +269,8 @@ class RiakMapReduce(object):
         :param function: Either a named Javascript function (ie:
           "Riak.mapValues"), or an anonymous javascript function (ie:
           "function(...) ... " or an array ["erlang_module",
-          "function"].
-        :type function: string, list
+          "function"], or a Python function for :meth:`run_local`.
+        :type function: string, list, function
         :param options: phase options, containing "language", "keep"
           flag, and/or "arg".
         :type options: dict
@@ -255,6 +280,8 @@ class RiakMapReduce(object):
             options = dict()
         if isinstance(function, list):
             language = "erlang"
+        elif callable(function):
+            language = "python"
         else:
             language = "javascript"
 
@@ -273,8 +300,8 @@ class RiakMapReduce(object):
         :param function: Either a named Javascript function (ie.
           "Riak.reduceSum"), or an anonymous javascript function(ie:
           "function(...) { ... }" or an array ["erlang_module",
-          "function"].
-        :type function: string, list
+          "function"], or a Python function for :meth:`run_local`.
+        :type function: string, list, function
         :param options: phase options, containing "language", "keep"
           flag, and/or "arg".
         :rtype: :class:`RiakMapReduce`
@@ -283,6 +310,8 @@ class RiakMapReduce(object):
             options = dict()
         if isinstance(function, list):
             language = "erlang"
+        elif callable(function):
+            language = "python"
         else:
             language = "javascript"
 
@@ -294,29 +323,47 @@ class RiakMapReduce(object):
         self._phases.append(mr)
         return self
 
-    def run(self, timeout=None):
+    def run(self, timeout=None, sink=None, lazy=False):
         """
         Run the map/reduce operation synchronously. Returns a list of
         results, or a list of links if the last phase is a link phase.
         Shortcut for :meth:`riak.client.RiakClient.mapred`.
 
+        Large results need not be held in memory at once: given a
+        ``sink``, it is called with the phase number and a list of
+        results as each chunk of results arrives, and nothing is
+        returned. With ``lazy``, an iterator of (phase, results) pairs
+        is returned instead, which streams the results as it is
+        consumed and should be closed if not consumed in full. Example::
+
+            mr.run(sink=lambda phase, results: output.write(results))
+
+            for phase, results in mr.run(lazy=True):
+                do_something(phase, results)
+
         :param timeout: Timeout in milliseconds
         :type timeout: integer, None
+        :param sink: a function called with each chunk of results
+        :type sink: function
+        :param lazy: whether to return an iterator over chunks of
+          results
+        :type lazy: boolean
         :rtype: list
         """
+        if sink is not None or lazy:
+            results = self._run_stream(timeout)
+            if lazy:
+                return results
+            for phase, data in results:
+                sink(phase, data)
+            return None
+
         query, link_results_flag = self._normalize_query()
 
         try:
             result = self._client.mapred(self._inputs, query, timeout)
         except riak.RiakError as e:
-            if "worker_startup_failed" in e.value:
-                for phase in self._phases:
-                    if phase._language == "erlang":
-                        if type(phase._function) is str:
-                            raise riak.RiakError(
-                                "May have tried erlang strfun when not allowed\n",
-                                f"original error: {e.value}",
-                            )
+            self._check_worker_startup(e)
             raise e
 
         # If the last phase is NOT a link phase, then return the result.
@@ -329,6 +376,274 @@ class RiakMapReduce(object):
 
         # Otherwise, if the last phase IS a link phase, then convert the
         # results to link tuples.
+        return self._to_links(result)
+
+    def run_parallel(self, chunk_size=1000, concurrency=None, timeout=None):
+        """
+        Run the map/reduce operation as several jobs at once, each
+        over a chunk of the inputs, and merge their results. The jobs
+        are spread over the nodes of the cluster, so that no single
+        node coordinates the whole operation or receives all of the
+        inputs. Returns the same results as :meth:`run` over Protocol
+        Buffers, with map results in the order of the input chunks.
+
+        Only explicit bucket/key inputs can be split. As each job
+        reduces its own chunk, a reduce phase must be the last phase
+        and one of the Javascript built-ins in :data:`CLIENT_REDUCES`,
+        which is re-applied to the merged results on the client.
+        ``Riak.filterNotFound`` may appear in any phase. Example::
+
+            mr = client.add("bucket", keys).map_values_json().reduce_sum()
+            total = mr.run_parallel(chunk_size=5000, concurrency=8)
+
+        :param chunk_size: the number of inputs in each job
+        :type chunk_size: int
+        :param concurrency: the number of jobs to run at once,
+          defaults to :data:`riak.client.multi.POOL_SIZE`
+        :type concurrency: int
+        :param timeout: Timeout in milliseconds for each job
+        :type timeout: integer, None
+        :rtype: list
+        """
+        from riak.client.multi import multistream, POOL_SIZE
+
+        if not isinstance(self._inputs, list):
+            raise ValueError("Only bucket/key inputs can be run in "
+                             "parallel.")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+        reducer = self._client_reducer()
+
+        query, link_results_flag = self._normalize_query()
+        last_phase = max(len(query) - 1, 0)
+        chunks = (self._inputs[i:i + chunk_size]
+                  for i in range(0, len(self._inputs), chunk_size))
+
+        def _run_chunk(inputs):
+            results = {}
+            stream = self._client.stream_mapred(inputs, query, timeout)
+            try:
+                for phase, data in stream:
+                    results.setdefault(phase, []).extend(data)
+            except riak.RiakError as e:
+                self._check_worker_startup(e)
+                raise e
+            finally:
+                stream.close()
+            return results
+
+        result = {}
+        for chunk_result in multistream(_run_chunk, chunks,
+                                        concurrency or POOL_SIZE,
+                                        ordered=True):
+            for phase, data in chunk_result.items():
+                result.setdefault(phase, []).extend(data)
+
+        if reducer is not None and self._phases[-1]._keep:
+            result[last_phase] = reducer(result.get(last_phase, []))
+
+        links = link_results_flag or \
+            isinstance(self._phases[-1], RiakLinkPhase)
+        return self._phase_results(result, links, last_phase)
+
+    def _phase_results(self, result, links, last_phase):
+        # As with run(), results of several kept phases are keyed by
+        # phase
+        if links:
+            if last_phase in result:
+                result[last_phase] = self._to_links(result[last_phase])
+            elif not result:
+                return []
+        if not result:
+            return None
+        elif len(result) == 1:
+            return result[max(result.keys())]
+        else:
+            return result
+
+    def run_local(self, workers=None, batch_size=None, concurrency=None,
+                  timeout=None, lazy=False):
+        """
+        Run the map/reduce operation on the client rather than on
+        Riak, with Python functions as the map and reduce phases.
+        Returns the same results as :meth:`run_parallel`, or with
+        ``lazy``, an iterator of (phase, results) pairs as in
+        :meth:`run`.
+
+        The bucket, key or secondary index inputs are streamed from
+        Riak, with any key filters evaluated on the client, and the
+        objects fetched over ``concurrency`` connections,
+        skipping those not found. Map functions are called with a
+        :data:`~riak.local_mapreduce.LocalObject`, the key data and
+        the phase argument, and return a list of results. Reduce
+        functions are called with a list of values and the phase
+        argument, and must be re-reducible, as in Riak. Both are called
+        in a pool of ``workers`` processes, so they must be defined at
+        the top level of a module, or in this process with ``workers``
+        set to 0. Example::
+
+            def map_total(obj, keydata, arg):
+                return [obj.values[0]["data"]["total"]]
+
+            def reduce_sum(values, arg):
+                return [sum(values)]
+
+            mr = client.index("orders", "day_bin", "2016-01-01", "2016-01-31")
+            total = mr.map(map_total).reduce(reduce_sum).run_local(workers=4)
+
+        :param workers: the number of worker processes, defaults to
+          the number of CPUs
+        :type workers: int
+        :param batch_size: the number of objects passed to a worker
+          at once, defaults to
+          :data:`~riak.local_mapreduce.BATCH_SIZE`
+        :type batch_size: int
+        :param concurrency: the number of objects fetched at once,
+          defaults to :data:`riak.client.multi.POOL_SIZE`
+        :type concurrency: int
+        :param timeout: Timeout in milliseconds for each request
+        :type timeout: integer, None
+        :param lazy: whether to return an iterator over chunks of
+          results
+        :type lazy: boolean
+        :rtype: list
+        """
+        from riak.local_mapreduce import BATCH_SIZE, LocalMapReduce
+
+        for phase in self._phases:
+            if isinstance(phase, RiakMapReducePhase) and \
+                    phase._language != "python":
+                raise ValueError("Only Python phases can be run locally.")
+        if self._phases and not any(phase._keep for phase in self._phases):
+            self._phases[-1]._keep = True
+        links = not self._phases or \
+            isinstance(self._phases[-1], RiakLinkPhase)
+        last_phase = max(len(self._phases) - 1, 0)
+
+        engine = LocalMapReduce(self._client, self._local_inputs(timeout),
+                                self._phases, workers,
+                                batch_size or BATCH_SIZE, concurrency,
+                                timeout)
+        results = self._run_local_stream(engine, links, last_phase)
+        if lazy:
+            return results
+
+        result = {}
+        for phase, data in results:
+            result.setdefault(phase, []).extend(data)
+        return self._phase_results(result, links, last_phase)
+
+    def _run_local_stream(self, engine, links, last_phase):
+        for phase, data in engine:
+            if links and phase == last_phase:
+                data = self._to_links(data)
+            yield phase, data
+
+    def _local_inputs(self, timeout):
+        """
+        Returns an iterator over lists of inputs for :meth:`run_local`,
+        streaming the keys of a bucket or index from Riak.
+        """
+        inputs = self._inputs
+        if self._input_mode == "query":
+            if "query" in inputs:
+                raise NotImplementedError("Search inputs can't be run "
+                                          "locally.")
+            bucket = self._local_bucket(inputs["bucket"])
+            if "key" in inputs:
+                startkey, endkey = inputs["key"], None
+            else:
+                startkey, endkey = inputs["start"], inputs["end"]
+            index = inputs["index"]
+
+            def _open():
+                stream = self._client.stream_index(bucket, index, startkey,
+                                                   endkey, timeout=timeout)
+                return stream, stream.results
+        elif self._input_mode == "bucket":
+            if isinstance(inputs, dict):
+                inputs = inputs["bucket"]
+            bucket = self._local_bucket(inputs)
+            key_filter = compile_key_filters(self._key_filters) \
+                if self._key_filters else None
+
+            def _open():
+                stream = self._client.stream_keys(bucket, timeout,
+                                                  filter=key_filter)
+                return stream, stream
+        else:
+            return iter([list(inputs)])
+
+        def _inputs():
+            stream, results = _open()
+            try:
+                for keys in results:
+                    yield [[bucket.name, key, None, bucket.bucket_type.name]
+                           for key in keys]
+            finally:
+                stream.close()
+
+        return _inputs()
+
+    def _local_bucket(self, bucket):
+        if isinstance(bucket, list):
+            return self._client.bucket_type(bucket[0]).bucket(bucket[1])
+        return self._client.bucket(bucket)
+
+    def _client_reducer(self):
+        # Returns a function re-applying the final reduce phase, if
+        # any, and checks the phases can be run over chunks of inputs
+        reducer = None
+        for i, phase in enumerate(self._phases):
+            if not isinstance(phase, RiakMapReducePhase) or \
+                    phase._type != "reduce":
+                continue
+            if phase._language == "javascript" and \
+                    phase._function in CONCATENATING_REDUCES:
+                continue
+            if i != len(self._phases) - 1:
+                raise ValueError("Only the last phase of a parallel "
+                                 "map/reduce can be a reduce phase.")
+            if phase._language != "javascript" or \
+                    not isinstance(phase._function, str) or \
+                    phase._function not in CLIENT_REDUCES or \
+                    (phase._function == "Riak.reduceSort" and phase._arg):
+                raise ValueError("The reduce phase of a parallel "
+                                 "map/reduce must be a built-in which "
+                                 "can be re-applied on the client.")
+            reducer = partial(CLIENT_REDUCES[phase._function],
+                              arg=phase._arg)
+        return reducer
+
+    def _run_stream(self, timeout):
+        query, link_results_flag = self._normalize_query()
+        links = link_results_flag or \
+            isinstance(self._phases[-1], RiakLinkPhase)
+        link_phase = max(len(query) - 1, 0)
+
+        stream = self._client.stream_mapred(self._inputs, query, timeout)
+        try:
+            for phase, data in stream:
+                if links and phase == link_phase:
+                    data = self._to_links(data)
+                yield phase, data
+        except riak.RiakError as e:
+            self._check_worker_startup(e)
+            raise e
+        finally:
+            stream.close()
+
+    def _check_worker_startup(self, e):
+        if "worker_startup_failed" in e.value:
+            for phase in self._phases:
+                if phase._language == "erlang":
+                    if type(phase._function) is str:
+                        raise riak.RiakError(
+                            "May have tried erlang strfun when not allowed\n",
+                            f"original error: {e.value}",
+                        )
+
+    def _to_links(self, result):
         a = []
         for r in result:
             if (len(r) == 2):
@@ -339,17 +654,20 @@ class RiakMapReduce(object):
 
         return a
 
-    def stream(self, timeout=None):
+    def stream(self, timeout=None, raw=False):
         """
         Streams the MapReduce query (returns an iterator). Shortcut
         for :meth:`riak.client.RiakClient.stream_mapred`.
 
         :param timeout: Timeout in milliseconds
         :type timeout: integer
+        :param raw: whether to yield the data as the JSON bytes received
+        :type raw: boolean
         :rtype: iterator that yields (phase_num, data) tuples
         """
         query, lrf = self._normalize_query()
-        return self._client.stream_mapred(self._inputs, query, timeout)
+        return self._client.stream_mapred(self._inputs, query, timeout,
+                                          raw=raw)
 
     def _normalize_query(self):
         num_phases = len(self._phases)
@@ -488,11 +806,7 @@ class RiakMapReduce(object):
             options = dict()
 
         options["arg"] = limit
-        # reduceLimit is broken in riak_kv
-        code = """function(value, arg) {
-            return value.slice(0, arg);
-        }"""
-        return self.reduce(code, options=options)
+        return self.reduce(REDUCE_LIMIT_SOURCE, options=options)
 
     def reduce_slice(self, start, end, options=None):
         """
@@ -543,7 +857,7 @@ class RiakMapReducePhase(object):
         :type type: string
         :param function: the function to execute
         :type function: string, list
-        :param language: "javascript" or "erlang"
+        :param language: "javascript", "erlang" or "python"
         :type language: string
         :param keep: whether to return the output of this phase in the results.
         :type keep: boolean
@@ -564,6 +878,9 @@ class RiakMapReducePhase(object):
 
         :rtype: dict
         """
+        if self._language == "python":
+            raise ValueError("Python phases can only be run locally.")
+
         stepdef = {"keep": self._keep,
                    "language": self._language,
                    "arg": self._arg}
@@ -624,6 +941,142 @@ class RiakLinkPhase(object):
         return {"link": stepdef}
 
 
+def _tokenize(separator, n):
+    # Like Erlang's string:tokens/2, any of the separator characters
+    # splits the key and empty tokens are dropped
+    if len(separator) == 1:
+        split = operator.methodcaller("split", separator)
+    else:
+        split = re.compile("[" + re.escape(separator) + "]").split
+
+    def tokenize(value):
+        return [token for token in split(value) if token][n - 1]
+    return tokenize
+
+
+def _similar_to(other, distance):
+    def similar_to(value):
+        # Levenshtein distance, a row at a time
+        previous = list(range(len(other) + 1))
+        for i, char in enumerate(value, 1):
+            current = [i]
+            for j, other_char in enumerate(other, 1):
+                current.append(min(previous[j] + 1, current[j - 1] + 1,
+                                   previous[j - 1] + (char != other_char)))
+            previous = current
+        return previous[-1] <= distance
+    return similar_to
+
+
+def _between(low, high, inclusive=True):
+    if inclusive:
+        return lambda value: low <= value <= high
+    return lambda value: low < value < high
+
+
+#: Key filters which transform the key for the filters that follow
+KEY_FILTER_TRANSFORMS = {
+    "int_to_string": lambda: str,
+    "string_to_int": lambda: int,
+    "float_to_string": lambda: str,
+    "string_to_float": lambda: float,
+    "to_upper": lambda: operator.methodcaller("upper"),
+    "to_lower": lambda: operator.methodcaller("lower"),
+    "tokenize": _tokenize,
+    "urldecode": lambda: unquote_plus,
+}
+
+#: Key filters which test the key, transformed by the filters before
+#: them
+KEY_FILTER_PREDICATES = {
+    "greater_than": lambda arg: partial(operator.lt, arg),
+    "less_than": lambda arg: partial(operator.gt, arg),
+    "greater_than_eq": lambda arg: partial(operator.le, arg),
+    "less_than_eq": lambda arg: partial(operator.ge, arg),
+    "between": _between,
+    "matches": lambda regex: re.compile(regex).search,
+    "neq": lambda arg: partial(operator.ne, arg),
+    "eq": lambda arg: partial(operator.eq, arg),
+    "set_member": lambda *members: frozenset(members).__contains__,
+    "similar_to": _similar_to,
+    "starts_with": lambda prefix: operator.methodcaller("startswith",
+                                                        prefix),
+    "ends_with": lambda suffix: operator.methodcaller("endswith", suffix),
+}
+
+
+def compile_key_filters(filters):
+    """
+    Compiles a list of key filters, as given to
+    :meth:`RiakMapReduce.add_key_filters` or built with
+    :class:`RiakKeyFilter`, into a function which tests whether a key
+    passes them, the way Riak would. Regular expressions and the other
+    arguments are prepared once, so that the function can be applied
+    to many keys cheaply. A key which a transform fails on, such as
+    ``string_to_int`` on a key which is not a number, does not pass.
+
+    :param filters: the key filters
+    :type filters: list, :class:`RiakKeyFilter`
+    :rtype: function
+    """
+    test = _compile_filters(list(filters))
+
+    def key_filter(key):
+        try:
+            return bool(test(key))
+        except (AttributeError, IndexError, TypeError, ValueError):
+            return False
+    return key_filter
+
+
+def _compile_filters(filters):
+    # Builds the function from the last filter back, so that each
+    # transform feeds the filters after it
+    test = None
+    for key_filter in reversed(filters):
+        name, args = key_filter[0], key_filter[1:]
+        if name in ("and", "or"):
+            step = _compile_bool(name, [_compile_filters(list(operand))
+                                        for operand in args])
+        elif name == "not":
+            step = _compile_not(_compile_filters(list(args[0])))
+        elif name in KEY_FILTER_TRANSFORMS:
+            transform = KEY_FILTER_TRANSFORMS[name](*args)
+            test = _compile_transform(transform, test)
+            continue
+        elif name in KEY_FILTER_PREDICATES:
+            step = KEY_FILTER_PREDICATES[name](*args)
+        else:
+            raise ValueError(f"Unknown key filter: {name}")
+        test = step if test is None else _compile_both(step, test)
+    return test or (lambda value: True)
+
+
+def _compile_transform(transform, test):
+    if test is None:
+        return lambda value: transform(value) is not None
+    return lambda value: test(transform(value))
+
+
+def _compile_bool(name, operands):
+    if len(operands) == 2:
+        first, second = operands
+        if name == "and":
+            return _compile_both(first, second)
+        return lambda value: first(value) or second(value)
+    if name == "and":
+        return lambda value: all(test(value) for test in operands)
+    return lambda value: any(test(value) for test in operands)
+
+
+def _compile_not(test):
+    return lambda value: not test(value)
+
+
+def _compile_both(first, second):
+    return lambda value: first(value) and second(value)
+
+
 class RiakKeyFilter(object):
     """
     A helper class for building up lists of key filters. Unknown
@@ -684,6 +1137,22 @@ class RiakKeyFilter(object):
     def __iter__(self):
         return iter(self._filters)
 
+    def compile(self):
+        """
+        Compiles the filters into a function which tests whether a
+        key passes them. See :func:`compile_key_filters`.
+
+        Example::
+
+            years = key_filter.tokenize("-", 1).string_to_int()
+            keep = years.between(2005, 2010).compile()
+            keep("2008-07-01")
+            # => True
+
+        :rtype: function
+        """
+        return compile_key_filters(self._filters)
+
 
 class RiakMapReduceChain(object):
     """
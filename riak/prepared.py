@@ -0,0 +1,136 @@
+# Copyright 2010-present Basho Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from weakref import WeakKeyDictionary
+
+from riak import ConflictError, RiakError
+from riak.client.operations import _validate_timeout
+from riak.riak_object import RiakObject
+
+
+class PreparedOperation(object):
+    """
+    A request against a single bucket whose options are fixed up
+    front. Transports which support it serialize the invariant part of
+    the request once, so that each call only has to encode what varies,
+    such as the key. Instances are returned by
+    :meth:`RiakBucket.prepare_get <riak.bucket.RiakBucket.prepare_get>`,
+    :meth:`RiakBucket.prepare_put <riak.bucket.RiakBucket.prepare_put>`
+    and :meth:`RiakBucket.prepare_delete
+    <riak.bucket.RiakBucket.prepare_delete>`, and are safe to share
+    between threads.
+    """
+    def __init__(self, bucket, **options):
+        if bucket.bucket_type.datatype:
+            raise RiakError("Prepared operations are not supported on "
+                            "datatype buckets")
+        _validate_timeout(options.get("timeout"))
+        self.bucket = bucket
+        self.options = options
+        self._templates = WeakKeyDictionary()
+
+    def template(self, codec):
+        """
+        Returns the invariant part of the request as serialized by the
+        given codec, serializing it on first use. Templates are cached
+        per codec, as the codec's server capabilities affect the
+        encoding.
+
+        :param codec: the codec of the transport executing the request
+        :type codec: :class:`PbufCodec <riak.codecs.pbuf.PbufCodec>`
+        :rtype: bytes
+        """
+        template = self._templates.get(codec)
+        if template is None:
+            template = self._prepare(codec)
+            self._templates[codec] = template
+        return template
+
+    def _prepare(self, codec):
+        raise NotImplementedError
+
+    def __repr__(self):
+        return "<{0} {1!r} {2!r}>".format(type(self).__name__,
+                                          self.bucket, self.options)
+
+
+class PreparedGet(PreparedOperation):
+    """
+    A prepared fetch of objects from a bucket.
+    """
+    def _prepare(self, codec):
+        return codec.prepare_get(self.bucket, **self.options)
+
+    def get(self, key):
+        """
+        Fetches the object stored under ``key``.
+
+        :param key: Name of the key.
+        :type key: string
+        :rtype: :class:`RiakObject <riak.riak_object.RiakObject>`
+        """
+        robj = RiakObject(self.bucket._client, self.bucket, key)
+        return self.bucket._client.prepared_get(self, robj)
+
+    __call__ = get
+
+
+class PreparedPut(PreparedOperation):
+    """
+    A prepared store of objects into a bucket.
+    """
+    def _prepare(self, codec):
+        return codec.prepare_put(self.bucket, **self.options)
+
+    def store(self, robj):
+        """
+        Stores an object, which must belong to the prepared bucket.
+
+        :param robj: the object to store
+        :type robj: :class:`RiakObject <riak.riak_object.RiakObject>`
+        :rtype: :class:`RiakObject <riak.riak_object.RiakObject>`
+        """
+        if robj.bucket != self.bucket:
+            raise ValueError("Object does not belong to the bucket "
+                             "this operation was prepared for")
+        if len(robj.siblings) != 1:
+            raise ConflictError("Attempting to store an invalid object, "
+                                "resolve the siblings first")
+        self.bucket._client.prepared_put(self, robj)
+        return robj
+
+    __call__ = store
+
+
+class PreparedDelete(PreparedOperation):
+    """
+    A prepared deletion of keys from a bucket.
+    """
+    def _prepare(self, codec):
+        return codec.prepare_delete(self.bucket, **self.options)
+
+    def delete(self, key):
+        """
+        Deletes the object stored under ``key``.
+
+        :param key: Name of the key.
+        :type key: string
+        :rtype: :class:`RiakObject <riak.riak_object.RiakObject>`
+        """
+        robj = RiakObject(self.bucket._client, self.bucket, key)
+        self.bucket._client.prepared_delete(self, robj)
+        robj.clear()
+        return robj
+
+    __call__ = delete
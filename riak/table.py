@@ -100,3 +100,17 @@ class Table(object):
         :rtype: list
         """
         return self._client.ts_stream_keys(self, timeout)
+
+    def scan(self, timeout=None, concurrency=None):
+        """
+        Fetches every row of a timeseries table, streaming its keys
+        and fetching rows in parallel.
+
+        :param timeout: a timeout value in milliseconds for the key
+           listing
+        :type timeout: int
+        :param concurrency: the number of rows to fetch at a time
+        :type concurrency: int
+        :rtype: iterator
+        """
+        return self._client.ts_scan(self, timeout, concurrency)
@@ -497,3 +497,192 @@ class TwoITests(IntegrationTestBase, unittest.TestCase):
             ).add_index("field2_int", int_sign * 1004).store()
 
         return bucket, o1, o2, o3, o4
+
+
+class ListStream(object):
+    """
+    Stands in for an index stream, yielding chunks of results.
+    """
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._chunks)
+
+    def close(self):
+        self.closed = True
+
+
+class IndexClient(object):
+    """
+    Answers streaming index queries over integer terms from memory,
+    in chunks of three results.
+    """
+    def __init__(self, terms):
+        self.entries = sorted((term, "k{:d}".format(term)) for term in terms)
+        self.queries = []
+
+    def stream_index(self, bucket, index, startkey, endkey=None,
+                     return_terms=None, max_results=None, continuation=None,
+                     timeout=None, term_regex=None):
+        from riak.client.index_page import CONTINUATION, IndexPage
+        self.queries.append((startkey, endkey, continuation))
+        offset = int(continuation or 0)
+        matches = [(t, k) for t, k in self.entries
+                   if startkey <= t <= endkey][offset:]
+        chunks = []
+        if max_results and len(matches) > max_results:
+            matches = matches[:max_results]
+            chunks.append(CONTINUATION(str(offset + max_results)))
+        results = matches if return_terms else [k for _, k in matches]
+        chunks[:0] = [results[i:i + 3] for i in range(0, len(results), 3)]
+        page = IndexPage(self, bucket, index, startkey, endkey,
+                         return_terms, max_results, term_regex)
+        page.stream = True
+        page.results = ListStream(chunks)
+        return page
+
+    def get_index(self, *args, **kwargs):
+        page = self.stream_index(*args, **kwargs)
+        page.stream = False
+        results = []
+        for chunk in page.results:
+            if isinstance(chunk, list):
+                results.extend(chunk)
+            else:
+                page.continuation = chunk.c
+        page.results = results
+        return page
+
+
+class IndexScanUnitTests(unittest.TestCase):
+    def test_split_int_range(self):
+        from riak.client.index_scan import split_index_range
+        self.assertEqual([(0, 24), (25, 49), (50, 74), (75, 99)],
+                         split_index_range("age_int", 0, 99, 4))
+        self.assertEqual([(0, 0), (1, 1), (2, 2)],
+                         split_index_range("age_int", 0, 2, 8))
+        self.assertEqual([(5, None)],
+                         split_index_range("age_int", 5, None, 8))
+
+    def test_split_bin_range(self):
+        from riak.client.index_scan import split_index_range
+        ranges = split_index_range("name_bin", "aa", "azé", 5)
+        self.assertEqual(5, len(ranges))
+        self.assertEqual("aa", ranges[0][0])
+        self.assertEqual("azé", ranges[-1][1])
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end + "\x00", start)
+        for start, end in ranges:
+            self.assertLess(start, end)
+            start.encode("utf-8")
+            end.encode("utf-8")
+
+    def test_scan(self):
+        from riak.client.index_scan import IndexScan
+        client = IndexClient(range(100))
+        ranges = [(0, 49, None), (50, 99, None)]
+        for ordered in (False, True):
+            scan = IndexScan(client, None, "age_int", ranges,
+                             ordered=ordered, return_terms=True)
+            results = [r for chunk in scan for r in chunk]
+            if ordered:
+                self.assertEqual(client.entries, results)
+            else:
+                self.assertEqual(client.entries, sorted(results))
+            self.assertFalse(scan.has_next_page())
+
+    def test_scan_continuation(self):
+        from riak.client.index_scan import IndexScan
+        client = IndexClient(range(30))
+        ranges = [(0, 9, None), (10, 29, None)]
+        keys = []
+        while ranges:
+            scan = IndexScan(client, None, "age_int", ranges,
+                             max_results=8)
+            keys.extend(k for chunk in scan for k in chunk)
+            ranges = scan.continuation
+        self.assertEqual(sorted(k for _, k in client.entries), sorted(keys))
+        self.assertEqual(len(set(keys)), len(keys))
+
+
+class PaginatePrefetchUnitTests(unittest.TestCase):
+    def client(self, index_client):
+        from riak import RiakClient
+        client = RiakClient()
+        client.get_index = index_client.get_index
+        client.stream_index = index_client.stream_index
+        return client
+
+    def test_paginate_index_prefetch(self):
+        import time
+        index_client = IndexClient(range(100))
+        client = self.client(index_client)
+        pages = client.paginate_index(None, "age_int", 0, 99,
+                                      max_results=10, prefetch=3)
+        keys = list(next(pages))
+        # The next pages are fetched while the first is consumed
+        deadline = time.monotonic() + 10
+        while len(index_client.queries) < 5 and \
+                time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(5, len(index_client.queries))
+        for page in pages:
+            keys.extend(page)
+        self.assertEqual([k for _, k in index_client.entries], keys)
+        self.assertEqual(10, len(index_client.queries))
+
+    def test_paginate_stream_index_prefetch(self):
+        index_client = IndexClient(range(95))
+        client = self.client(index_client)
+        keys = []
+        for page in client.paginate_stream_index(None, "age_int", 0, 99,
+                                                 max_results=10,
+                                                 prefetch=2):
+            for chunk in page:
+                keys.extend(chunk)
+            page.close()
+        self.assertEqual([k for _, k in index_client.entries], keys)
+
+    def test_paginate_prefetch_close(self):
+        index_client = IndexClient(range(1000))
+        client = self.client(index_client)
+        pages = client.paginate_stream_index(None, "age_int", 0, 999,
+                                             max_results=10, prefetch=2)
+        next(pages).close()
+        pages.close()
+        self.assertLess(len(index_client.queries), 10)
+
+
+class IndexFetchUnitTests(unittest.TestCase):
+    def test_index_fetch(self):
+        from riak import RiakClient, RiakError
+        index_client = IndexClient(range(50))
+        client = RiakClient()
+        client.stream_index = index_client.stream_index
+        fetched = []
+
+        def get(robj, head_only=False, **kwargs):
+            if robj.key == "k13":
+                raise RiakError("timeout")
+            fetched.append((robj.key, head_only))
+            robj.data = robj.key
+            return robj
+
+        client.get = get
+        bucket = client.bucket("b")
+        bucket.bucket_type.datatype = None
+        results = list(bucket.index_fetch("age_int", 0, 49, concurrency=4,
+                                          head_only=True))
+        errors = [r for r in results if isinstance(r, tuple)]
+        self.assertEqual(1, len(errors))
+        self.assertEqual(("default", "b", "k13"), errors[0][:3])
+        self.assertEqual(sorted("k{:d}".format(i) for i in range(50)
+                                if i != 13),
+                         sorted(r.data for r in results
+                                if not isinstance(r, tuple)))
+        self.assertTrue(all(head_only for _, head_only in fetched))
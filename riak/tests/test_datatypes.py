@@ -12,16 +12,26 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
 import unittest
 
+from contextlib import contextmanager
+
 import riak.datatypes as datatypes
+import riak.pb.riak_dt_pb2
 
 from riak import (
     BucketType,
     RiakBucket,
+    RiakClient,
     RiakError,
     RiakObject,
 )
+from riak.client.datatype_batch import DatatypeBatch
+from riak.codecs.pbuf import PbufCodec
+from riak.datatypes.context_cache import ContextCache
+from riak.datatypes.hll import HllSketch
+from riak.datatypes.set import CompactSet
 from riak.tests import RUN_DATATYPES
 from riak.tests.base import IntegrationTestBase
 from riak.tests.comparison import Comparison
@@ -127,6 +137,36 @@ class SetUnitTests(DatatypeUnitTestBase, unittest.TestCase, Comparison):
         dtype.discard("foo")
         self.assertTrue(dtype.modified)
 
+    def test_compact_value(self):
+        members = ["caf\u00e9", "brewer", "barista", "roaster"]
+        dtype = self.dtype(self.bucket, "key", value=members)
+        self.assertIsInstance(dtype.value, CompactSet)
+        self.assertEqual(4, len(dtype))
+        self.assertIn("caf\u00e9", dtype)
+        self.assertIn(b"brewer", dtype.value)
+        self.assertNotIn("cafe", dtype)
+        self.assertNotIn(1, dtype.value)
+        self.assertEqual(["barista", "brewer", "caf\u00e9", "roaster"],
+                         list(dtype))
+        self.assertEqual(frozenset(members), dtype.value)
+        self.assertEqual(dtype.value, frozenset(members))
+        self.assertEqual(hash(frozenset(members)), hash(dtype.value))
+        self.assertEqual({"brewer"}, dtype.value & {"brewer", "other"})
+
+    def test_decodes_without_conversion(self):
+        msg = riak.pb.riak_dt_pb2.DtFetchResp()
+        msg.value.set_value.extend([b"b", b"caf\xc3\xa9", b"a"])
+        value = PbufCodec().decode_dt_value("set", msg.value)
+        self.assertEqual([b"a", b"b", b"caf\xc3\xa9"],
+                         list(value.iter_bytes()))
+        self.assertEqual(CompactSet(["a", "b", "caf\u00e9"]), value)
+
+        dtype = self.dtype(self.bucket, "key", value=value, context="ctx")
+        self.assertIs(value, dtype.value)
+        dtype.add("c")
+        dtype.discard("a")
+        self.assertEqual({"adds": ["c"], "removes": ["a"]}, dtype.to_op())
+
 
 class HllUnitTests(DatatypeUnitTestBase, unittest.TestCase, Comparison):
     dtype = datatypes.Hll
@@ -140,8 +180,60 @@ class HllUnitTests(DatatypeUnitTestBase, unittest.TestCase, Comparison):
         self.assertIn("adds", op)
         self.assertItemsEqual(op["adds"], ["bar", "foo"])
 
+    def sketched(self, client, **options):
+        bucket = RiakBucket(client, "test", BucketType(client, "datatypes"))
+        return self.dtype(bucket, "key").use_sketch(**options)
+
+    def test_sketch_precision(self):
+        dtype = self.sketched(UpdateRecorder())
+        self.assertEqual(12, dtype._sketch.precision)
+        self.assertIsNone(self.dtype(self.bucket, "key").estimate)
+        with self.assertRaises(ValueError):
+            self.sketched(UpdateRecorder(), precision=17)
+
+    def test_sketch_dedupes_and_estimates(self):
+        sketch = HllSketch(14)
+        self.assertTrue(sketch.add("foo"))
+        self.assertFalse(sketch.add("foo"))
+        for i in range(5000):
+            sketch.add("user-{}".format(i))
+        self.assertAlmostEqual(5001, sketch.estimate(), delta=100)
+
+        dtype = self.sketched(UpdateRecorder(), precision=4)
+        for i in range(1000):
+            dtype.add("user-{}".format(i % 100))
+        self.assertLess(len(dtype.to_op()["adds"]), 100)
+        self.assertAlmostEqual(100, dtype.estimate, delta=30)
+
+    def test_sketch_update_sends_chunks(self):
+        client = UpdateRecorder()
+        dtype = self.sketched(client, precision=14, chunk_size=10)
+        for element in ["a", "b", "a"] + ["e{}".format(i) for i in range(20)]:
+            dtype.add(element)
+        dtype.update(w=2)
+        self.assertEqual([10, 10, 2],
+                         [len(op["adds"]) for _, op, _, _ in client.updates])
+        self.assertEqual({"return_body": True, "w": 2}, client.updates[0][3])
+        self.assertFalse(dtype.modified)
+
+        dtype.add("a")
+        self.assertFalse(dtype.modified)
+        dtype.add("new")
+        dtype.clear()
+        dtype.add("new")
+        self.assertEqual({"adds": ["new"]}, dtype.to_op())
+
+    def test_sketch_update_keeps_unsent(self):
+        client = UpdateRecorder(fail=("key",))
+        dtype = self.sketched(client, precision=14, chunk_size=2)
+        for element in ("a", "b", "c"):
+            dtype.add(element)
+        with self.assertRaises(RiakError):
+            dtype.update()
+        self.assertItemsEqual(["a", "b", "c"], dtype.to_op()["adds"])
+
 
-class MapUnitTests(DatatypeUnitTestBase, unittest.TestCase):
+class MapUnitTests(DatatypeUnitTestBase, unittest.TestCase, Comparison):
     dtype = datatypes.Map
 
     def op(self, dtype):
@@ -178,6 +270,317 @@ class MapUnitTests(DatatypeUnitTestBase, unittest.TestCase):
         del dtype.sets["foo"]
         self.assertTrue(dtype.modified)
 
+    def fetched(self):
+        value = dict((("c{}".format(i), "counter"), i) for i in range(100))
+        value[("m", "map")] = {("s", "set"): ["x"], ("r", "register"): "y"}
+        return self.dtype(self.bucket, "key", value=value, context="ctx")
+
+    def test_tracks_modified_entries(self):
+        dtype = self.fetched()
+        self.assertFalse(dtype.modified)
+        self.assertEqual(5, dtype.counters["c5"].value)
+        self.assertFalse(dtype.modified)
+
+        dtype.counters["c5"].increment(3)
+        dtype.maps["m"].sets["s"].discard("x")
+        self.assertEqual({("c5", "counter"), ("m", "map")}, dtype._dirty)
+        self.assertItemsEqual(
+            [("update", ("c5", "counter"), ("increment", 3)),
+             ("update", ("m", "map"),
+              [("update", ("s", "set"), {"removes": ["x"]})])],
+            dtype.to_op())
+
+        dtype.counters["c5"].decrement(3)
+        self.assertEqual(
+            [("update", ("m", "map"),
+              [("update", ("s", "set"), {"removes": ["x"]})])],
+            dtype.to_op())
+
+        dtype.clear()
+        self.assertFalse(dtype.modified)
+        self.assertIsNone(dtype.to_op())
+        self.assertFalse(dtype.maps["m"].sets["s"].modified)
+
+    def test_tracks_nested_removes(self):
+        dtype = self.fetched()
+        del dtype.maps["m"].registers["r"]
+        self.assertTrue(dtype.modified)
+        self.assertEqual(
+            [("update", ("m", "map"), [("remove", ("r", "register"))])],
+            dtype.to_op())
+
+    def test_encodes_modified_entries(self):
+        dtype = self.fetched()
+        dtype.counters["c1"].increment()
+        dtype.maps["m"].registers["r"].assign("z")
+        dtype.maps["m"].flags["f"].enable()
+        del dtype.sets["gone"]
+
+        msg = riak.pb.riak_dt_pb2.MapOp()
+        PbufCodec().encode_map_op(msg, dtype.to_op())
+        updates = {u.field.name: u for u in msg.updates}
+        self.assertEqual({b"c1", b"m"}, set(updates))
+        self.assertEqual(2, len(updates[b"m"].map_op.updates))
+        self.assertEqual([b"gone"], [r.name for r in msg.removes])
+
+
+class UpdateRecorder(object):
+    def __init__(self, fail=()):
+        self.updates = []
+        self.fail = fail
+
+    def update_datatype(self, datatype, **params):
+        if datatype.key in self.fail:
+            raise RiakError("update failed")
+        self.updates.append((datatype.key, datatype.to_op(),
+                             datatype.context, params))
+
+    def get_bucket_type_props(self, bucket_type):
+        return {"hll_precision": 12}
+
+
+class DatatypeBatchUnitTests(unittest.TestCase, Comparison):
+    bucket = RiakBucket(None, "test", BucketType(None, "datatypes"))
+
+    def batch(self, client, **options):
+        return DatatypeBatch(client, **options)
+
+    def test_merges_operations_per_key(self):
+        client = UpdateRecorder()
+        with self.batch(client, w=2) as batch:
+            for key, amount in (("a", 1), ("b", 5), ("a", 2), ("a", -1)):
+                counter = datatypes.Counter(self.bucket, key)
+                counter.increment(amount)
+                batch.add(counter)
+                self.assertFalse(counter.modified)
+            self.assertEqual(2, len(batch))
+        self.assertEqual(0, len(batch))
+        self.assertItemsEqual(
+            [("a", ("increment", 2), None, {"w": 2}),
+             ("b", ("increment", 5), None, {"w": 2})],
+            client.updates)
+
+    def test_merges_sets_and_maps(self):
+        client = UpdateRecorder()
+        with self.batch(client) as batch:
+            for element in ("x", "y", "x"):
+                dset = datatypes.Set(self.bucket, "set")
+                dset.add(element)
+                batch.add(dset)
+            dset = datatypes.Set(self.bucket, "set", context="ctx")
+            dset.discard("z")
+            batch.add(dset)
+
+            dmap = datatypes.Map(self.bucket, "map")
+            dmap.counters["c"].increment(2)
+            dmap.maps["m"].sets["s"].add("x")
+            batch.add(dmap)
+            dmap = datatypes.Map(self.bucket, "map",
+                                 value={("c", "counter"): 4})
+            dmap.counters["c"].increment(3)
+            dmap.maps["m"].sets["s"].add("y")
+            dmap.registers["r"].assign("first")
+            dmap.registers["r"].assign("last")
+            batch.add(dmap)
+
+        updates = dict((key, (op, context))
+                       for key, op, context, _ in client.updates)
+        op, context = updates["set"]
+        self.assertItemsEqual(["x", "y"], op["adds"])
+        self.assertEqual(["z"], op["removes"])
+        self.assertEqual("ctx", context)
+
+        op, _ = updates["map"]
+        entries = dict((key, value) for _, key, value in op)
+        self.assertEqual(("increment", 5), entries[("c", "counter")])
+        self.assertEqual(("assign", "last"), entries[("r", "register")])
+        [(_, key, nested)] = entries[("m", "map")]
+        self.assertEqual(("s", "set"), key)
+        self.assertItemsEqual(["x", "y"], nested["adds"])
+
+    def test_later_operations_win(self):
+        client = UpdateRecorder()
+        with self.batch(client) as batch:
+            dset = datatypes.Set(self.bucket, "set-removed", context="ctx")
+            dset.add("x")
+            batch.add(dset)
+            dset.discard("x")
+            batch.add(dset)
+
+            dset = datatypes.Set(self.bucket, "set-added", context="ctx")
+            dset.discard("x")
+            batch.add(dset)
+            dset.add("x")
+            batch.add(dset)
+
+            dmap = datatypes.Map(self.bucket, "map-removed", context="ctx")
+            dmap.counters["n"].increment()
+            batch.add(dmap)
+            del dmap.counters["n"]
+            batch.add(dmap)
+
+            dmap = datatypes.Map(self.bucket, "map-updated", context="ctx")
+            del dmap.counters["n"]
+            batch.add(dmap)
+            dmap.counters["n"].increment()
+            batch.add(dmap)
+
+        updates = dict((key, op) for key, op, _, _ in client.updates)
+        self.assertEqual({"removes": ["x"]}, updates["set-removed"])
+        self.assertEqual({"adds": ["x"]}, updates["set-added"])
+        self.assertEqual([("remove", ("n", "counter"))],
+                         updates["map-removed"])
+        self.assertEqual([("remove", ("n", "counter")),
+                          ("update", ("n", "counter"), ("increment", 1))],
+                         updates["map-updated"])
+
+    def test_flushes_when_full(self):
+        client = UpdateRecorder()
+        batch = self.batch(client, flush_every=2)
+        for key in ("a", "b", "c"):
+            counter = datatypes.Counter(self.bucket, key)
+            counter.increment()
+            batch.add(counter)
+        self.assertEqual(["a", "b"],
+                         sorted(key for key, _, _, _ in client.updates))
+        self.assertEqual(1, len(batch))
+        batch.close()
+        self.assertEqual(3, len(client.updates))
+        with self.assertRaises(ValueError):
+            batch.add(counter)
+
+    def test_flushes_after_max_latency(self):
+        client = UpdateRecorder()
+        with self.batch(client, max_latency_ms=10) as batch:
+            counter = datatypes.Counter(self.bucket, "a")
+            counter.increment()
+            batch.add(counter)
+            for _ in range(200):
+                if client.updates:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(1, len(client.updates))
+
+    def test_reports_errors_per_key(self):
+        client = UpdateRecorder(fail=("b",))
+        with self.batch(client) as batch:
+            for key in ("a", "b", "c"):
+                counter = datatypes.Counter(self.bucket, key)
+                counter.increment()
+                batch.add(counter)
+            errors = batch.flush()
+        self.assertEqual([("datatypes", "test", "b")], list(errors))
+        self.assertIsInstance(errors[("datatypes", "test", "b")], RiakError)
+        self.assertEqual(errors, batch.errors)
+        self.assertEqual(["a", "c"],
+                         sorted(key for key, _, _, _ in client.updates))
+
+    def test_rejects_invalid_datatypes(self):
+        with self.batch(UpdateRecorder()) as batch:
+            with self.assertRaises(ValueError):
+                batch.add(datatypes.Counter(self.bucket, "a"))
+            with self.assertRaises(ValueError):
+                counter = datatypes.Counter(self.bucket)
+                counter.increment()
+                batch.add(counter)
+            counter = datatypes.Counter(self.bucket, "a")
+            counter.increment()
+            batch.add(counter)
+            dset = datatypes.Set(self.bucket, "a")
+            dset.add("x")
+            with self.assertRaises(TypeError):
+                batch.add(dset)
+
+
+class DatatypeTransport(object):
+    def __init__(self):
+        self.updates = []
+
+    def fetch_datatype(self, bucket, key, **params):
+        return "set", ["a", "b"], b"fetched"
+
+    def update_datatype(self, datatype, **params):
+        self.updates.append((datatype.to_op(), datatype.context))
+        if params.get("return_body"):
+            datatype._context = b"updated"
+        return True
+
+    def delete(self, robj, **params):
+        return True
+
+
+class ContextCacheUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.client = RiakClient(context_cache_ttl=30)
+        self.transport = DatatypeTransport()
+        self.client._with_retries = lambda pool, thunk: thunk(self.transport)
+        self.client._transport = contextmanager(lambda: iter([self.transport]))
+        self.btype = self.client.bucket_type("sets")
+        self.btype.datatype = "set"
+        self.bucket = self.btype.bucket("test")
+        self.bucket.datatype = "set"
+
+    def test_expires_and_evicts(self):
+        cache = ContextCache(ttl=0.05, size=2)
+        cache.put(self.bucket, "a", b"ctx-a")
+        cache.put(self.bucket, "b", b"ctx-b")
+        self.assertEqual(b"ctx-a", cache.get(self.bucket, "a"))
+        cache.put(self.bucket, "c", b"ctx-c")
+        self.assertIsNone(cache.get(self.bucket, "b"))
+        self.assertEqual(2, len(cache))
+        cache.invalidate(self.bucket, "a")
+        self.assertIsNone(cache.get(self.bucket, "a"))
+        time.sleep(0.1)
+        self.assertIsNone(cache.get(self.bucket, "c"))
+        with self.assertRaises(ValueError):
+            ContextCache(ttl=0)
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(RiakClient().context_cache)
+        dset = datatypes.Set(RiakBucket(RiakClient(), "test", self.btype),
+                             "key")
+        with self.assertRaises(datatypes.ContextRequired):
+            dset.discard("a")
+
+    def test_removes_use_fetched_context(self):
+        self.client.fetch_datatype(self.bucket, "key")
+        dset = self.bucket.new("key")
+        dset.discard("a")
+        self.assertEqual(b"fetched", dset.context)
+        dset.update(return_body=False)
+        self.assertEqual([({"removes": ["a"]}, b"fetched")],
+                         self.transport.updates)
+
+        # The new elements are not covered by the context sent
+        dset.add("c")
+        dset.update(return_body=False)
+        dset = self.bucket.new("key")
+        with self.assertRaises(datatypes.ContextRequired):
+            dset.discard("c")
+
+    def test_updates_cache_returned_context(self):
+        dset = self.bucket.new("key")
+        dset.add("c")
+        dset.update()
+        dset = self.bucket.new("key")
+        dset.discard("c")
+        self.assertEqual(b"updated", dset.context)
+
+        dset.delete()
+        with self.assertRaises(datatypes.ContextRequired):
+            self.bucket.new("key").discard("c")
+
+    def test_nested_removes_use_map_context(self):
+        self.client.context_cache.put(self.bucket, "map", b"cached")
+        dmap = datatypes.Map(self.bucket, "map")
+        dmap.maps["m"].sets["s"].discard("x")
+        del dmap.registers["r"]
+        self.assertEqual(b"cached", dmap.context)
+
+        self.client.context_cache.clear()
+        with self.assertRaises(datatypes.ContextRequired):
+            datatypes.Map(self.bucket, "map").sets["s"].discard("x")
+
 
 @unittest.skipUnless(RUN_DATATYPES, "RUN_DATATYPES is 0")
 class HllDatatypeIntegrationTests(IntegrationTestBase,
@@ -14,8 +14,9 @@
 
 import unittest
 
-from riak import key_filter
-from riak.mapreduce import RiakKeyFilter
+import riak
+from riak import key_filter, RiakClient
+from riak.mapreduce import compile_key_filters, RiakKeyFilter
 
 
 class FilterTests(unittest.TestCase):
@@ -75,3 +76,87 @@ class FilterTests(unittest.TestCase):
                                      [["tokenize", "-", 1], ["eq", "2005"]],
                                      [["tokenize", "-", 2], ["eq", "05"]],
                                      ]])
+
+
+class CompiledFilterTests(unittest.TestCase):
+    def test_transforms(self):
+        keep = key_filter.tokenize("-", 1).string_to_int() \
+            .between(2005, 2010).compile()
+        self.assertTrue(keep("2008-07-01"))
+        self.assertFalse(keep("2011-07-01"))
+        self.assertFalse(keep("abcd-07-01"))
+        self.assertFalse(keep("no-separator"))
+
+        keep = compile_key_filters([["tokenize", "-/", 2], ["to_upper"],
+                                    ["eq", "B"]])
+        self.assertTrue(keep("a--b/c"))
+        self.assertFalse(keep("a-c-b"))
+        self.assertTrue(compile_key_filters(
+            [["urldecode"], ["eq", "a b/c"]])("a+b%2Fc"))
+        self.assertTrue(compile_key_filters(
+            [["string_to_float"], ["float_to_string"], ["eq", "1.5"]])("1.50"))
+
+    def test_predicates(self):
+        self.assertTrue(key_filter.greater_than("b").compile()("c"))
+        self.assertFalse(key_filter.less_than_eq("b").compile()("c"))
+        self.assertFalse(key_filter.between("a", "c", False)
+                         .compile()("c"))
+        self.assertTrue(key_filter.matches("^us-[0-9]+").compile()("us-42"))
+        self.assertFalse(key_filter.matches("^us-[0-9]+").compile()("eu-42"))
+        self.assertTrue(key_filter.set_member("a", "b").compile()("b"))
+        self.assertTrue(key_filter.similar_to("kitten", 3)
+                        .compile()("sitting"))
+        self.assertFalse(key_filter.similar_to("kitten", 2)
+                         .compile()("sitting"))
+        self.assertTrue(key_filter.starts_with("20").ends_with("01")
+                        .compile()("2005-01"))
+        self.assertTrue(key_filter.neq("a").compile()("b"))
+        self.assertTrue(RiakKeyFilter().compile()("anything"))
+
+    def test_logical(self):
+        f1 = key_filter.tokenize("-", 1).eq("2005")
+        f2 = key_filter.tokenize("-", 2).eq("05")
+        self.assertTrue((f1 & f2).compile()("2005-05-01"))
+        self.assertFalse((f1 & f2).compile()("2005-06-01"))
+        self.assertTrue((f1 | f2).compile()("2005-06-01"))
+        keep = compile_key_filters([["not", [["ends_with", "-01"]]]])
+        self.assertTrue(keep("2005-02"))
+        self.assertFalse(keep("2005-01"))
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            key_filter.sounds_like("x").compile()
+
+
+class StreamKeysFilterTests(unittest.TestCase):
+    def setUp(self):
+        self.disable = riak.disable_list_exceptions
+        riak.disable_list_exceptions = True
+
+    def tearDown(self):
+        riak.disable_list_exceptions = self.disable
+
+    def test_stream_keys_filter(self):
+        client = RiakClient()
+        client._stream_with_retry = \
+            lambda make_op: iter([[b"2005-01", b"2006-01"], [b"2007-02"],
+                                  [b"2005-02"]])
+        bucket = client.bucket("b")
+        f = key_filter.tokenize("-", 1).eq("2005") | \
+            key_filter.ends_with("-02")
+        self.assertEqual([["2005-01"], ["2007-02"], ["2005-02"]],
+                         list(bucket.stream_keys(filter=f)))
+        self.assertEqual([["2006-01"]],
+                         list(bucket.stream_keys(
+                             filter=lambda key: key.startswith("2006"))))
+        self.assertEqual(3, len(list(bucket.stream_keys())))
+
+    def test_stream_keys_raw(self):
+        client = RiakClient()
+        client._stream_with_retry = \
+            lambda make_op: iter([[b"a", b"b"], [], [b"c"]])
+        bucket = client.bucket("b")
+        self.assertEqual([[b"a", b"b"], [b"c"]],
+                         list(bucket.stream_keys(raw=True)))
+        with self.assertRaises(ValueError):
+            list(bucket.stream_keys(filter=key_filter.eq("a"), raw=True))
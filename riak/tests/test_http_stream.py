@@ -0,0 +1,136 @@
+# Copyright 2010-present Basho Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import json
+import unittest
+
+from unittest import mock
+
+from riak import RiakError
+from riak.client.index_page import CONTINUATION
+from riak.transports.http.stream import (
+    HttpIndexStream,
+    HttpKeyStream,
+    HttpMapReduceStream,
+    HttpValueStream,
+)
+
+
+class TrickleResponse(object):
+    """
+    Stands in for an HTTPResponse which delivers its body a few bytes
+    at a time, so items and boundaries are split across reads.
+    """
+    def __init__(self, body, content_type="application/json", size=7):
+        self._body = io.BytesIO(body)
+        self._content_type = content_type
+        self._size = size
+
+    def getheader(self, name):
+        return self._content_type
+
+    def read1(self, amt):
+        return self._body.read(min(amt, self._size))
+
+
+def multipart(boundary, payloads):
+    body = b""
+    for payload in payloads:
+        body += b"\r\n--" + boundary + b"\r\n"
+        body += b"Content-Type: application/json\r\n\r\n"
+        body += json.dumps(payload).encode("utf-8")
+    return body + b"\r\n--" + boundary + b"--\r\n"
+
+
+class HttpStreamUnitTests(unittest.TestCase):
+    def test_key_stream(self):
+        chunks = [["a", "b"], ["c}", "été"], []]
+        body = b"".join(json.dumps({"keys": keys}).encode("utf-8")
+                        for keys in chunks)
+        self.assertEqual(chunks, list(HttpKeyStream(TrickleResponse(body))))
+
+    def test_key_stream_braces_in_keys(self):
+        keys = ["k}}{0}".format(i) for i in range(4000)]
+        keys += ['k\\"}}{0}\\'.format(i) for i in range(4000)]
+        chunks = [keys, ["}"], []]
+        body = b"".join(json.dumps({"keys": keys}).encode("utf-8")
+                        for keys in chunks)
+        # Each chunk is parsed once, however many braces it holds
+        with mock.patch("riak.transports.http.stream.json.loads",
+                        wraps=json.loads) as loads:
+            stream = HttpKeyStream(TrickleResponse(body))
+            self.assertEqual(chunks, list(stream))
+        self.assertEqual(len(chunks), loads.call_count)
+
+    def test_key_stream_error(self):
+        class Resource(object):
+            released = False
+
+            def release(self):
+                self.released = True
+
+        body = b'{"keys":["a"]}{"error":"timeout"}'
+        stream = HttpKeyStream(TrickleResponse(body))
+        stream.attach(Resource())
+        self.assertEqual(["a"], next(stream))
+        with self.assertRaises(RiakError):
+            next(stream)
+        self.assertTrue(stream.resource.released)
+
+    def test_index_stream(self):
+        payloads = [{"keys": ["k1", "ké2"]},
+                    {"results": [{"10": "k3"}]},
+                    {"continuation": "g2gC"}]
+        response = TrickleResponse(
+            multipart(b"b0und", payloads),
+            "multipart/mixed; boundary=b0und", size=3)
+        stream = HttpIndexStream(response, "field_int", True)
+        self.assertEqual([["k1", "ké2"], [(10, "k3")],
+                          CONTINUATION("g2gC")], list(stream))
+
+    def test_mapred_stream_large_parts(self):
+        payloads = [{"phase": i, "data": ["x" * 100000]} for i in range(3)]
+        response = TrickleResponse(
+            multipart(b"XYZ", payloads),
+            "multipart/mixed; boundary=XYZ", size=65536)
+        stream = HttpMapReduceStream(response)
+        self.assertEqual([(i, ["x" * 100000]) for i in range(3)],
+                         list(stream))
+
+    def test_value_stream(self):
+        stream = HttpValueStream(io.BytesIO(b"x" * 10), 4)
+        self.assertEqual([b"xxxx", b"xxxx", b"xx"], list(stream))
+
+    def test_raw_streams(self):
+        body = json.dumps({"keys": ["a", "été"]}).encode("utf-8")
+        self.assertEqual([[b"a", "été".encode("utf-8")]],
+                         list(HttpKeyStream(TrickleResponse(body), True)))
+
+        payloads = [{"keys": ["k1"]}, {"results": [{"10": "k3"}]},
+                    {"continuation": "g2gC"}]
+        response = TrickleResponse(
+            multipart(b"b0und", payloads),
+            "multipart/mixed; boundary=b0und", size=3)
+        stream = HttpIndexStream(response, "field_int", True, True)
+        self.assertEqual([[b"k1"], [(b"10", b"k3")], CONTINUATION("g2gC")],
+                         list(stream))
+
+        # Riak's own layout, and a spaced one which has to be decoded
+        body = (b'\r\n--XYZ\r\n\r\n{"phase":0,"data":[1,{"a":"}"}]}'
+                b'\r\n--XYZ\r\n\r\n{"data": [2], "phase": 1}'
+                b"\r\n--XYZ--\r\n")
+        response = TrickleResponse(body, "multipart/mixed; boundary=XYZ")
+        self.assertEqual([(0, b'[1,{"a":"}"}]'), (1, b"[2]")],
+                         list(HttpMapReduceStream(response, True)))
@@ -0,0 +1,259 @@
+# Copyright 2010-present Basho Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import threading
+import unittest
+
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from riak import RiakClient
+from riak.transports.http.connection import HttpConnection
+from riak.transports.http.resources import HttpResources, mkpath
+from riak.transports.http.transport import HttpTransport
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """
+    Answers GETs with the request path, or the Host header for
+    "/host", closing the connection after "/close" and without
+    answering the first request for a path under "/drop/", and PUTs
+    with the size of the chunked request body.
+    """
+    protocol_version = "HTTP/1.1"
+    dropped = set()
+
+    def do_GET(self):
+        if self.path.startswith("/drop/") and self.path not in self.dropped:
+            self.dropped.add(self.path)
+            self.close_connection = True
+            return
+        body = self.path.encode("utf-8")
+        if self.path == "/host":
+            body = self.headers["Host"].encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        if self.path == "/close":
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_PUT(self):
+        size = 0
+        while True:
+            chunk_size = int(self.rfile.readline(), 16)
+            size += len(self.rfile.read(chunk_size))
+            self.rfile.readline()
+            if chunk_size == 0:
+                break
+        body = str(size).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class Client(object):
+    _credentials = None
+
+
+class EchoConnection(HttpConnection):
+    def __init__(self, port, connection_class=HTTPConnection):
+        self._client = Client()
+        self._connection = connection_class("127.0.0.1", port)
+
+
+class WrappedSocket(object):
+    """
+    Stands in for a socket, such as a pyOpenSSL connection, whose
+    files cannot be read from without buffering.
+    """
+    def __init__(self, sock):
+        self._sock = sock
+
+    def makefile(self, mode, buffering=None):
+        return io.BufferedReader(self._sock.makefile(mode, 0))
+
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
+
+
+class WrappedHTTPConnection(HTTPConnection):
+    def connect(self):
+        super(WrappedHTTPConnection, self).connect()
+        self.sock = WrappedSocket(self.sock)
+
+
+class HttpConnectionUnitTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(("127.0.0.1", 0), EchoHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_pipeline(self):
+        conn = EchoConnection(self.server.server_port)
+        uris = ["/buckets/b/keys/{:d}".format(i) for i in range(40)]
+        results = conn._pipeline("GET", uris)
+        self.assertEqual(uris, [body.decode("utf-8")
+                                for _, _, body in results])
+        self.assertEqual({200}, set(status for status, _, _ in results))
+        # The connection is still usable for ordinary requests
+        status, _, body = conn._request("GET", "/ping")
+        self.assertEqual(b"/ping", body)
+        conn.close()
+
+    def test_pipeline_reconnects_on_close(self):
+        conn = EchoConnection(self.server.server_port)
+        uris = ["/a", "/close", "/b", "/c"]
+        results = conn._pipeline("GET", uris)
+        self.assertEqual(uris, [body.decode("utf-8")
+                                for _, _, body in results])
+        conn.close()
+
+    def test_pipeline_host_header(self):
+        conn = EchoConnection(self.server.server_port)
+        (_, _, piped), = conn._pipeline("GET", ["/host"])
+        _, _, body = conn._request("GET", "/host")
+        self.assertEqual(body, piped)
+        conn.close()
+
+    def test_pipeline_resends_after_drop(self):
+        conn = EchoConnection(self.server.server_port)
+        uris = ["/a", "/drop/1", "/b", "/c"]
+        results = conn._pipeline("GET", uris)
+        self.assertEqual(uris, [body.decode("utf-8")
+                                for _, _, body in results])
+        conn.close()
+
+    def test_pipeline_raises_when_dropped_first(self):
+        conn = EchoConnection(self.server.server_port)
+        with self.assertRaises(ConnectionError):
+            conn._pipeline("GET", ["/drop/2", "/a"])
+        # The connection is usable again
+        (_, _, body), = conn._pipeline("GET", ["/b"])
+        self.assertEqual(b"/b", body)
+        conn.close()
+
+    def test_pipeline_without_raw_socket(self):
+        conn = EchoConnection(self.server.server_port,
+                              WrappedHTTPConnection)
+        uris = ["/buckets/b/keys/{:d}".format(i) for i in range(4)]
+        results = conn._pipeline("GET", uris)
+        self.assertEqual(uris, [body.decode("utf-8")
+                                for _, _, body in results])
+        conn.close()
+
+    def test_chunked_upload(self):
+        conn = EchoConnection(self.server.server_port)
+        status, _, body = conn._request("PUT", "/buckets/b/keys/k", {},
+                                        io.BytesIO(b"x" * 100000))
+        self.assertEqual(b"100000", body)
+        status, _, body = conn._request("PUT", "/buckets/b/keys/k", {},
+                                        iter([b"abc", b"defg"]))
+        self.assertEqual(b"7", body)
+        conn.close()
+
+
+class HttpCodecUnitTests(unittest.TestCase):
+    def test_parse_siblings(self):
+        boundary = "YinLMzyUR9feB17okMytgKsylvh"
+        blob = b"\x00\xff\r\n--" + b"\xc3\x28" * 10
+        body = (b"\r\n--" + boundary.encode() + b"\r\n"
+                b"Content-Type: application/octet-stream\r\n"
+                b'Link: </buckets/b>; rel="up"\r\n'
+                b"Etag: 16vic4eU9ny46o4KPiDz1f\r\n"
+                b"Last-Modified: Wed, 10 Mar 2010 18:01:06 GMT\r\n"
+                b"X-Riak-Meta-Colour: blue\r\n"
+                b"X-Riak-Index-Age_int: 42\r\n"
+                b"\r\n" + blob +
+                b"\r\n--" + boundary.encode() + b"\r\n"
+                b'Content-Type: text/plain; charset="utf-8"\r\n'
+                b"\r\n" + "caf\u00e9".encode("utf-8") +
+                b"\r\n--" + boundary.encode() + b"--\r\n")
+        headers = {"content-type": "multipart/mixed; boundary=" + boundary,
+                   "x-riak-vclock": "a85hYGBgzGDKBVIcypz/fgaUHjmTwZTIymNgWqf5"}
+        robj = RiakClient().bucket("b").new("k")
+        # Parsing doesn't need a connection
+        transport = HttpTransport.__new__(HttpTransport)
+        transport._parse_body(robj, (300, headers, body), [300])
+
+        self.assertEqual(2, len(robj.siblings))
+        first, second = robj.siblings
+        self.assertEqual(blob, first.encoded_data)
+        self.assertEqual("application/octet-stream", first.content_type)
+        self.assertEqual("16vic4eU9ny46o4KPiDz1f", first.etag)
+        self.assertEqual({"colour": "blue"}, first.usermeta)
+        self.assertEqual({("age_int", 42)}, first.indexes)
+        self.assertEqual(1268244066, first.last_modified)
+        self.assertEqual("text/plain", second.content_type)
+        self.assertEqual("utf-8", second.charset)
+        self.assertEqual("caf\u00e9", second.data)
+
+
+class HttpResourcesUnitTests(unittest.TestCase):
+    def resources(self, bucket_types=True, buckets=True):
+        resources = HttpResources()
+        resources.riak_kv_wm_bucket_type = bucket_types
+        resources.riak_kv_wm_buckets = buckets
+        resources.riak_kv_wm_raw = "/riak"
+        return resources
+
+    def test_object_path(self):
+        resources = self.resources()
+        for _ in range(2):
+            self.assertEqual("/types/t%2F1/buckets/b+1/keys/k%2F%C3%A9",
+                             resources.object_path("b 1", "k/\u00e9",
+                                                   bucket_type="t/1"))
+            self.assertEqual("/buckets/b/keys/k?r=2&returnbody=true",
+                             resources.object_path("b", "k", r=2, pr=None,
+                                                   returnbody=True))
+            self.assertEqual("/buckets/b/keys",
+                             resources.object_path("b"))
+            self.assertEqual("/riak/b/k",
+                             self.resources(False, False).object_path(
+                                 "b", "k", bucket_type="t"))
+
+    def test_query_cache_keeps_types_apart(self):
+        resources = self.resources()
+        for r, expected in ((1, "r=1"), (True, "r=true"), (1, "r=1"),
+                            (0, "r=0"), (False, "r=false")):
+            self.assertEqual("/buckets/b/keys/k?" + expected,
+                             resources.object_path("b", "k", r=r))
+
+    def test_paths_match_mkpath(self):
+        resources = self.resources()
+        self.assertEqual(
+            mkpath("/buckets", "b", "keys", keys=True, props=False,
+                   stream=True),
+            resources.key_list_path("b", stream=True))
+        self.assertEqual(
+            mkpath("/types", "t", "buckets", "b", "index", "f_bin", "a%2Fb",
+                   "z", return_terms=True, max_results=5),
+            resources.index_path("b", "f_bin", "a/b", "z", bucket_type="t",
+                                 return_terms=True, max_results=5))
+        self.assertEqual(
+            mkpath("/buckets", "b", "index", "f_int", "1"),
+            resources.index_path("b", "f_int", 1))
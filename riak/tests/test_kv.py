@@ -13,12 +13,17 @@
 # limitations under the License.
 
 import copy
+import gzip
 import os
 import sys
 import unittest
 
 from time import sleep
 
+import riak.client
+import riak.content
+import riak.pb.riak_kv_pb2
+
 from riak import (
     BucketType,
     ConflictError,
@@ -27,10 +32,13 @@ from riak import (
     RiakClient,
     RiakError,
 )
+from riak.codecs.pbuf import PbufCodec
+from riak.content import RiakContent
 from riak.resolver import default_resolver, last_written_resolver
 from riak.tests import PROTOCOL, RUN_KV, RUN_RESOLVE
 from riak.tests.base import IntegrationTestBase
 from riak.tests.comparison import Comparison
+from riak.util import str_to_bytes
 
 try:
     import simplejson as json       # todo: remove this, supports < p3.3
@@ -108,6 +116,113 @@ class KVUnitTests(unittest.TestCase):
             for kl in c.stream_keys("test"):
                 ks.extend(kl)
 
+    def test_decode_content_metadata_lazily(self):
+        c = RiakClient()
+        obj = c.bucket("test").new("lazy")
+        rpb_content = riak.pb.riak_kv_pb2.RpbContent()
+        rpb_content.value = b"{}"
+        rpb_content.content_type = b"application/json"
+        link = rpb_content.links.add()
+        link.bucket, link.key, link.tag = b"b", b"k", b"t"
+        meta = rpb_content.usermeta.add()
+        meta.key, meta.value = b"colour", b"blue"
+        index = rpb_content.indexes.add()
+        index.key, index.value = b"age_int", b"42"
+        codec = PbufCodec()
+        sibling = codec.decode_content(rpb_content, RiakContent(obj))
+        self.assertIs(riak.content._UNDECODED, sibling._indexes)
+        self.assertEqual([("b", "k", "t")], sibling.links)
+        self.assertEqual({"colour": "blue"}, sibling.usermeta)
+        self.assertEqual({("age_int", 42)}, sibling.indexes)
+        sibling.add_index("name_bin", "x")
+        sibling.remove_index("age_int")
+        self.assertEqual({("name_bin", "x")}, sibling.indexes)
+        sibling.usermeta = None
+        self.assertIsNone(sibling.usermeta)
+
+    def test_prepared_requests_match_encoded_requests(self):
+        c = RiakClient()
+        bucket = c.bucket_type("typed").bucket("test")
+        bucket.bucket_type.datatype = None
+        codec = PbufCodec(client_timeouts=True, quorum_controls=True,
+                          tombstone_vclocks=True, bucket_types=True)
+        obj = bucket.new("k\u00e9y", {"a": 1})
+        obj.add_index("age_int", 42)
+
+        get = bucket.prepare_get(r=2, pr="quorum", timeout=50,
+                                 notfound_ok=True)
+        put = bucket.prepare_put(w=3, if_none_match=True)
+        delete = bucket.prepare_delete(rw=1, timeout=10)
+        for prepared, encode, prepared_encode, message in (
+                (get, codec.encode_get, codec.encode_prepared_get,
+                 riak.pb.riak_kv_pb2.RpbGetReq),
+                (put, codec.encode_put, codec.encode_prepared_put,
+                 riak.pb.riak_kv_pb2.RpbPutReq),
+                (delete, codec.encode_delete, codec.encode_prepared_delete,
+                 riak.pb.riak_kv_pb2.RpbDelReq)):
+            expected = encode(obj, **prepared.options)
+            msg = prepared_encode(prepared.template(codec), obj)
+            self.assertEqual(expected.msg_code, msg.msg_code)
+            self.assertEqual(expected.resp_code, msg.resp_code)
+            self.assertEqual(message.FromString(expected.data),
+                             message.FromString(msg.data))
+            self.assertIs(prepared.template(codec),
+                          prepared.template(codec))
+
+    def test_compressed_content_encoding(self):
+        c = RiakClient(compression=True)
+        bucket = c.bucket("test")
+        for encoding in ("gzip", "deflate"):
+            obj = bucket.new("compressed", {"a": "b" * 1000})
+            obj.content_encoding = encoding
+            compressed = obj.encoded_data
+            self.assertLess(len(compressed), 1000)
+            obj.encoded_data = compressed
+            self.assertEqual({"a": "b" * 1000}, obj.data)
+
+    def test_content_encoding_without_compression(self):
+        # Values compressed by the caller are stored and read as given
+        bucket = RiakClient().bucket("test")
+        compressed = gzip.compress(b"b" * 1000)
+        obj = bucket.new("compressed", encoded_data=compressed,
+                         content_type="binary/octet-stream")
+        obj.content_encoding = "gzip"
+        self.assertEqual(compressed, obj.encoded_data)
+        self.assertEqual(compressed, obj.data)
+
+    def test_resolved_serializers_invalidation(self):
+        c = RiakClient()
+        bucket = c.bucket("test")
+        self.assertIsNone(bucket.get_encoder("text/x-test"))
+        c.set_encoder("text/x-test", str_to_bytes)
+        self.assertIs(str_to_bytes, bucket.get_encoder("text/x-test"))
+        bucket.set_encoder("text/x-test", repr)
+        self.assertIs(repr, bucket.get_encoder("text/x-test"))
+        self.assertIsNone(bucket.get_compressor("x-test"))
+        bucket.set_compressor("x-test", bytes, bytes)
+        self.assertEqual((bytes, bytes), bucket.get_compressor("x-test"))
+        self.assertIsNone(c.get_compressor("x-test"))
+
+    @unittest.skipUnless(riak.client.orjson or riak.client.ujson,
+                         "orjson or ujson is not installed")
+    def test_fast_json(self):
+        c = RiakClient(fast_json=True)
+        bucket = c.bucket("test")
+        obj = bucket.new("fast", {"a": [1, 2.5, None, "\u00e9"]})
+        self.assertEqual({"a": [1, 2.5, None, "\u00e9"]},
+                         json.loads(obj.encoded_data))
+        obj.encoded_data = b'{"b": true}'
+        self.assertEqual({"b": True}, obj.data)
+
+    @unittest.skipUnless(riak.client.msgpack, "msgpack is not installed")
+    def test_msgpack(self):
+        c = RiakClient()
+        bucket = c.bucket("test")
+        obj = bucket.new("packed", {"a": [1, b"\x00"]},
+                         content_type="application/x-msgpack")
+        obj.encoded_data = obj.encoded_data
+        self.assertEqual({"a": [1, b"\x00"]}, obj.data)
+
     def test_ts_stream_keys_exception(self):
         c = RiakClient()
         with self.assertRaises(ListError):
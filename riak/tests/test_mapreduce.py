@@ -14,8 +14,9 @@
 
 import unittest
 
+import riak
 from riak import key_filter, ListError, RiakClient, RiakError
-from riak.mapreduce import RiakMapReduce
+from riak.mapreduce import RiakLink, RiakMapReduce
 from riak.tests import RUN_MAPREDUCE, RUN_SECURITY, RUN_YZ
 from riak.tests.base import IntegrationTestBase
 from riak.tests.test_yokozuna import wait_for_yz_index
@@ -37,12 +38,245 @@ def tearDownModule():
     yzTearDown(testrun_yz_mr)
 
 
+def map_count(obj, keydata, arg):
+    return [len(obj.values[0]["data"]) * arg]
+
+
+def reduce_total(values, arg):
+    return [sum(values)]
+
+
 class MapReduceUnitTests(unittest.TestCase):
     def test_mapred_bucket_exception(self):
         c = RiakClient()
         with self.assertRaises(ListError):
             c.add("bucket")
 
+    def streaming_client(self, chunks):
+        c = RiakClient()
+        c.closed = False
+
+        def stream_mapred(inputs, query, timeout):
+            try:
+                for chunk in chunks:
+                    yield chunk
+            finally:
+                c.closed = True
+
+        c.stream_mapred = stream_mapred
+        return c
+
+    def test_run_sink(self):
+        chunks = [(0, [1, 2]), (1, [3]), (1, [4, 5])]
+        c = self.streaming_client(chunks)
+        received = []
+        mr = RiakMapReduce(c).add("b", "k").map("Riak.mapValues") \
+            .reduce("Riak.reduceSum", {"keep": True})
+        self.assertIsNone(mr.run(sink=lambda *chunk: received.append(chunk)))
+        self.assertEqual(chunks, received)
+        self.assertTrue(c.closed)
+
+    def test_run_lazy(self):
+        c = self.streaming_client([(0, [["b", "k1"], ["b", "k2", "t"]]),
+                                   (0, [["b", "k3"]])])
+        results = RiakMapReduce(c).add("b", "k").link("b").run(lazy=True)
+        self.assertFalse(c.closed)
+        self.assertEqual((0, [("b", "k1", None), ("b", "k2", "t")]),
+                         next(results))
+        results.close()
+        self.assertTrue(c.closed)
+
+    def chunked_client(self, respond):
+        # Each job streams whatever respond() returns for its inputs
+        c = RiakClient()
+        c.jobs = []
+
+        def stream_mapred(inputs, query, timeout):
+            c.jobs.append(inputs)
+            for chunk in respond(inputs):
+                yield chunk
+
+        c.stream_mapred = stream_mapred
+        return c
+
+    def test_run_parallel_map(self):
+        c = self.chunked_client(
+            lambda inputs: [(0, [k for _, k, _ in inputs])])
+        keys = [f"k{i}" for i in range(10)]
+        mr = RiakMapReduce(c).add("b", keys).map("Riak.mapValues")
+        self.assertEqual(keys, mr.run_parallel(chunk_size=3, concurrency=2))
+        self.assertEqual([3, 3, 3, 1], sorted(map(len, c.jobs),
+                                              reverse=True))
+
+    def test_run_parallel_reduce(self):
+        def respond(inputs):
+            values = [int(k) for _, k, _ in inputs]
+            return [(1, [sum(values)]), (1, [])]
+
+        c = self.chunked_client(respond)
+        mr = RiakMapReduce(c).add("b", [str(i) for i in range(100)]) \
+            .map("Riak.mapValuesJson").reduce_sum()
+        self.assertEqual([4950], mr.run_parallel(chunk_size=7))
+        self.assertEqual(15, len(c.jobs))
+
+        c = self.chunked_client(
+            lambda inputs: [(1, sorted(k for _, k, _ in inputs))])
+        mr = RiakMapReduce(c).add("b", list("zyxwvu")) \
+            .map("Riak.mapValues").reduce_sort()
+        self.assertEqual(list("uvwxyz"), mr.run_parallel(chunk_size=2))
+        mr = RiakMapReduce(c).add("b", list("zyxwvu")) \
+            .map("Riak.mapValues").reduce_limit(3)
+        self.assertEqual(["y", "z", "w"], mr.run_parallel(chunk_size=2))
+
+    def test_run_parallel_kept_phases(self):
+        c = self.chunked_client(
+            lambda inputs: [(0, [k for _, k, _ in inputs]), (1, [1])])
+        mr = RiakMapReduce(c).add("b", ["a", "b", "c"]) \
+            .map("Riak.mapValues", {"keep": True}).reduce_max({"keep": True})
+        self.assertEqual({0: ["a", "b", "c"], 1: [1]},
+                         mr.run_parallel(chunk_size=1))
+
+    def test_run_parallel_unsupported(self):
+        c = self.chunked_client(lambda inputs: [])
+        with self.assertRaises(ValueError):
+            RiakMapReduce(c).index("b", "f_bin", "a", "z") \
+                .map("Riak.mapValues").run_parallel()
+        with self.assertRaises(ValueError):
+            RiakMapReduce(c).add("b", "k").reduce("function(v) {}") \
+                .run_parallel()
+        with self.assertRaises(ValueError):
+            RiakMapReduce(c).add("b", "k").reduce_sum() \
+                .map("Riak.mapValues").run_parallel()
+        with self.assertRaises(ValueError):
+            RiakMapReduce(c).add("b", "k").reduce_sort("function(a, b) {}") \
+                .run_parallel()
+        self.assertEqual([], c.jobs)
+        self.assertIsNone(RiakMapReduce(c).add("b", "k").filter_not_found()
+                          .map("Riak.mapValues").run_parallel())
+
+
+class LocalMapReduceUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.client = RiakClient()
+        # Keep the bucket type alive, so its properties aren't fetched
+        self.btype = self.client.bucket_type("default")
+        self.btype.datatype = None
+        self.objects = {}
+        self.fetched = []
+
+        def get(robj, **kwargs):
+            self.fetched.append(robj.key)
+            if robj.key in self.objects:
+                data, links = self.objects[robj.key]
+                robj.siblings[0].exists = True
+                robj.data = data
+                robj.links = links
+            return robj
+
+        self.client.get = get
+
+    def test_run_local_processes(self):
+        self.objects = {f"k{i}": ("x" * i, []) for i in range(20)}
+        mr = RiakMapReduce(self.client).add("b", sorted(self.objects)) \
+            .map(map_count, {"arg": 2}).reduce(reduce_total)
+        self.assertEqual([380], mr.run_local(workers=2, batch_size=3))
+
+    def test_run_local_without_phases(self):
+        mr = RiakMapReduce(self.client).add("b", ["k1", "k2"])
+        self.assertEqual([("b", "k1", None), ("b", "k2", None)],
+                         mr.run_local(workers=0))
+        self.assertEqual([(0, [("b", "k1", None), ("b", "k2", None)])],
+                         list(mr.run_local(workers=0, lazy=True)))
+        self.assertEqual([], self.fetched)
+
+    def test_run_local_lazy(self):
+        self.objects = {f"k{i}": ("x" * i, []) for i in range(10)}
+        reduced = []
+
+        def reduce_max(values, arg):
+            reduced.append(len(values))
+            return [max(values)]
+
+        mr = RiakMapReduce(self.client).add("b", ["missing", "k3", "k9"]) \
+            .map(lambda obj, keydata, arg: [[obj.bucket, obj.key, keydata]],
+                 {"keep": True}) \
+            .map(lambda obj, keydata, arg: [len(obj.values[0]["data"])]) \
+            .reduce(reduce_max, {"keep": True})
+        mr._inputs[1][2] = "data"
+        results = list(mr.run_local(workers=0, lazy=True))
+        self.assertEqual([(0, [["b", "k3", "data"], ["b", "k9", None]]),
+                          (2, [9])], results)
+        self.assertIn("missing", self.fetched)
+
+        self.objects = {f"k{i}": (str(i), []) for i in range(1000)}
+        mr = RiakMapReduce(self.client).add("b", sorted(self.objects)) \
+            .map(lambda obj, keydata, arg: [int(obj.values[0]["data"])]) \
+            .reduce(reduce_max)
+        del reduced[:]
+        self.assertEqual([999], mr.run_local(workers=0, batch_size=50))
+        self.assertLessEqual(max(reduced), 50)
+
+    def test_run_local_links(self):
+        self.objects = {"a": ("", [("b", "c", "friend"), ("b", "d", "foe"),
+                                   ("x", "e", "friend")]),
+                        "c": ("cc", []), "d": ("ddd", [])}
+        mr = RiakMapReduce(self.client).add("b", "a")
+        self.assertEqual([RiakLink("b", "c", "friend"),
+                          RiakLink("b", "d", "foe")],
+                         mr.link("b").run_local(workers=0))
+        mr = RiakMapReduce(self.client).add("b", "a").link(tag="friend") \
+            .map(lambda obj, keydata, arg: [(obj.key, keydata)])
+        self.assertEqual([("c", "friend")], mr.run_local(workers=0))
+
+    def test_run_local_streamed_inputs(self):
+        self.objects = {f"k{i}": ("x" * i, []) for i in range(6)}
+        closed = []
+
+        class Page(object):
+            results = [["k0", "k1"], ["k2"]]
+
+            def close(self):
+                closed.append("index")
+
+        def stream_index(bucket, index, startkey, endkey, timeout=None):
+            self.assertEqual(("age_int", 0, 2), (index, startkey, endkey))
+            return Page()
+
+        def stream_keys(bucket, timeout=None, filter=None):
+            try:
+                for keys in (["k3", "k4"], ["k5"], ["k6"]):
+                    yield [key for key in keys if filter(key)]
+            finally:
+                closed.append("keys")
+
+        self.client.stream_index = stream_index
+        self.client.stream_keys = stream_keys
+        mr = RiakMapReduce(self.client).index("b", "age_int", 0, 2) \
+            .map(map_count, {"arg": 1}).reduce(reduce_total)
+        self.assertEqual([3], mr.run_local(workers=0))
+
+        disable = riak.disable_list_exceptions
+        riak.disable_list_exceptions = True
+        try:
+            mr = RiakMapReduce(self.client).add("b") \
+                .add_key_filter("matches", "^k[3-5]$") \
+                .map(map_count, {"arg": 1}).reduce(reduce_total)
+        finally:
+            riak.disable_list_exceptions = disable
+        self.assertEqual([12], mr.run_local(workers=0))
+        self.assertEqual(["index", "keys"], closed)
+
+    def test_run_local_unsupported(self):
+        with self.assertRaises(ValueError):
+            RiakMapReduce(self.client).add("b", "k").map_values() \
+                .run_local()
+        with self.assertRaises(ValueError):
+            RiakMapReduce(self.client).add("b", "k").map(map_count).run()
+        with self.assertRaises(NotImplementedError):
+            RiakMapReduce(self.client).search("idx", "q:1") \
+                .map(map_count).run_local()
+        self.assertEqual([], self.fetched)
+
 
 @unittest.skipUnless(RUN_MAPREDUCE, "RUN_MAPREDUCE is 0")
 class LinkTests(IntegrationTestBase, unittest.TestCase):
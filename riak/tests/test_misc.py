@@ -40,3 +40,151 @@ class MiscTests(unittest.TestCase):
             _validate_timeout(0)
         with self.assertRaises(ValueError):
             _validate_timeout(12.34)
+
+
+class MultiStreamTests(unittest.TestCase):
+    def test_multistream_results(self):
+        from riak.client.multi import multistream
+        results = multistream(lambda x: x * 2, iter(range(100)), 4)
+        self.assertEqual(sorted(results), [x * 2 for x in range(100)])
+
+    def test_multistream_ordered(self):
+        import random
+        import time
+        from riak.client.multi import multistream
+
+        def _slow(x):
+            time.sleep(random.random() / 100)
+            return x * 2
+
+        results = multistream(_slow, iter(range(100)), 4, ordered=True)
+        self.assertEqual([x * 2 for x in range(100)], list(results))
+
+    def test_multistream_function_error(self):
+        from riak.client.multi import multistream
+
+        def _fail(x):
+            if x == 7:
+                raise ValueError("boom")
+            return x
+
+        with self.assertRaises(ValueError):
+            list(multistream(_fail, iter(range(100)), 4))
+
+    def test_multistream_iterable_error(self):
+        from riak.client.multi import multistream
+
+        def _items():
+            yield 1
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            list(multistream(lambda x: x, _items(), 2))
+
+    def test_multistream_close_stops_iterable(self):
+        import threading
+        from riak.client.multi import multistream
+        closed = threading.Event()
+
+        def _items():
+            try:
+                for i in range(10000):
+                    yield i
+            finally:
+                closed.set()
+
+        results = multistream(lambda x: x, _items(), 2)
+        next(results)
+        results.close()
+        self.assertTrue(closed.wait(5))
+
+
+class StreamSearchTests(unittest.TestCase):
+    def client(self, protocol, docs):
+        from riak import RiakClient
+        client = RiakClient(protocol=protocol)
+        client.requests = []
+
+        def fulltext_search(index, query, rows, start=0, cursorMark=None,
+                            **params):
+            client.requests.append((start, cursorMark))
+            if cursorMark is not None:
+                start = int(cursorMark.strip("*") or 0)
+            result = {"num_found": len(docs),
+                      "docs": docs[start:start + rows]}
+            if cursorMark is not None:
+                result["next_cursor_mark"] = str(
+                    min(start + rows, len(docs)))
+            return result
+
+        client.fulltext_search = fulltext_search
+        return client
+
+    def test_stream_search_pages(self):
+        docs = [{"id": i} for i in range(95)]
+        client = self.client("pbc", docs)
+        results = client.stream_search("idx", "*:*", page_size=10,
+                                       prefetch=3)
+        self.assertEqual(docs, list(results))
+        self.assertEqual(list(range(0, 100, 10)),
+                         sorted(start for start, _ in client.requests))
+
+    def test_stream_search_fetches_ahead(self):
+        import time
+        docs = [{"id": i} for i in range(25)]
+        client = self.client("pbc", docs)
+        results = client.stream_search("idx", "*:*", page_size=10)
+        self.assertEqual(docs[0], next(results))
+        # The second page is requested while the first is consumed
+        deadline = time.monotonic() + 10
+        while 10 not in [start for start, _ in client.requests]:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+        self.assertEqual(docs[1:], list(results))
+
+    def test_stream_search_rows(self):
+        docs = [{"id": i} for i in range(25)]
+        client = self.client("pbc", docs)
+        results = client.stream_search("idx", "*:*", rows=10)
+        self.assertEqual(docs, list(results))
+        self.assertEqual([0, 10, 20],
+                         sorted(start for start, _ in client.requests))
+
+    def test_stream_search_cursor(self):
+        docs = [{"id": i} for i in range(25)]
+        client = self.client("http", docs)
+        results = client.stream_search("idx", "*:*", page_size=10,
+                                       sort="_yz_id asc")
+        self.assertEqual(docs, list(results))
+        self.assertEqual([(0, "*"), (0, "10"), (0, "20"), (0, "25")],
+                         client.requests)
+
+
+class FulltextBulkAddTests(unittest.TestCase):
+    def test_bulk_add_batches(self):
+        import threading
+        from riak import RiakClient, RiakError
+        client = RiakClient(protocol="http")
+        lock = threading.Lock()
+        bodies = []
+
+        def _fulltext_update(index, body):
+            body = b"".join(body)
+            with lock:
+                bodies.append(body)
+            if b'"id">13<' in body:
+                raise RiakError("rejected")
+
+        client._fulltext_update = _fulltext_update
+        docs = [{"id": str(i), "text": "x" * (i * 10)} for i in range(40)]
+        failed = client.fulltext_bulk_add("idx", iter(docs), batch_size=5,
+                                          batch_bytes=2000, concurrency=3)
+        self.assertEqual(1, len(failed))
+        failed_docs, err = failed[0]
+        self.assertIn(docs[13], failed_docs)
+        self.assertIsInstance(err, RiakError)
+        self.assertEqual(40, sum(body.count(b"<doc>") for body in bodies))
+        for body in bodies:
+            self.assertLessEqual(body.count(b"<doc>"), 5)
+            self.assertTrue(body.count(b"<doc>") == 1 or
+                            len(body) < 2000 + 100)
@@ -0,0 +1,94 @@
+# Copyright 2010-present Basho Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+import riak.pb.messages
+import riak.pb.riak_kv_pb2
+
+from riak.client.index_page import CONTINUATION
+from riak.codecs.pbuf import PbufCodec
+from riak.transports.tcp.stream import (
+    PbufIndexStream,
+    PbufKeyStream,
+    PbufMapredStream,
+)
+
+
+class FrameTransport(object):
+    """
+    Stands in for a TcpTransport, returning the given messages as the
+    frames received.
+    """
+    def __init__(self, msg_code, messages):
+        self.frames = [(msg_code, msg.SerializeToString())
+                       for msg in messages]
+
+    def _recv_msg(self, mid_stream=False):
+        return self.frames.pop(0)
+
+
+class PbufStreamUnitTests(unittest.TestCase):
+    def mapred_stream(self, raw):
+        responses = []
+        for phase, data in ((0, b'[1,"a"]'), (1, b'[{"b":2}]')):
+            resp = riak.pb.riak_kv_pb2.RpbMapRedResp()
+            resp.phase = phase
+            resp.response = data
+            responses.append(resp)
+        done = riak.pb.riak_kv_pb2.RpbMapRedResp()
+        done.done = True
+        responses.append(done)
+        transport = FrameTransport(riak.pb.messages.MSG_CODE_MAP_RED_RESP,
+                                   responses)
+        return PbufMapredStream(transport, PbufCodec(), raw)
+
+    def test_mapred_stream_raw(self):
+        self.assertEqual([(0, [1, "a"]), (1, [{"b": 2}])],
+                         list(self.mapred_stream(False)))
+        self.assertEqual([(0, b'[1,"a"]'), (1, b'[{"b":2}]')],
+                         list(self.mapred_stream(True)))
+
+    def index_stream(self, return_terms, raw):
+        keys = riak.pb.riak_kv_pb2.RpbIndexResp()
+        keys.keys.extend([b"k1", "ké2".encode("utf-8")])
+        results = riak.pb.riak_kv_pb2.RpbIndexResp()
+        pair = results.results.add()
+        pair.key, pair.value = b"10", b"k3"
+        done = riak.pb.riak_kv_pb2.RpbIndexResp()
+        done.continuation = b"g2gC"
+        done.done = True
+        transport = FrameTransport(riak.pb.messages.MSG_CODE_INDEX_RESP,
+                                   [keys, results, done])
+        return PbufIndexStream(transport, PbufCodec(), "field_int",
+                               return_terms, raw)
+
+    def test_index_stream_raw(self):
+        self.assertEqual([["k1", "ké2"], [(10, "k3")],
+                          CONTINUATION("g2gC")],
+                         list(self.index_stream(True, False)))
+        self.assertEqual([[b"k1", "ké2".encode("utf-8")], [(b"10", b"k3")],
+                          CONTINUATION("g2gC")],
+                         list(self.index_stream(True, True)))
+
+    def test_key_stream(self):
+        keys = riak.pb.riak_kv_pb2.RpbListKeysResp()
+        keys.keys.extend([b"a", b"b"])
+        done = riak.pb.riak_kv_pb2.RpbListKeysResp()
+        done.done = True
+        transport = FrameTransport(riak.pb.messages.MSG_CODE_LIST_KEYS_RESP,
+                                   [keys, done])
+        self.assertEqual([[b"a", b"b"]],
+                         [list(chunk) for chunk
+                          in PbufKeyStream(transport, PbufCodec())])
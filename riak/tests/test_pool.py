@@ -12,15 +12,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import socket
 import unittest
 
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from random import SystemRandom
 from threading import currentThread, Thread
 from time import sleep
 
-from riak import RiakError
+from riak import RiakClient, RiakError
 from riak.tests import RUN_POOL
 from riak.tests.comparison import Comparison
+from riak.transports.http import HttpPool, NoNagleHTTPConnection
 from riak.transports.pool import BadResource, Pool
 
 from queue import Queue
@@ -359,5 +362,93 @@ class PoolTest(unittest.TestCase, Comparison):
             th.join()
 
 
+class NodeHandler(BaseHTTPRequestHandler):
+    """
+    Answers the requests an HttpTransport makes when it connects and
+    pings.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/ping":
+            body = b"OK"
+        elif self.path == "/stats":
+            body = b'{"riak_kv_version": "2.1.4"}'
+        else:
+            body = b'{"riak_kv_wm_buckets": "/buckets"}'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def unused_port():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+class HttpPoolUnitTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), NodeHandler)
+        cls.thread = Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_fails_over_to_live_node(self):
+        client = RiakClient(protocol="http", nodes=[
+            {"host": "127.0.0.1", "http_port": unused_port()},
+            {"host": "127.0.0.1", "http_port": self.server.server_port}])
+        dead, live = client.nodes
+        pool = HttpPool(client, probe_interval=60)
+        # Nodes are chosen at random, so try until the dead one is hit
+        for _ in range(50):
+            transport = pool.create_resource()
+            self.assertIs(live, transport._node)
+            transport.close()
+            if dead in pool._down:
+                break
+        self.assertIn(dead, pool._down)
+        self.assertNotIn(live, pool._down)
+
+    def test_raises_when_all_nodes_are_down(self):
+        client = RiakClient(protocol="http", nodes=[
+            {"host": "127.0.0.1", "http_port": unused_port()}])
+        pool = HttpPool(client)
+        with self.assertRaises(ConnectionError):
+            pool.create_resource()
+
+    def test_recovers_after_probe(self):
+        client = RiakClient(protocol="http", nodes=[
+            {"host": "127.0.0.1", "http_port": self.server.server_port}])
+        node = client.nodes[0]
+        pool = HttpPool(client, probe_interval=0)
+        pool._down[node] = 0
+        with pool.transaction() as transport:
+            self.assertIs(node, transport._node)
+        self.assertNotIn(node, pool._down)
+        pool.clear()
+
+    def test_connect_timeout(self):
+        conn = NoNagleHTTPConnection("127.0.0.1", self.server.server_port,
+                                     timeout=30)
+        conn.connect_timeout = 0.5
+        conn.connect()
+        self.assertEqual(30, conn.sock.gettimeout())
+        self.assertEqual(30, conn.timeout)
+        conn.close()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -17,6 +17,11 @@
 
 import unittest
 
+from riak.codecs.http import (
+    encode_fulltext_delete,
+    encode_fulltext_doc,
+    fulltext_update_body,
+)
 from riak.tests import RUN_SEARCH, RUN_YZ
 from riak.tests.base import IntegrationTestBase
 
@@ -39,6 +44,41 @@ def tearDownModule():
         c.close()
 
 
+class FulltextUpdateUnitTests(unittest.TestCase):
+    def test_matches_minidom(self):
+        from xml.dom.minidom import Document
+        docs = [{"id": "1", "name": '<Tom & "Jerry">'},
+                {"id": "2", "bio": "caf\u00e9 > bar"}]
+        xml = Document()
+        root = xml.createElement("add")
+        for doc in docs:
+            doc_element = xml.createElement("doc")
+            for key in doc:
+                field = xml.createElement("field")
+                field.setAttribute("name", key)
+                field.appendChild(xml.createTextNode(doc[key]))
+                doc_element.appendChild(field)
+            root.appendChild(doc_element)
+        xml.appendChild(root)
+        body = fulltext_update_body(
+            "add", (encode_fulltext_doc(doc) for doc in docs))
+        self.assertEqual(xml.toxml().encode("utf-8"), b"".join(body))
+
+    def test_delete(self):
+        body = fulltext_update_body(
+            "delete", encode_fulltext_delete(["a&b"], ["name:<x>"]))
+        self.assertEqual(b'<?xml version="1.0" ?><delete><id>a&amp;b</id>'
+                         b"<query>name:&lt;x&gt;</query></delete>",
+                         b"".join(body))
+
+    def test_chunks(self):
+        elements = [b"x" * 1000] * 200
+        body = fulltext_update_body("add", elements)
+        self.assertEqual(4, len(body))
+        self.assertEqual(b'<?xml version="1.0" ?><add>' +
+                         b"".join(elements) + b"</add>", b"".join(body))
+
+
 @unittest.skipUnless(RUN_SEARCH, "RUN_SEARCH is 0")
 class EnableSearchTests(IntegrationTestBase, unittest.TestCase):
     def test_bucket_search_enabled(self):
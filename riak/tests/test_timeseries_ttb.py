@@ -139,6 +139,64 @@ class TimeseriesTtbUnitTests(unittest.TestCase):
         msg = c.encode_timeseries_put(tsobj)
         self.assertEqual(req_test, msg.data)
 
+    def test_encode_data_for_put_matches_erlastic(self):
+        rows = [
+            [str0, b"bytes", -1, 255, 256, -2 ** 31, 2 ** 31, -2 ** 40,
+             2 ** 2100, ts0, 0.1, -1.5e300, True, False, None],
+        ]
+        c = TtbCodec()
+        req_rows = [tuple(c.encode_to_ts_cell(cell) for cell in row)
+                    for row in rows]
+        req = tsputreq_a, str_to_bytes(table_name), [], req_rows
+        tsobj = TsObject(None, self.table, rows, None)
+        msg = c.encode_timeseries_put(tsobj)
+        self.assertEqual(encode(req), msg.data)
+
+    def test_encode_data_for_delete(self):
+        req = Atom("tsdelreq"), str_to_bytes(table_name), \
+            [str_to_bytes("hash1"), unix_time_millis(ts0)], udef_a
+        c = TtbCodec()
+        msg = c.encode_timeseries_keyreq(self.table, ["hash1", ts0],
+                                         is_delete=True)
+        self.assertEqual(encode(req), msg.data)
+
+    def test_decode_data_in_one_pass(self):
+        colnames = ["varchar", "sint64", "double", "timestamp", "boolean",
+                    "varchar", "blob", "sint64"]
+        coltypes = [varchar_a, sint64_a, double_a, timestamp_a,
+                    boolean_a, varchar_a, Atom("blob"), sint64_a]
+        r0 = (bd0, 0, 1.2, unix_time_millis(ts0), True,
+              [], blob0, -2 ** 40)
+        r1 = (bd1, 3, 4.5, unix_time_millis(ts1), False,
+              str1, [], 70000)
+        rsp_ttb = encode((tsgetresp_a, (colnames, coltypes, [r0, r1])))
+
+        c = TtbCodec()
+        for convert in (False, True):
+            expected = TsObject(None, self.table)
+            c.decode_timeseries(decode(rsp_ttb), expected, convert)
+            tsobj = TsObject(None, self.table)
+            c.decode_timeseries_ttb(rsp_ttb, tsobj, convert)
+            self.assertEqual(expected.columns, tsobj.columns)
+            self.assertEqual(expected.rows, tsobj.rows)
+        self.assertEqual(tsobj.rows[0][3], ts0)
+
+    def test_decode_empty_responses_in_one_pass(self):
+        c = TtbCodec()
+        for rsp in (Atom("tsqueryresp"), (Atom("tsqueryresp"), []),
+                    (tsgetresp_a, ([], [], []))):
+            tsobj = TsObject(None, self.table)
+            c.decode_timeseries_ttb(encode(rsp), tsobj)
+            if tsobj.rows is not None:
+                self.assertEqual(tsobj.rows, [])
+
+    def test_decode_error_in_one_pass(self):
+        rsp_ttb = encode((rpberrorresp_a, b"oops", 1))
+        tsobj = TsObject(None, self.table)
+        with self.assertRaises(RiakError) as cm:
+            TtbCodec().decode_timeseries_ttb(rsp_ttb, tsobj)
+        self.assertEqual(cm.exception.value, "oops")
+
 
 @unittest.skipUnless(is_timeseries_supported() and RUN_TIMESERIES,
                      "Timeseries not supported by this Python version"
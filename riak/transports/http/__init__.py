@@ -14,6 +14,7 @@
 
 import select
 import socket
+import time
 
 from riak.security import SecurityError, USE_STDLIB_SSL
 from riak.transports.http.transport import HttpTransport
@@ -28,29 +29,49 @@ else:
         configure_pyopenssl_context
 
 from http.client import HTTPConnection, \
+    HTTPException, \
     HTTPSConnection, \
     NotConnected, \
     IncompleteRead, \
     ImproperConnectionState, \
     BadStatusLine
 
+#: The default number of seconds between attempts to reconnect to a
+#: node which is down
+PROBE_INTERVAL = 5
+
 
 class NoNagleHTTPConnection(HTTPConnection):
     """
     Setup a connection class which does not use Nagle - deal with
     latency on PUT requests lower than MTU
     """
+    #: The number of seconds to wait for the connection to be
+    #: established, if different from the timeout of requests
+    connect_timeout = None
+
     def connect(self):
         """
         Set TCP_NODELAY on socket
         """
-        HTTPConnection.connect(self)
+        timeout = self.timeout
+        if self.connect_timeout is not None:
+            self.timeout = self.connect_timeout
+        try:
+            HTTPConnection.connect(self)
+        finally:
+            self.timeout = timeout
+        self.sock.settimeout(timeout)
         self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
 
 
 # Inspired by
 # http://code.activestate.com/recipes/577548-https-httplib-client-connection-with-certificate-v/
 class RiakHTTPSConnection(HTTPSConnection):
+    #: The number of seconds to wait for the connection to be
+    #: established, if different from the timeout of requests
+    connect_timeout = None
+
     def __init__(self,
                  host,
                  port,
@@ -89,7 +110,12 @@ class RiakHTTPSConnection(HTTPSConnection):
         """
         Connect to a host on a given (SSL) port using PyOpenSSL.
         """
-        sock = socket.create_connection((self.host, self.port), self.timeout)
+        connect_timeout = self.connect_timeout
+        if connect_timeout is None:
+            connect_timeout = self.timeout
+        sock = socket.create_connection((self.host, self.port),
+                                        connect_timeout)
+        sock.settimeout(self.timeout)
         if not USE_STDLIB_SSL:
             ssl_ctx = configure_pyopenssl_context(self.credentials)
 
@@ -124,29 +150,81 @@ class RiakHTTPSConnection(HTTPSConnection):
 
 class HttpPool(Pool):
     """
-    A pool of HTTP(S) transport connections.
+    A pool of HTTP(S) transport connections, balanced over the
+    client's nodes. Nodes which cannot be connected to are skipped
+    until they answer a ping, which is tried at most every
+    ``probe_interval`` seconds.
     """
-    def __init__(self, client, **options):
+    def __init__(self, client, probe_interval=PROBE_INTERVAL, **options):
         self.client = client
         self.options = options
+        self.probe_interval = probe_interval
         self.connection_class = NoNagleHTTPConnection
         if self.client._credentials:
             self.connection_class = RiakHTTPSConnection
+        # Nodes which could not be connected to, mapped to the time
+        # after which they may be probed again
+        self._down = {}
 
         super(HttpPool, self).__init__()
 
+    def acquire(self, _filter=None, default=None):
+        """
+        Claims a connection from the pool, skipping idle connections
+        to nodes which are down.
+        """
+        if _filter is not None and not callable(_filter):
+            raise TypeError("_filter is not a callable")
+
+        def _healthy(transport):
+            return transport._node not in self._down and \
+                (_filter is None or _filter(transport))
+
+        return super(HttpPool, self).acquire(_filter=_healthy,
+                                             default=default)
+
     def create_resource(self):
-        node = self.client._choose_node()
-        return HttpTransport(node=node,
-                             client=self.client,
-                             connection_class=self.connection_class,
-                             **self.options)
+        """
+        Connects to a node chosen by the client, failing over to the
+        next node straight away if the connection cannot be made.
+        """
+        tried = []
+        while True:
+            node = self._choose_node(tried)
+            try:
+                transport = HttpTransport(node=node,
+                                          client=self.client,
+                                          connection_class=self.connection_class,
+                                          **self.options)
+                if node in self._down and not transport.ping():
+                    transport.close()
+                    raise HTTPException("ping failed")
+            except (IOError, HTTPException):
+                node.error_rate.incr(1)
+                self._down[node] = time.time() + self.probe_interval
+                tried.append(node)
+                if len(tried) >= len(self.client.nodes):
+                    raise
+                continue
+            self._down.pop(node, None)
+            return transport
+
+    def _choose_node(self, tried):
+        """
+        Chooses a node to connect to which has not been tried yet,
+        preferring those which are up or are due to be probed.
+        """
+        now = time.time()
+        untried = [n for n in self.client.nodes if n not in tried]
+        up = [n for n in untried if self._down.get(n, now) <= now]
+        return self.client._choose_node(up or untried)
 
     def destroy_resource(self, transport):
         transport.close()
 
 
 CONN_CLOSED_ERRORS = (
+    ConnectionError,
     NotConnected,
     IncompleteRead,
     ImproperConnectionState,
@@ -13,10 +13,38 @@
 # limitations under the License.
 
 import base64
+import io
 
 from riak.util import str_to_bytes
 
-from http.client import NotConnected, HTTPConnection
+from http.client import NotConnected, HTTPConnection, HTTPResponse
+
+
+class _PipelineReader(io.BufferedReader):
+    """
+    A buffered reader over a socket that is shared by several
+    pipelined responses. HTTPResponse closes its reader once the body
+    has been read, which would discard data already buffered for the
+    responses that follow, so closing is deferred to :meth:`release`.
+    """
+    def close(self):
+        pass
+
+    def release(self):
+        super(_PipelineReader, self).close()
+
+
+class _PipelineSocket(object):
+    """
+    Hands the shared reader to each HTTPResponse in a pipeline, as
+    HTTPResponse only reads from the file returned by the
+    ``makefile()`` method of the socket it is given.
+    """
+    def __init__(self, reader):
+        self._reader = reader
+
+    def makefile(self, mode, *args, **kwargs):
+        return self._reader
 
 
 class HttpConnection(object):
@@ -57,13 +85,101 @@ class HttpConnection(object):
 
         return response.status, response.msg, response_body
 
+    def _pipeline(self, method, uris, headers={}):
+        """
+        Sends requests without bodies for each of the URIs on the
+        connection in batches of :attr:`PIPELINE_SIZE`, before reading
+        any of their responses. Returns a list of 3-tuples containing
+        the response status, response headers (as
+        httplib.HTTPMessage), and response body, in the order of the
+        URIs.
+
+        As HTTPConnection only sends a request once the previous
+        response has been read, the requests are written to its socket
+        directly, with the ``Host`` and ``Accept-Encoding`` headers it
+        would send, and the responses are read with HTTPResponse from
+        a reader shared by the whole batch. When the server closes the
+        connection part way through a batch, whether announced with
+        ``Connection: close`` or not, the unanswered requests are sent
+        again on a new connection. Sockets which cannot be read from
+        directly, such as pyOpenSSL connections, are sent one request
+        at a time with :meth:`_request` instead.
+        """
+        headers = dict(headers)
+        headers.setdefault("Accept", "multipart/mixed, application/json, */*;q=0.5")
+
+        if self._client._credentials:
+            self._security_auth_headers(self._client._credentials.username,
+                                        self._client._credentials.password,
+                                        headers)
+
+        connection = self._connection
+        host = connection.host
+        if ":" in host:
+            host = f"[{host}]"
+        if connection.port != connection.default_port:
+            host = f"{host}:{connection.port}"
+        head = f"Host: {host}\r\nAccept-Encoding: identity\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        head = str_to_bytes(head + "\r\n")
+
+        uris = list(uris)
+        results = []
+        while len(results) < len(uris):
+            if connection.sock is None:
+                connection.connect()
+            raw = connection.sock.makefile("rb", 0)
+            if not isinstance(raw, io.RawIOBase):
+                raw.close()
+                results.extend(self._request(method, uri, dict(headers))
+                               for uri in uris[len(results):])
+                break
+
+            first = len(results)
+            batch = uris[first:first + self.PIPELINE_SIZE]
+            reader = _PipelineReader(raw)
+            will_close = False
+            try:
+                connection.sock.sendall(b"".join(
+                    str_to_bytes(f"{method} {uri} HTTP/1.1\r\n") + head
+                    for uri in batch))
+                for uri in batch:
+                    response = HTTPResponse(_PipelineSocket(reader),
+                                            method=method)
+                    response.begin()
+                    results.append((response.status, response.msg,
+                                    response.read()))
+                    if response.will_close:
+                        will_close = True
+                        break
+            except ConnectionError:
+                # The connection is left with unread responses
+                self.close()
+                if len(results) == first:
+                    raise
+                # The server closed it after answering some requests
+                will_close = True
+            except Exception:
+                self.close()
+                raise
+            finally:
+                reader.release()
+
+            if will_close:
+                # The rest of the batch is resent on a new connection
+                self.close()
+
+        return results
+
     def _connect(self):
         """
         Use the appropriate connection class; optionally with security.
         """
         timeout = None
-        if self._options is not None and "timeout" in self._options:
-            timeout = self._options["timeout"]
+        connect_timeout = None
+        if self._options is not None:
+            timeout = self._options.get("timeout")
+            connect_timeout = self._options.get("connect_timeout")
 
         if self._client._credentials:
             self._connection = self._connection_class(
@@ -78,6 +194,8 @@ class HttpConnection(object):
                 port=self._node.http_port,
                 timeout=timeout,
             )
+        if connect_timeout is not None:
+            self._connection.connect_timeout = connect_timeout
         # Forces the population of stats and resources before any
         # other requests are made.
         self.server_version
@@ -91,6 +209,10 @@ class HttpConnection(object):
         except NotConnected:
             pass
 
+    #: The number of requests :meth:`_pipeline` sends before reading
+    #: their responses
+    PIPELINE_SIZE = 16
+
     # These are set by the HttpTransport initializer
     _connection_class = HTTPConnection
     _node = None
@@ -14,11 +14,17 @@
 
 import re
 
+from functools import lru_cache
+
 from riak import RiakError
 from riak.util import bytes_to_str, lazy_property
 
 from urllib.parse import quote_plus, urlencode
 
+#: The number of bucket path prefixes and query strings kept by the
+#: path cache
+PATH_CACHE_SIZE = 1024
+
 
 class HttpResources(object):
     """
@@ -65,43 +71,38 @@ class HttpResources(object):
     def key_list_path(self, bucket, bucket_type=None, **options):
         query = {"keys": True, "props": False}
         query.update(options)
-        if self.riak_kv_wm_bucket_type and bucket_type:
-            return mkpath("/types", quote_plus(bucket_type), "buckets",
-                          quote_plus(bucket), "keys", **query)
-        if self.riak_kv_wm_buckets:
-            return mkpath("/buckets", quote_plus(bucket), "keys",
-                          **query)
-        else:
-            return mkpath(self.riak_kv_wm_raw, quote_plus(bucket), **query)
+        return self._bucket_path(bucket, bucket_type, "keys") + \
+            query_string(query)
 
     def object_path(self, bucket, key=None, bucket_type=None, **options):
-        if key:
-            key = quote_plus(key)
-        if self.riak_kv_wm_bucket_type and bucket_type:
-            return mkpath("/types", quote_plus(bucket_type), "buckets",
-                          quote_plus(bucket), "keys", key, **options)
-        elif self.riak_kv_wm_buckets:
-            return mkpath("/buckets", quote_plus(bucket), "keys",
-                          key, **options)
-        else:
-            return mkpath(self.riak_kv_wm_raw, quote_plus(bucket), key,
-                          **options)
+        return append_segments(self._bucket_path(bucket, bucket_type, "keys"),
+                               key) + query_string(options)
 
     def index_path(self, bucket, index, start, finish=None, bucket_type=None,
                    **options):
         if not self.riak_kv_wm_buckets:
             raise RiakError("Indexes are unsupported by this Riak node")
         if finish is not None:
-            finish = quote_plus(str(finish))
+            finish = str(finish)
         if self.riak_kv_wm_bucket_type and bucket_type:
-            return mkpath("/types", quote_plus(bucket_type),
-                          "buckets", quote_plus(bucket),
-                          "index", quote_plus(index), quote_plus(str(start)),
-                          finish, **options)
+            prefix = bucket_prefix("/types", bucket_type, bucket, "index",
+                                   index)
         else:
-            return mkpath("/buckets", quote_plus(bucket),
-                          "index", quote_plus(index), quote_plus(str(start)),
-                          finish, **options)
+            prefix = bucket_prefix("/buckets", None, bucket, "index", index)
+        return append_segments(prefix, str(start), finish) + \
+            query_string(options)
+
+    def _bucket_path(self, bucket, bucket_type, resource):
+        """
+        Returns the cached path of a resource within a bucket, which
+        falls back to the old-style URL scheme on older nodes.
+        """
+        if self.riak_kv_wm_bucket_type and bucket_type:
+            return bucket_prefix("/types", bucket_type, bucket, resource)
+        elif self.riak_kv_wm_buckets:
+            return bucket_prefix("/buckets", None, bucket, resource)
+        else:
+            return bucket_prefix(self.riak_kv_wm_raw, None, bucket)
 
     def search_index_path(self, index=None, **options):
         """
@@ -295,3 +296,54 @@ def mkpath(*segments, **query):
         pathstring = "/" + pathstring
 
     return pathstring
+
+
+@lru_cache(maxsize=PATH_CACHE_SIZE, typed=True)
+def bucket_prefix(root, bucket_type, bucket, *resource):
+    """
+    Constructs the path to a resource within a bucket, which is
+    memoized as it rarely changes between requests. The bucket type,
+    bucket and resource names are quoted.
+    """
+    if bucket_type is not None:
+        return mkpath(root, quote_plus(bucket_type), "buckets",
+                      quote_plus(bucket), *[quote_plus(r) for r in resource])
+    return mkpath(root, quote_plus(bucket), *[quote_plus(r) for r in resource])
+
+
+def append_segments(prefix, *segments):
+    """
+    Appends quoted path segments to a path constructed by
+    :func:`mkpath`, skipping those which are None.
+    """
+    path = prefix
+    for segment in segments:
+        if segment is not None:
+            path = path.rstrip("/") + "/" + quote_plus(segment)
+    return path
+
+
+def query_string(query):
+    """
+    Constructs the query portion of a URI from a dict, as
+    :func:`mkpath` does, including the leading "?" if there are any
+    parameters.
+    """
+    # The types are part of the cache key, as True == 1 would
+    # otherwise share the string of whichever was encoded first
+    items = tuple((key, value, type(value)) for key, value in query.items()
+                  if value is not None)
+    if not items:
+        return ""
+    try:
+        return _encode_query(items)
+    except TypeError:
+        # Unhashable values can't be memoized
+        return _encode_query.__wrapped__(items)
+
+
+@lru_cache(maxsize=PATH_CACHE_SIZE)
+def _encode_query(items):
+    return "?" + urlencode([(key, str(value).lower())
+                            if value in [False, True] else (key, value)
+                            for key, value, _ in items])
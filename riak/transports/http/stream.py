@@ -25,25 +25,50 @@ from riak.util import decode_index_value
 
 class HttpStream(object):
     """
-    Base class for HTTP streaming iterators.
+    Base class for HTTP streaming iterators. The response is buffered
+    as bytes, and the amount read at a time doubles from
+    ``BLOCK_SIZE`` up to ``MAX_BLOCK_SIZE`` while reads keep filling
+    it.
     """
 
-    BLOCK_SIZE = 2048
+    BLOCK_SIZE = 8192
+    MAX_BLOCK_SIZE = 1048576
 
     def __init__(self, response):
         self.response = response
-        self.buffer = ""
+        self.buffer = bytearray()
         self.response_done = False
         self.resource = None
+        self._block_size = self.BLOCK_SIZE
+        # Where to resume scanning the buffer for the end of an item
+        self._scan = 0
 
     def __iter__(self):
         return self
 
     def _read(self):
-        chunk = self.response.read(self.BLOCK_SIZE)
-        if chunk == b'':
+        # read1() returns what has arrived, rather than blocking until
+        # a whole block is available
+        if hasattr(self.response, "read1"):
+            chunk = self.response.read1(self._block_size)
+        else:
+            chunk = self.response.read(self._block_size)
+        if not chunk:
             self.response_done = True
-        self.buffer += chunk.decode("utf-8")
+        elif (len(chunk) == self._block_size and
+              self._block_size < self.MAX_BLOCK_SIZE):
+            self._block_size *= 2
+        self.buffer += chunk
+
+    def _consume(self, start, end):
+        """
+        Removes the buffer up to ``end``, returning the bytes before
+        ``start``.
+        """
+        item = bytes(self.buffer[:start])
+        del self.buffer[:end]
+        self._scan = 0
+        return item
 
     def __next__(self):
         raise NotImplementedError
@@ -55,26 +80,109 @@ class HttpStream(object):
         self.resource.release()
 
 
+class HttpValueStream(HttpStream):
+    """
+    Streaming iterator over the value of an object over HTTP, yielding
+    chunks of bytes.
+    """
+    def __init__(self, response, chunk_size):
+        super(HttpValueStream, self).__init__(response)
+        self.chunk_size = chunk_size
+
+    def __next__(self):
+        chunk = b""
+        if not self.response_done:
+            chunk = self.response.read(self.chunk_size)
+        if not chunk:
+            self.response_done = True
+            raise StopIteration
+        return chunk
+
+    def close(self):
+        if not self.response_done:
+            # The rest of the value is still in flight, so the
+            # connection cannot be reused
+            self.response.close()
+            self.resource.object.close()
+        super(HttpValueStream, self).close()
+
+
 class HttpJsonStream(HttpStream):
+    """
+    Base class for streams of concatenated JSON objects over HTTP. The
+    end of each object is found in a single pass over the buffer, which
+    keeps track of nesting and of strings across reads, so that braces
+    inside keys are skipped without parsing the object again.
+    """
     _json_field = None
 
+    _TOKEN_RE = re.compile(b'[{}"]')
+    _STRING_RE = re.compile(b'["\\\\]')
+
+    def __init__(self, response, raw=False):
+        super(HttpJsonStream, self).__init__(response)
+        self.raw = raw
+        self._depth = 0
+        self._in_string = False
+
     def __next__(self):
-        # Python 2.x Version
-        while "}" not in self.buffer and not self.response_done:
+        while True:
+            end = self._find_end()
+            if end != -1:
+                break
+            if self.response_done:
+                raise StopIteration
             self._read()
 
-        if "}" in self.buffer:
-            idx = self.buffer.index("}") + 1
-            chunk = self.buffer[:idx]
-            self.buffer = self.buffer[idx:]
-            jsdict = json.loads(chunk)
-            if "error" in jsdict:
-                self.close()
-                raise RiakError(jsdict["error"])
-            field = jsdict[self._json_field]
-            return field
-        else:
-            raise StopIteration
+        jsdict = json.loads(self._consume(end, end))
+        if "error" in jsdict:
+            self.close()
+            raise RiakError(jsdict["error"])
+        field = jsdict[self._json_field]
+        if self.raw:
+            return [item.encode("utf-8") for item in field]
+        return field
+
+    def _find_end(self):
+        """
+        Scans the buffer from where the last scan stopped, returning
+        the index just past the end of the first object, or -1 if it
+        has not been read in full.
+        """
+        buffer = self.buffer
+        pos = self._scan
+        while True:
+            if self._in_string:
+                match = self._STRING_RE.search(buffer, pos)
+                if match is None:
+                    self._scan = len(buffer)
+                    return -1
+                if match.group() == b'"':
+                    self._in_string = False
+                    pos = match.end()
+                elif match.end() < len(buffer):
+                    # Skip the escaped character
+                    pos = match.end() + 1
+                else:
+                    # The escaped character has not been read yet
+                    self._scan = match.start()
+                    return -1
+                continue
+
+            match = self._TOKEN_RE.search(buffer, pos)
+            if match is None:
+                self._scan = len(buffer)
+                return -1
+            pos = match.end()
+            token = match.group()
+            if token == b'"':
+                self._in_string = True
+            elif token == b"{":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    return pos
 
 
 class HttpKeyStream(HttpJsonStream):
@@ -99,8 +207,11 @@ class HttpMultipartStream(HttpStream):
         super(HttpMultipartStream, self).__init__(response)
         ctypehdr = response.getheader("content-type")
         _, params = parse_header(ctypehdr)
-        self.boundary_re = re.compile("\r?\n--%s(?:--)?\r?\n" %
-                                      re.escape(params["boundary"]))
+        boundary = re.escape(params["boundary"].encode("utf-8"))
+        self.boundary_re = re.compile(b"\r?\n--" + boundary + b"(?:--)?\r?\n")
+        # The longest possible boundary match, so that a search can
+        # resume just before a boundary split across two reads
+        self._boundary_size = len(params["boundary"]) + 8
         self.next_boundary = None
         self.seen_first = False
 
@@ -115,18 +226,20 @@ class HttpMultipartStream(HttpStream):
 
         if self.next_boundary:
             part = self.advance_buffer()
-            message = message_from_string(part)
+            message = message_from_string(part.decode("utf-8"))
             return message
         else:
             raise StopIteration
 
     def try_match(self):
-        self.next_boundary = self.boundary_re.search(self.buffer)
+        self.next_boundary = self.boundary_re.search(self.buffer, self._scan)
+        if not self.next_boundary:
+            self._scan = max(0, len(self.buffer) - self._boundary_size)
         return self.next_boundary
 
     def advance_buffer(self):
-        part = self.buffer[:self.next_boundary.start()]
-        self.buffer = self.buffer[self.next_boundary.end():]
+        part = self._consume(self.next_boundary.start(),
+                             self.next_boundary.end())
         self.next_boundary = None
         return part
 
@@ -140,9 +253,27 @@ class HttpMapReduceStream(HttpMultipartStream):
     Streaming iterator for MapReduce over HTTP
     """
 
+    # The layout of each part as Riak encodes it, which lets the data
+    # be passed on undecoded
+    RAW_PAYLOAD_RE = re.compile(
+        r'^\{\s*"phase"\s*:\s*(\d+)\s*,\s*"data"\s*:\s*(.*?)\s*\}\s*$',
+        re.DOTALL)
+
+    def __init__(self, response, raw=False):
+        super(HttpMapReduceStream, self).__init__(response)
+        self.raw = raw
+
     def __next__(self):
         message = super(HttpMapReduceStream, self).__next__()
-        payload = json.loads(message.get_payload())
+        payload = message.get_payload()
+        if self.raw:
+            match = self.RAW_PAYLOAD_RE.match(payload)
+            if match:
+                return int(match.group(1)), match.group(2).encode("utf-8")
+            payload = json.loads(payload)
+            return payload["phase"], \
+                json.dumps(payload["data"]).encode("utf-8")
+        payload = json.loads(payload)
         return payload["phase"], payload["data"]
 
 
@@ -151,10 +282,11 @@ class HttpIndexStream(HttpMultipartStream):
     Streaming iterator for secondary indexes over HTTP
     """
 
-    def __init__(self, response, index, return_terms):
+    def __init__(self, response, index, return_terms, raw=False):
         super(HttpIndexStream, self).__init__(response)
         self.index = index
         self.return_terms = return_terms
+        self.raw = raw
 
     def __next__(self):
         message = super(HttpIndexStream, self).__next__()
@@ -162,9 +294,14 @@ class HttpIndexStream(HttpMultipartStream):
         if "error" in payload:
             raise RiakError(payload["error"])
         elif "keys" in payload:
+            if self.raw:
+                return [key.encode("utf-8") for key in payload["keys"]]
             return payload["keys"]
         elif "results" in payload:
             structs = payload["results"]
+            if self.raw:
+                return [(str(term).encode("utf-8"), key.encode("utf-8"))
+                        for d in structs for term, key in d.items()]
             # Format is {"results":[{"2ikey":"primarykey"}, ...]}
             return [self._decode_pair(list(d.items())[0]) for d in structs]
         elif "continuation" in payload:
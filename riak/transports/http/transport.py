@@ -17,10 +17,17 @@ try:
 except ImportError:
     import json
 
-from xml.dom.minidom import Document
-
-from riak import RiakError
-from riak.codecs.http import HttpCodec
+from io import BytesIO
+
+from riak import ConflictError, RiakError
+from riak.codecs.http import (
+    HttpCodec,
+    encode_fulltext_delete,
+    encode_fulltext_doc,
+    fulltext_update_body,
+)
+from riak.content import RiakContent
+from riak.riak_object import VClock
 from riak.security import SecurityError
 from riak.transports.http.connection import HttpConnection
 from riak.transports.http.resources import HttpResources
@@ -29,6 +36,7 @@ from riak.transports.http.stream import (
     HttpIndexStream,
     HttpKeyStream,
     HttpMapReduceStream,
+    HttpValueStream,
 )
 from riak.transports.transport import Transport
 from riak.util import bytes_to_str, decode_index_value, str_to_long
@@ -134,6 +142,62 @@ class HttpTransport(Transport, HttpConnection, HttpResources, HttpCodec):
         response = self._request("GET", url)
         return self._parse_body(robj, response, [200, 300, 404])
 
+    def get_many(self, robjs, r=None, pr=None, timeout=None,
+                 basic_quorum=None, notfound_ok=None, head_only=False):
+        """
+        Gets several bucket/keys from the server, pipelining the
+        requests on the connection
+        """
+        params = {"r": r, "pr": pr, "timeout": timeout,
+                  "basic_quorum": basic_quorum,
+                  "notfound_ok": notfound_ok}
+
+        urls = []
+        for robj in robjs:
+            bucket_type = self._get_bucket_type(robj.bucket.bucket_type)
+            urls.append(self.object_path(robj.bucket.name, robj.key,
+                                         bucket_type=bucket_type, **params))
+        responses = self._pipeline("GET", urls)
+        for robj, response in zip(robjs, responses):
+            self._parse_body(robj, response, [200, 300, 404])
+        return robjs
+
+    def stream_get(self, robj, r=None, pr=None, timeout=None,
+                   basic_quorum=None, notfound_ok=None, chunk_size=65536):
+        """
+        Gets a bucket/key from the server, returning an iterator over
+        the chunks of its value
+        """
+        params = {"r": r, "pr": pr, "timeout": timeout,
+                  "basic_quorum": basic_quorum,
+                  "notfound_ok": notfound_ok}
+
+        bucket_type = self._get_bucket_type(robj.bucket.bucket_type)
+
+        url = self.object_path(robj.bucket.name, robj.key,
+                               bucket_type=bucket_type, **params)
+        status, headers, response = self._request("GET", url, stream=True)
+
+        if status == 200:
+            if "x-riak-vclock" in headers:
+                robj.vclock = VClock(headers["x-riak-vclock"], "base64")
+            robj.siblings = [self._parse_sibling(RiakContent(robj),
+                                                 list(headers.items()),
+                                                 None)]
+            return HttpValueStream(response, chunk_size)
+
+        # Not found and siblings are read whole, as with get()
+        body = response.read()
+        response.close()
+        self._parse_body(robj, (status, headers, body), [300, 404])
+        if len(robj.siblings) > 1:
+            raise ConflictError()
+        elif robj.siblings:
+            body = robj.encoded_data
+        else:
+            body = b""
+        return HttpValueStream(BytesIO(body), chunk_size)
+
     def put(self, robj, w=None, dw=None, pw=None, return_body=True,
             if_none_match=False, timeout=None):
         """
@@ -204,7 +268,7 @@ class HttpTransport(Transport, HttpConnection, HttpResources, HttpCodec):
         else:
             raise RiakError("Error listing keys.")
 
-    def stream_keys(self, bucket, timeout=None):
+    def stream_keys(self, bucket, timeout=None, raw=False):
         bucket_type = self._get_bucket_type(bucket.bucket_type)
         url = self.key_list_path(
             bucket.name,
@@ -215,7 +279,7 @@ class HttpTransport(Transport, HttpConnection, HttpResources, HttpCodec):
         status, headers, response = self._request("GET", url, stream=True)
 
         if status == 200:
-            return HttpKeyStream(response)
+            return HttpKeyStream(response, raw)
         else:
             raise RiakError("Error listing keys.")
 
@@ -352,7 +416,7 @@ class HttpTransport(Transport, HttpConnection, HttpResources, HttpCodec):
         result = json.loads(bytes_to_str(body))
         return result
 
-    def stream_mapred(self, inputs, query, timeout=None):
+    def stream_mapred(self, inputs, query, timeout=None, raw=False):
         content = self._construct_mapred_json(inputs, query, timeout)
 
         url = self.mapred_path(chunked=True)
@@ -360,7 +424,7 @@ class HttpTransport(Transport, HttpConnection, HttpResources, HttpCodec):
         status, headers, response = self._request("POST", url, reqheaders, content, stream=True)
 
         if status == 200:
-            return HttpMapReduceStream(response)
+            return HttpMapReduceStream(response, raw)
         else:
             raise RiakError(
                 "Error running MapReduce operation.",
@@ -406,7 +470,7 @@ class HttpTransport(Transport, HttpConnection, HttpResources, HttpCodec):
 
     def stream_index(self, bucket, index, startkey, endkey=None,
                      return_terms=None, max_results=None, continuation=None,
-                     timeout=None, term_regex=None):
+                     timeout=None, term_regex=None, raw=False):
         """
         Streams a secondary index query.
         """
@@ -439,7 +503,7 @@ class HttpTransport(Transport, HttpConnection, HttpResources, HttpCodec):
         status, headers, response = self._request("GET", url, stream=True)
 
         if status == 200:
-            return HttpIndexStream(response, index, return_terms)
+            return HttpIndexStream(response, index, return_terms, raw)
         else:
             raise RiakError("Error streaming secondary index.")
 
@@ -619,48 +683,24 @@ class HttpTransport(Transport, HttpConnection, HttpResources, HttpCodec):
         """
         Adds documents to the search index.
         """
-        xml = Document()
-        root = xml.createElement("add")
-        for doc in docs:
-            doc_element = xml.createElement("doc")
-            for key in doc:
-                value = doc[key]
-                field = xml.createElement("field")
-                field.setAttribute("name", key)
-                text = xml.createTextNode(value)
-                field.appendChild(text)
-                doc_element.appendChild(field)
-            root.appendChild(doc_element)
-        xml.appendChild(root)
-
-        self._request("POST", self.solr_update_path(index),
-                      {"Content-Type": "text/xml"},
-                      xml.toxml().encode("utf-8"))
+        self.fulltext_update(index, fulltext_update_body(
+            "add", (encode_fulltext_doc(doc) for doc in docs)))
 
     def fulltext_delete(self, index, docs=None, queries=None):
         """
         Removes documents from the full-text index.
         """
-        xml = Document()
-        root = xml.createElement("delete")
-        if docs:
-            for doc in docs:
-                doc_element = xml.createElement("id")
-                text = xml.createTextNode(doc)
-                doc_element.appendChild(text)
-                root.appendChild(doc_element)
-        if queries:
-            for query in queries:
-                query_element = xml.createElement("query")
-                text = xml.createTextNode(query)
-                query_element.appendChild(text)
-                root.appendChild(query_element)
-
-        xml.appendChild(root)
-
-        self._request("POST", self.solr_update_path(index),
-                      {"Content-Type": "text/xml"},
-                      xml.toxml().encode("utf-8"))
+        self.fulltext_update(index, fulltext_update_body(
+            "delete", encode_fulltext_delete(docs, queries)))
+
+    def fulltext_update(self, index, body):
+        """
+        Sends an encoded update to the full-text index, as a chunked
+        request if the body is a list of chunks.
+        """
+        status, _, _ = self._request("POST", self.solr_update_path(index),
+                                     {"Content-Type": "text/xml"}, body)
+        self.check_http_code(status, [200])
 
     def get_counter(self, bucket, key, **options):
         if not bucket.bucket_type.is_default():
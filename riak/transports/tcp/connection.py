@@ -245,7 +245,11 @@ class TcpConnection(object):
 
     def _connect(self):
         if not self._socket:
-            if self._timeout:
+            if self._connect_timeout:
+                self._socket = socket.create_connection(self._address,
+                                                        self._connect_timeout)
+                self._socket.settimeout(self._timeout or None)
+            elif self._timeout:
                 self._socket = socket.create_connection(self._address,
                                                         self._timeout)
             else:
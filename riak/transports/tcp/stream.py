@@ -104,13 +104,20 @@ class PbufMapredStream(PbufStream):
 
     _expect = riak.pb.messages.MSG_CODE_MAP_RED_RESP
 
+    def __init__(self, transport, codec, raw=False):
+        super(PbufMapredStream, self).__init__(transport, codec)
+        self.raw = raw
+
     def __next__(self):
         response = super(PbufMapredStream, self).__next__()
 
         if response.done and not response.HasField("response"):
             raise StopIteration
 
-        return response.phase, json.loads(bytes_to_str(response.response))
+        if self.raw:
+            return response.phase, response.response
+        # Decoded straight from bytes, to avoid copying large results
+        return response.phase, json.loads(response.response)
 
 
 class PbufBucketStream(PbufStream):
@@ -137,10 +144,12 @@ class PbufIndexStream(PbufStream):
 
     _expect = riak.pb.messages.MSG_CODE_INDEX_RESP
 
-    def __init__(self, transport, codec, index, return_terms=False):
+    def __init__(self, transport, codec, index, return_terms=False,
+                 raw=False):
         super(PbufIndexStream, self).__init__(transport, codec)
         self.index = index
         self.return_terms = return_terms
+        self.raw = raw
 
     def __next__(self):
         response = super(PbufIndexStream, self).__next__()
@@ -148,7 +157,11 @@ class PbufIndexStream(PbufStream):
         if response.done and not (response.keys or response.results or response.continuation):
             raise StopIteration
 
-        if self.return_terms and response.results:
+        if self.raw and not response.continuation:
+            if self.return_terms and response.results:
+                return [(r.key, r.value) for r in response.results]
+            return list(response.keys)
+        elif self.return_terms and response.results:
             return [
                 (decode_index_value(self.index, r.key), bytes_to_str(r.value))
                 for r in response.results
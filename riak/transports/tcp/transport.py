@@ -48,6 +48,7 @@ class TcpTransport(Transport, TcpConnection):
         self._node = node
         self._address = (node.host, node.pb_port)
         self._timeout = timeout
+        self._connect_timeout = kwargs.get("connect_timeout")
         self._socket = None
         self._pbuf_c = None
         self._ttb_c = None
@@ -168,6 +169,27 @@ class TcpTransport(Transport, TcpConnection):
         resp_code, resp = self._request(msg, codec)
         return codec.decode_put(robj, resp)
 
+    def prepared_get(self, prepared, robj):
+        msg_code = riak.pb.messages.MSG_CODE_GET_REQ
+        codec = self._get_codec(msg_code)
+        msg = codec.encode_prepared_get(prepared.template(codec), robj)
+        resp_code, resp = self._request(msg, codec)
+        return codec.decode_get(robj, resp)
+
+    def prepared_put(self, prepared, robj):
+        msg_code = riak.pb.messages.MSG_CODE_PUT_REQ
+        codec = self._get_codec(msg_code)
+        msg = codec.encode_prepared_put(prepared.template(codec), robj)
+        resp_code, resp = self._request(msg, codec)
+        return codec.decode_put(robj, resp)
+
+    def prepared_delete(self, prepared, robj):
+        msg_code = riak.pb.messages.MSG_CODE_DEL_REQ
+        codec = self._get_codec(msg_code)
+        msg = codec.encode_prepared_delete(prepared.template(codec), robj)
+        resp_code, resp = self._request(msg, codec)
+        return self
+
     def ts_describe(self, table):
         query = "DESCRIBE {table}".format(table=table.name)
         return self.ts_query(table, query)
@@ -176,11 +198,7 @@ class TcpTransport(Transport, TcpConnection):
         msg_code = MSG_CODE_TS_TTB_MSG
         codec = self._get_codec(msg_code)
         msg = codec.encode_timeseries_keyreq(table, key)
-        resp_code, resp = self._request(msg, codec)
-        tsobj = TsObject(self._client, table)
-        codec.decode_timeseries(resp, tsobj,
-                                self._ts_convert_timestamp)
-        return tsobj
+        return self._ts_request(msg, codec, table)
 
     def ts_put(self, tsobj):
         msg_code = MSG_CODE_TS_TTB_MSG
@@ -203,11 +221,7 @@ class TcpTransport(Transport, TcpConnection):
         msg_code = riak.pb.messages.MSG_CODE_TS_QUERY_REQ
         codec = self._get_codec(msg_code)
         msg = codec.encode_timeseries_query(table, query, interpolations)
-        resp_code, resp = self._request(msg, codec)
-        tsobj = TsObject(self._client, table)
-        codec.decode_timeseries(resp, tsobj,
-                                self._ts_convert_timestamp)
-        return tsobj
+        return self._ts_request(msg, codec, table)
 
     def ts_stream_keys(self, table, timeout=None):
         """
@@ -237,10 +251,11 @@ class TcpTransport(Transport, TcpConnection):
         stream = self.stream_keys(bucket, timeout=timeout)
         return codec.decode_get_keys(stream)
 
-    def stream_keys(self, bucket, timeout=None):
+    def stream_keys(self, bucket, timeout=None, raw=False):
         """
         Streams keys from a bucket, returning an iterator that yields
-        lists of keys.
+        lists of keys. The keys are always the bytes received, so
+        ``raw`` makes no difference here.
         """
         msg_code = riak.pb.messages.MSG_CODE_LIST_KEYS_REQ
         codec = self._get_codec(msg_code)
@@ -350,14 +365,14 @@ class TcpTransport(Transport, TcpConnection):
         else:
             return result
 
-    def stream_mapred(self, inputs, query, timeout=None):
+    def stream_mapred(self, inputs, query, timeout=None, raw=False):
         # Construct the job, optionally set the timeout...
         msg_code = riak.pb.messages.MSG_CODE_MAP_RED_REQ
         codec = self._get_codec(msg_code)
         content = self._construct_mapred_json(inputs, query, timeout)
         msg = codec.encode_stream_mapred(content)
         self._send_msg(msg.msg_code, msg.data)
-        return PbufMapredStream(self, codec)
+        return PbufMapredStream(self, codec, raw)
 
     def get_index(self, bucket, index, startkey, endkey=None,
                   return_terms=None, max_results=None, continuation=None,
@@ -382,7 +397,7 @@ class TcpTransport(Transport, TcpConnection):
 
     def stream_index(self, bucket, index, startkey, endkey=None,
                      return_terms=None, max_results=None, continuation=None,
-                     timeout=None, term_regex=None):
+                     timeout=None, term_regex=None, raw=False):
         if not self.stream_indexes():
             raise NotImplementedError("Secondary index streaming is not "
                                       "supported")
@@ -396,7 +411,7 @@ class TcpTransport(Transport, TcpConnection):
                                      continuation, timeout,
                                      term_regex, streaming=True)
         self._send_msg(msg.msg_code, msg.data)
-        return PbufIndexStream(self, codec, index, return_terms)
+        return PbufIndexStream(self, codec, index, return_terms, raw)
 
     def create_search_index(self, index, schema=None, n_val=None,
                             timeout=None):
@@ -547,6 +562,22 @@ class TcpTransport(Transport, TcpConnection):
         resp_code, resp = self._request(msg, codec)
         return [codec.decode_preflist(item) for item in resp.preflist]
 
+    def _ts_request(self, msg, codec, table):
+        tsobj = TsObject(self._client, table)
+        if isinstance(codec, TtbCodec):
+            # NB: TTB responses are decoded straight from the wire in
+            # a single pass rather than via the generic term decoder
+            resp_code, data = self._send_recv(msg.msg_code, msg.data)
+            codec.maybe_riak_error(resp_code, data)
+            codec.maybe_incorrect_code(resp_code, msg.resp_code)
+            codec.decode_timeseries_ttb(data, tsobj,
+                                        self._ts_convert_timestamp)
+        else:
+            resp_code, resp = self._request(msg, codec)
+            codec.decode_timeseries(resp, tsobj,
+                                    self._ts_convert_timestamp)
+        return tsobj
+
     def _request(self, msg, codec=None):
         if isinstance(msg, Msg):
             msg_code = msg.msg_code
@@ -72,6 +72,18 @@ class Transport(FeatureDetection):
         """
         raise NotImplementedError
 
+    def get_many(self, robjs, r=None, pr=None, timeout=None,
+                 basic_quorum=None, notfound_ok=None, head_only=False):
+        """
+        Fetches several objects. Transports which cannot pipeline
+        requests fetch them one at a time.
+        """
+        for robj in robjs:
+            self.get(robj, r=r, pr=pr, timeout=timeout,
+                     basic_quorum=basic_quorum, notfound_ok=notfound_ok,
+                     head_only=head_only)
+        return robjs
+
     def put(self, robj, w=None, dw=None, pw=None, return_body=None,
             if_none_match=None, timeout=None):
         """
@@ -85,6 +97,27 @@ class Transport(FeatureDetection):
         """
         raise NotImplementedError
 
+    def prepared_get(self, prepared, robj):
+        """
+        Fetches an object using a prepared request. Transports which
+        cannot reuse serialized requests fall back to :meth:`get`.
+        """
+        return self.get(robj, **prepared.options)
+
+    def prepared_put(self, prepared, robj):
+        """
+        Stores an object using a prepared request. Transports which
+        cannot reuse serialized requests fall back to :meth:`put`.
+        """
+        return self.put(robj, **prepared.options)
+
+    def prepared_delete(self, prepared, robj):
+        """
+        Deletes an object using a prepared request. Transports which
+        cannot reuse serialized requests fall back to :meth:`delete`.
+        """
+        return self.delete(robj, **prepared.options)
+
     def ts_describe(self, table):
         """
         Retrieves a timeseries table description.
@@ -169,9 +202,10 @@ class Transport(FeatureDetection):
         """
         raise NotImplementedError
 
-    def stream_keys(self, bucket, timeout=None):
+    def stream_keys(self, bucket, timeout=None, raw=False):
         """
         Streams the list of keys for the bucket through an iterator.
+        With ``raw``, the keys are yielded as the bytes received.
         """
         raise NotImplementedError
 
@@ -181,9 +215,10 @@ class Transport(FeatureDetection):
         """
         raise NotImplementedError
 
-    def stream_mapred(self, inputs, query, timeout=None):
+    def stream_mapred(self, inputs, query, timeout=None, raw=False):
         """
         Streams the results of a MapReduce request through an iterator.
+        With ``raw``, the results are yielded as the JSON bytes received.
         """
         raise NotImplementedError
 
@@ -254,9 +289,10 @@ class Transport(FeatureDetection):
 
     def stream_index(self, bucket, index, startkey, endkey=None,
                      return_terms=None, max_results=None, continuation=None,
-                     timeout=None):
+                     timeout=None, term_regex=None, raw=False):
         """
-        Streams a secondary index query.
+        Streams a secondary index query. With ``raw``, the keys and
+        terms are yielded as the bytes received.
         """
         raise NotImplementedError
 